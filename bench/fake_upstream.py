@@ -0,0 +1,170 @@
+"""本地模拟上游服务（up.x666.me + connect.linux.do）
+
+供基准测试使用，实现签到、用户信息、转盘以及 OAuth 登录流程涉及的接口，
+可配置响应延迟、错误率与限流：
+
+    python -m bench.fake_upstream --port 18080 --latency-ms 50 --error-rate 0.01 --rate-limit 500
+
+Linux.do 的接口位于 /connect 前缀下，对应的客户端见 bench.linux_do。
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import random
+import time
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, RedirectResponse, Response
+
+TOKEN_TTL = 7 * 24 * 3600  # 签发的薄荷 Token 有效期（秒）
+PRIZES = ("1 积分", "5 积分", "10 积分", "谢谢参与")
+
+
+class FakeUpstreamConfig:
+    """模拟服务的行为配置"""
+
+    def __init__(self, latency_ms: float = 0, error_rate: float = 0, rate_limit: float = 0) -> None:
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+
+class RateLimiter:
+    """全局令牌桶，超出时返回 429"""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def issue_token(subject: str) -> str:
+    """签发带 exp 声明的 JWT 形式 Token（不做签名校验）"""
+    def encode(data: Dict[str, Any]) -> str:
+        raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+    header = encode({"alg": "none", "typ": "JWT"})
+    payload = encode({"sub": subject, "exp": int(time.time()) + TOKEN_TTL})
+    return f"{header}.{payload}.bench"
+
+
+def _bearer(request: Request) -> str:
+    return request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+
+
+def create_app(config: FakeUpstreamConfig) -> FastAPI:
+    """创建模拟上游应用"""
+    app = FastAPI(title="fake upstream")
+    limiter = RateLimiter(config.rate_limit)
+    stats = {"requests": 0, "errors": 0, "throttled": 0}
+
+    @app.middleware("http")
+    async def simulate(request: Request, call_next: Any) -> Response:
+        stats["requests"] += 1
+        if not limiter.allow():
+            stats["throttled"] += 1
+            return JSONResponse({"success": False, "message": "rate limited"},
+                                status_code=429, headers={"Retry-After": "1"})
+        if config.latency_ms > 0:
+            # 延迟在 ±50% 范围内随机波动
+            await asyncio.sleep(config.latency_ms * random.uniform(0.5, 1.5) / 1000)
+        if config.error_rate > 0 and random.random() < config.error_rate:
+            stats["errors"] += 1
+            return JSONResponse({"success": False, "message": "internal error"}, status_code=500)
+        return await call_next(request)
+
+    def authorized(request: Request) -> Optional[str]:
+        token = _bearer(request)
+        if not token or token.startswith("invalid"):
+            return None
+        return token
+
+    @app.post("/api/user/sign")
+    async def sign(request: Request) -> Response:
+        if authorized(request) is None:
+            return JSONResponse({"success": False, "message": "unauthorized"}, status_code=401)
+        return JSONResponse({"success": True, "message": "签到成功", "data": {"reward": 1}})
+
+    @app.post("/api/user/info")
+    async def user_info(request: Request) -> Response:
+        if authorized(request) is None:
+            return JSONResponse({"success": False, "message": "unauthorized"}, status_code=401)
+        return JSONResponse({"success": True, "data": {"continuous_days": 1, "total_signs": 1}})
+
+    @app.post("/api/checkin/spin")
+    async def spin(request: Request) -> Response:
+        if authorized(request) is None:
+            return JSONResponse({"success": False, "message": "unauthorized"}, status_code=401)
+        return JSONResponse({"success": True, "message": "ok", "data": {"prize": random.choice(PRIZES)}})
+
+    @app.get("/api/auth/login")
+    async def auth_login(request: Request) -> Response:
+        state = random.randbytes(8).hex()
+        base = str(request.base_url).rstrip("/")
+        response = JSONResponse({"authUrl": f"{base}/connect/oauth2/authorize?state={state}"})
+        response.set_cookie("oauth_state", state)
+        return response
+
+    @app.get("/api/auth/callback")
+    async def auth_callback(request: Request, code: str = "", state: str = "") -> Response:
+        if not code or request.cookies.get("oauth_state") != state:
+            return JSONResponse({"success": False, "message": "invalid state"}, status_code=400)
+        return RedirectResponse(f"/?token={issue_token(code)}", status_code=302)
+
+    # ---- connect.linux.do ----
+
+    @app.post("/connect/login")
+    async def connect_login(request: Request) -> Response:
+        body = await request.json()
+        token = body.get("token", "")
+        if not token:
+            return JSONResponse({"success": False}, status_code=401)
+        return JSONResponse({"connect_token": f"connect-{token}", "token": token})
+
+    @app.get("/connect/oauth2/authorize")
+    async def connect_authorize(request: Request, state: str = "") -> Response:
+        if not request.cookies.get("auth.session-token"):
+            return JSONResponse({"success": False}, status_code=401)
+        base = str(request.base_url).rstrip("/")
+        code = random.randbytes(8).hex()
+        return RedirectResponse(f"{base}/api/auth/callback?code={code}&state={state}", status_code=302)
+
+    @app.get("/__stats")
+    async def get_stats() -> Dict[str, int]:
+        return stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地模拟上游服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--latency-ms", type=float, default=0, help="平均响应延迟（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回 500 的概率（0-1）")
+    parser.add_argument("--rate-limit", type=float, default=0, help="每秒请求数上限，0 为不限制")
+    args = parser.parse_args()
+
+    config = FakeUpstreamConfig(args.latency_ms, args.error_rate, args.rate_limit)
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
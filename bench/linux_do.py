@@ -0,0 +1,49 @@
+"""指向模拟服务的 Linux.do 客户端
+
+linux_do_connect.LinuxDoConnect 内置了 connect.linux.do 的地址，基准测试时以本类替换
+bohe_sign.linux_do.LinuxDoConnect，提供相同的 login / get_connect_token / approve_oauth /
+session.cookies 接口，请求发往 bench.fake_upstream 的 /connect 接口。
+"""
+
+from typing import Optional, Tuple
+
+from bohe_sign.session import IMPERSONATE, get_session
+from bohe_sign.sign import UPSTREAM_URL
+
+
+class _Cookies(dict):
+    def set(self, name: str, value: str, domain: Optional[str] = None) -> None:
+        self[name] = value
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.cookies = _Cookies()
+
+
+class BenchLinuxDoConnect:
+    """模拟服务上的 Linux.do 客户端"""
+
+    def __init__(self) -> None:
+        self.session = _Session()
+        self._token = ""
+
+    async def login(self, token: str) -> "BenchLinuxDoConnect":
+        self._token = token
+        return self
+
+    async def get_connect_token(self) -> Tuple[str, str]:
+        url = f"{UPSTREAM_URL}/connect/login"
+        r = await get_session(url).post(url, json={"token": self._token}, impersonate=IMPERSONATE)
+        r.raise_for_status()
+        data = r.json()
+        return data["connect_token"], data["token"]
+
+    async def approve_oauth(self, auth_url: str) -> Optional[str]:
+        r = await get_session(auth_url).get(
+            auth_url,
+            cookies=dict(self.session.cookies),
+            impersonate=IMPERSONATE,
+            allow_redirects=False
+        )
+        return r.headers.get("Location")
@@ -0,0 +1,345 @@
+"""端到端负载基准测试
+
+启动本地模拟上游（bench.fake_upstream），通过 BOHE_UPSTREAM_URL 将客户端指向它，
+在不同账号规模下驱动签到、转盘、Token 刷新和 Web 接口，输出吞吐量、p50/p99 延迟
+和峰值内存（RSS）到 JSON 文件，便于在不同提交之间对比：
+
+    python -m bench.run --accounts 1,100,1000,10000 --latency-ms 20 --output bench_result.json
+
+每个（规模, 场景）组合都在独立的子进程与临时数据目录中运行，峰值内存只反映该组合，
+不会读写项目的 ./data。
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("sign", "spin", "refresh", "web")
+WEB_PATHS = ("/api/dashboard", "/api/sign/status", "/api/token/status", "/api/sign/logs")
+BACKGROUND_GRACE = 5  # 每个组合结束后等待后台任务的时间（秒）
+
+# (延迟列表（毫秒）, 成功数, 总耗时（秒）)
+Measurement = Tuple[List[float], int, float]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="端到端负载基准测试")
+    parser.add_argument("--accounts", default="1,10,100,1000",
+                        help="逗号分隔的账号规模列表，例如 1,100,10000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"逗号分隔的场景列表，可选 {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=64, help="客户端并发上限")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json", help="存储后端")
+    parser.add_argument("--latency-ms", type=float, default=20, help="模拟上游的平均延迟（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0, help="模拟上游返回 500 的概率")
+    parser.add_argument("--rate-limit", type=float, default=0, help="模拟上游每秒请求数上限，0 为不限制")
+    parser.add_argument("--port", type=int, default=18080, help="模拟上游监听端口")
+    parser.add_argument("--upstream-url", default="",
+                        help="使用已运行的模拟上游，不再自动启动")
+    parser.add_argument("--output", default="bench_result.json", help="结果 JSON 文件路径")
+    parser.add_argument("--verbose", action="store_true", help="保留应用自身的控制台输出")
+    # 子进程内部使用：在当前目录运行单个组合（场景:账号数），结果 JSON 输出到标准输出
+    parser.add_argument("--case", default="", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def _get_json(url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(url, timeout=2) as response:
+        return json.loads(response.read())
+
+
+def start_fake_upstream(args: argparse.Namespace) -> subprocess.Popen:
+    """在子进程中启动模拟上游并等待就绪"""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "bench.fake_upstream",
+            "--port", str(args.port),
+            "--latency-ms", str(args.latency_ms),
+            "--error-rate", str(args.error_rate),
+            "--rate-limit", str(args.rate_limit)
+        ],
+        cwd=REPO_DIR
+    )
+    url = f"http://127.0.0.1:{args.port}/__stats"
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("模拟上游启动失败")
+        try:
+            _get_json(url)
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("等待模拟上游就绪超时")
+
+
+def seed_accounts(count: int, valid: bool) -> List[str]:
+    """在当前目录的 ./data 下写入账号 Token（SQLite 后端首次打开时会自动迁移）"""
+    from bench.fake_upstream import issue_token
+    from store.backend import DEFAULT_ACCOUNT
+
+    accounts = [DEFAULT_ACCOUNT] + [f"bench-{i:05d}" for i in range(1, count)]
+    records = {}
+    for account in accounts:
+        records[account] = {
+            "bohe_sign_token": issue_token(account) if valid else f"invalid-{account}",
+            "linux_do_connect_token": f"connect-{account}",
+            "linux_do_token": f"ld-{account}"
+        }
+
+    os.makedirs("data", exist_ok=True)
+    with open("data/token.json", "w", encoding="utf-8") as f:
+        json.dump(records.pop(DEFAULT_ACCOUNT), f)
+    with open("data/accounts.json", "w", encoding="utf-8") as f:
+        json.dump(records, f)
+    return accounts
+
+
+async def _timed_gather(items: List[Any], concurrency: int,
+                        fn: Callable[[Any], Any]) -> Measurement:
+    """在并发上限内对每个元素执行 fn，记录各自耗时；fn 返回真值视为成功"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(item: Any) -> Tuple[float, bool]:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = bool(await fn(item))
+            except Exception:
+                ok = False
+            return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(run_one(item) for item in items))
+    wall_time = time.perf_counter() - started
+    return [round(latency, 2) for latency, _ in results], sum(1 for _, ok in results if ok), wall_time
+
+
+async def bench_sign(accounts: List[str], concurrency: int) -> Measurement:
+    from bohe_sign.batch import sign_accounts
+
+    started = time.perf_counter()
+    batch = await sign_accounts(accounts, trigger="bench")
+    wall_time = time.perf_counter() - started
+    results = batch["results"]
+    return [r["latency_ms"] for r in results], sum(1 for r in results if r["success"]), wall_time
+
+
+async def bench_spin(accounts: List[str], concurrency: int) -> Measurement:
+    from bohe_sign.sign import spin
+    from store.token import load_tokens
+
+    tokens = [load_tokens(account)["bohe_sign_token"] for account in accounts]
+
+    async def spin_one(token: str) -> bool:
+        return (await spin(token)).get("success")
+
+    return await _timed_gather(tokens, concurrency, spin_one)
+
+
+async def bench_refresh(accounts: List[str], concurrency: int) -> Measurement:
+    from bohe_sign.login import get_bohe_token
+
+    async def refresh_one(account: str) -> bool:
+        bohe_token, _, _ = await get_bohe_token(account=account)
+        return bohe_token is not None
+
+    return await _timed_gather(accounts, concurrency, refresh_one)
+
+
+async def bench_web(accounts: List[str], concurrency: int) -> Measurement:
+    import httpx
+    from web.app import app
+
+    requests = [
+        (WEB_PATHS[i % len(WEB_PATHS)], account) for i, account in enumerate(accounts)
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def get_one(item: Tuple[str, str]) -> bool:
+            path, account = item
+            r = await client.get(path, params={"account": account})
+            return r.status_code == 200
+
+        return await _timed_gather(requests, concurrency, get_one)
+
+
+BENCHMARKS = {
+    "sign": (bench_sign, True),
+    "spin": (bench_spin, True),
+    "refresh": (bench_refresh, False),  # 以失效的薄荷 Token 开始，触发完整刷新流程
+    "web": (bench_web, True)
+}
+
+
+def peak_rss_mb() -> float:
+    """进程至今的峰值 RSS（MB），每个组合在独立的子进程中运行，即该组合的峰值"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(usage / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_case(scenario: str, count: int, concurrency: int) -> Dict[str, Any]:
+    """在当前目录中运行一个（规模, 场景）组合"""
+    import bench.linux_do
+    import bohe_sign.linux_do
+    from bohe_sign.batch import summarize
+    from bohe_sign.limiter import set_host_limits
+    from bohe_sign.linux_do import close_clients
+    from bohe_sign.resilience import reset_breakers
+    from bohe_sign.session import close_sessions
+    from bohe_sign.sign import UPSTREAM_URL
+    from store.backend import close_backend
+    from store.writer import flush_writes
+
+    fn, valid = BENCHMARKS[scenario]
+    bohe_sign.linux_do.LinuxDoConnect = bench.linux_do.BenchLinuxDoConnect
+    reset_breakers()
+    # 基准测试不限速，按给定并发驱动上游
+    set_host_limits(UPSTREAM_URL, concurrency, 0)
+    accounts = seed_accounts(count, valid)
+
+    try:
+        latencies, succeeded, wall_time = await fn(accounts, concurrency)
+    finally:
+        # 等待签到后触发的用户信息刷新等后台任务结束（curl_cffi 的常驻任务随会话关闭）
+        pending = asyncio.all_tasks() - {asyncio.current_task()}
+        if pending:
+            await asyncio.wait(pending, timeout=BACKGROUND_GRACE)
+        await close_clients()
+        await flush_writes()
+        await close_sessions()
+        close_backend()
+
+    summary = summarize(latencies, succeeded, wall_time)
+    return {
+        "scenario": scenario,
+        "accounts": count,
+        "requests": summary["total"],
+        "succeeded": summary["succeeded"],
+        "failed": summary["failed"],
+        "wall_time_s": round(wall_time, 3),
+        "throughput_rps": round(summary["total"] / wall_time, 2) if wall_time > 0 else None,
+        "p50_ms": summary["p50_ms"],
+        "p99_ms": summary["p99_ms"],
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_case_process(scenario: str, count: int, args: argparse.Namespace, case_dir: str) -> Dict[str, Any]:
+    """在子进程中运行一个组合，返回其结果"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_DIR, env.get("PYTHONPATH")]))
+    command = [
+        sys.executable, "-m", "bench.run",
+        "--case", f"{scenario}:{count}",
+        "--concurrency", str(args.concurrency)
+    ]
+    if args.verbose:
+        command.append("--verbose")
+    proc = subprocess.run(command, cwd=case_dir, env=env, stdout=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(f"组合 {scenario} x {count} 运行失败，退出码 {proc.returncode}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_single_case(args: argparse.Namespace) -> None:
+    """子进程入口：运行 --case 指定的组合，结果 JSON 输出到标准输出"""
+    scenario, count = args.case.split(":")
+    with open(os.devnull, "w") as devnull:
+        # 应用自身的输出不能混入标准输出中的结果
+        with contextlib.redirect_stdout(sys.stderr if args.verbose else devnull):
+            result = asyncio.run(run_case(scenario, int(count), args.concurrency))
+    print(json.dumps(result, ensure_ascii=False))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main() -> None:
+    args = parse_args()
+    if args.case:
+        run_single_case(args)
+        return
+    scales = [int(value) for value in args.accounts.split(",") if value.strip()]
+    scenarios = [value.strip() for value in args.scenarios.split(",") if value.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"未知场景: {', '.join(sorted(unknown))}")
+
+    output = os.path.abspath(args.output)
+    server = None if args.upstream_url else start_fake_upstream(args)
+    upstream_url = args.upstream_url or f"http://127.0.0.1:{args.port}"
+
+    # 由各组合的子进程继承
+    os.environ["BOHE_UPSTREAM_URL"] = upstream_url
+    os.environ["BOHE_STORE_BACKEND"] = args.backend
+
+    workdir = tempfile.mkdtemp(prefix="bohe-bench-")
+    results = []
+    try:
+        for count in scales:
+            for scenario in scenarios:
+                case_dir = os.path.join(workdir, f"{scenario}-{count}")
+                os.makedirs(case_dir)
+                result = run_case_process(scenario, count, args, case_dir)
+                results.append(result)
+                print(
+                    f"{scenario:>8} x {count:<6} {result['throughput_rps']} req/s  "
+                    f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  "
+                    f"failed {result['failed']}  rss {result['peak_rss_mb']} MB",
+                    file=sys.stderr
+                )
+        upstream_stats = _get_json(f"{upstream_url}/__stats")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    artifact = {
+        "meta": {
+            "commit": git_commit(),
+            "time": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": args.backend,
+            "concurrency": args.concurrency,
+            "upstream": {
+                "url": upstream_url,
+                "latency_ms": args.latency_ms,
+                "error_rate": args.error_rate,
+                "rate_limit": args.rate_limit,
+                "stats": upstream_stats
+            }
+        },
+        "results": results
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
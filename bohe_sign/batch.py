@@ -0,0 +1,262 @@
+"""多账号并发签到 / 批量抽奖引擎
+
+发往同一上游主机的全部请求共用该主机的限制器（见 bohe_sign.limiter），并发与
+速率上限不会因同时进行多个批次或其它请求而叠加；单次调用的 concurrency / rate
+只能在主机上限之内进一步收窄。
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from bohe_sign.limiter import HostLimiter, get_host_limits
+from bohe_sign.sign import SIGN_API, SPIN_API, do_sign, spin
+from store.token import list_accounts
+
+MAX_SPINS_PER_TOKEN = 20  # 批量抽奖时单个 Token 的抽奖次数上限
+MAX_BATCH_ITEMS = 1000  # 单个批量请求中账号 / Token 数上限
+
+# 流式签到的输入项：账号名，或 (账号名, 本次使用的 Token)
+StreamItem = Union[str, Tuple[str, Dict[str, str]]]
+
+
+class BatchLimiter:
+    """单次批量调用的限制器
+
+    每次上游请求都会在 bohe_sign.resilience.request 中占用主机共用的限制器，
+    这里只按本次调用的参数进一步收窄：同时进行的条目数不超过 concurrency，
+    指定 rate 时条目的启动速率不超过 rate。
+    """
+
+    def __init__(self, url: str, concurrency: Optional[int] = None, rate: Optional[float] = None) -> None:
+        """
+        Args:
+            url: 上游地址
+            concurrency: 本次调用的并发上限，不超过主机上限
+            rate: 本次调用的每秒请求数上限，None 或 <= 0 表示只受主机上限约束
+        """
+        host_concurrency, host_rate = get_host_limits(url)
+        self.concurrency = min(concurrency or host_concurrency, host_concurrency)
+        narrower_rate = bool(rate and rate > 0 and (host_rate <= 0 or rate < host_rate))
+        self.own = HostLimiter(self.concurrency, rate if narrower_rate else 0)
+
+    async def __aenter__(self) -> "BatchLimiter":
+        await self.own.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.own.__aexit__()
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """按最近秩法计算百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], succeeded: int, wall_time: float) -> Dict[str, Any]:
+    """汇总一批请求的耗时统计（单位：毫秒）"""
+    return {
+        "total": len(latencies),
+        "succeeded": succeeded,
+        "failed": len(latencies) - succeeded,
+        "wall_time_ms": round(wall_time * 1000, 2),
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99)
+    }
+
+
+async def _sign_one(
+    limiter: BatchLimiter,
+    account: str,
+    trigger: str,
+    tokens: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    async with limiter:
+        started = time.perf_counter()
+        try:
+            result = await do_sign(trigger=trigger, account=account, tokens=tokens)
+        except Exception as e:
+            result = {"success": False, "message": f"签到请求异常: {str(e)}"}
+        elapsed = (time.perf_counter() - started) * 1000
+
+    return {
+        "account": account,
+        "success": bool(result.get("success")),
+        "message": result.get("message", ""),
+        "latency_ms": round(elapsed, 2)
+    }
+
+
+async def sign_accounts(
+    accounts: Optional[List[str]] = None,
+    trigger: str = "batch",
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None
+) -> Dict[str, Any]:
+    """并发为多个账号执行签到
+
+    Args:
+        accounts: 要签到的账号列表，默认为全部账号
+        trigger: 触发方式
+        concurrency: 本次的并发请求上限（不超过主机上限）
+        rate: 本次的每秒请求数上限，None 或 <= 0 表示只受主机上限约束
+
+    Returns:
+        包含每个账号结果 results 和批次汇总 summary 的字典
+    """
+    if accounts is None:
+        accounts = list_accounts()
+
+    limiter = BatchLimiter(SIGN_API, concurrency, rate)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_sign_one(limiter, account, trigger) for account in accounts))
+    wall_time = time.perf_counter() - started
+
+    succeeded = sum(1 for r in results if r["success"])
+    return {
+        "results": list(results),
+        "summary": summarize([r["latency_ms"] for r in results], succeeded, wall_time)
+    }
+
+
+async def _iterate(items: Union[Iterable[StreamItem], AsyncIterable[StreamItem]]) -> AsyncIterator[StreamItem]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def sign_stream(
+    accounts: Union[Iterable[StreamItem], AsyncIterable[StreamItem]],
+    trigger: str = "batch",
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """流式为账号执行签到，按完成顺序逐个产出结果
+
+    账号按需从 accounts 中读取，同时进行的签到不超过并发上限，
+    不保留已产出的结果，内存占用与账号总数无关。
+
+    Args:
+        accounts: 账号名或 (账号名, Token) 的可迭代对象，可以是异步迭代器（如在线程中逐块读取文件）
+        trigger: 触发方式
+        concurrency: 同时进行的签到数上限（不超过主机上限）
+        rate: 本次的每秒请求数上限，None 或 <= 0 表示只受主机上限约束
+
+    Yields:
+        与 sign_accounts 中 results 的元素格式相同的单个账号结果
+    """
+    limiter = BatchLimiter(SIGN_API, concurrency, rate)
+    remaining = _iterate(accounts)
+    pending: set = set()
+    exhausted = False
+    try:
+        while True:
+            # 补足在途任务后再等待，未读取的账号不会提前创建任务
+            while not exhausted and len(pending) < limiter.concurrency:
+                item = await anext(remaining, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    account, tokens = (item, None) if isinstance(item, str) else item
+                    pending.add(asyncio.create_task(_sign_one(limiter, account, trigger, tokens)))
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await remaining.aclose()
+
+
+async def spin_tokens(
+    items: List[Tuple[str, int]],
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None
+) -> Dict[str, Any]:
+    """并发为多个 Token 执行转盘抽奖
+
+    不同 Token 之间并发执行；同一 Token 的多次抽奖依次执行，
+    某次抽奖失败（如次数已用完）后不再继续该 Token 剩余的抽奖。
+
+    Args:
+        items: (Token, 抽奖次数) 列表
+        concurrency: 本次的并发请求上限（不超过主机上限）
+        rate: 本次的每秒请求数上限，None 或 <= 0 表示只受主机上限约束
+
+    Returns:
+        包含每个 Token 结果 results、奖品统计 prizes、失败原因统计 failures
+        和批次汇总 summary 的字典；结果按请求顺序以 index 标识，不回显 Token
+    """
+    limiter = BatchLimiter(SPIN_API, concurrency, rate)
+    latencies: List[float] = []
+
+    async def spin_one(token: str) -> Dict[str, Any]:
+        async with limiter:
+            started = time.perf_counter()
+            try:
+                result = await spin(token)
+            except Exception as e:
+                result = {"success": False, "message": f"Spin request exception: {str(e)}"}
+            latencies.append(round((time.perf_counter() - started) * 1000, 2))
+        return result
+
+    async def spin_token(index: int, token: str, count: int) -> Dict[str, Any]:
+        spins = []
+        for _ in range(count):
+            result = await spin_one(token)
+            spins.append({
+                "success": bool(result.get("success")),
+                "message": result.get("message", ""),
+                "prize": (result.get("data") or {}).get("prize")
+            })
+            if not spins[-1]["success"]:
+                break
+
+        succeeded = sum(1 for s in spins if s["success"])
+        return {
+            "index": index,
+            "requested": count,
+            "succeeded": succeeded,
+            "failed": len(spins) - succeeded,
+            "skipped": count - len(spins),
+            "spins": spins
+        }
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        spin_token(index, token, max(0, min(count, MAX_SPINS_PER_TOKEN)))
+        for index, (token, count) in enumerate(items)
+    ))
+    wall_time = time.perf_counter() - started
+
+    prizes: Counter = Counter()
+    failures: Counter = Counter()
+    for result in results:
+        for s in result["spins"]:
+            if s["success"]:
+                # 上游未返回奖品字段时以提示信息归类
+                prizes[str(s["prize"]) if s["prize"] is not None else (s["message"] or "unknown")] += 1
+            else:
+                failures[s["message"] or "unknown"] += 1
+
+    summary = summarize(latencies, sum(prizes.values()), wall_time)
+    summary["tokens"] = len(results)
+    summary["skipped"] = sum(r["skipped"] for r in results)
+    return {
+        "results": list(results),
+        "prizes": dict(prizes),
+        "failures": dict(failures),
+        "summary": summary
+    }
@@ -0,0 +1,165 @@
+"""带 TTL 与后台刷新（stale-while-revalidate）的内存缓存"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, Set, Tuple, TypeVar
+
+from bohe_sign.singleflight import SingleFlight
+
+T = TypeVar("T")
+
+# 根据加载结果返回 (新鲜期秒数, 过期后仍可返回旧值的秒数)
+TtlPolicy = Callable[[Any], Tuple[float, float]]
+
+
+@dataclass
+class CacheEntry(Generic[T]):
+    """缓存条目"""
+    value: T
+    stored_at: float
+    fresh_until: float
+    stale_until: float
+
+
+class SWRCache(Generic[T]):
+    """TTL 缓存
+
+    - 新鲜期内直接返回缓存值
+    - 新鲜期过后、陈旧期内返回旧值，同时在后台重新加载
+    - 超过陈旧期或无缓存时同步加载
+    """
+
+    def __init__(self, policy: TtlPolicy) -> None:
+        self.policy = policy
+        self._entries: Dict[str, CacheEntry[T]] = {}
+        self._loads: SingleFlight[T] = SingleFlight()
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def set(self, key: str, value: T) -> CacheEntry[T]:
+        """写入缓存值，TTL 由策略决定"""
+        now = time.monotonic()
+        fresh, stale = self.policy(value)
+        entry = CacheEntry(
+            value=value,
+            stored_at=now,
+            fresh_until=now + max(0.0, fresh),
+            stale_until=now + max(0.0, fresh) + max(0.0, stale)
+        )
+        self._entries[key] = entry
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry[T]]:
+        """获取缓存条目（不触发加载，不论是否过期）"""
+        return self._entries.get(key)
+
+    def invalidate(self, key: str) -> None:
+        """删除缓存条目"""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def age(self, key: str) -> Optional[float]:
+        """返回缓存值的存在时长（秒），无缓存时返回 None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return time.monotonic() - entry.stored_at
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        async def load_and_store() -> T:
+            value = await loader()
+            self.set(key, value)
+            return value
+
+        # 同一键的并发加载只请求一次
+        return await self._loads.do(key, load_and_store)
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable[T]]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def runner() -> None:
+            try:
+                await self._load(key, loader)
+            except Exception as e:
+                print(f"Background cache refresh failed: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(runner())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[T]]) -> T:
+        """读取缓存，必要时加载或后台刷新
+
+        Args:
+            key: 缓存键
+            loader: 无缓存或需刷新时调用的加载函数
+
+        Returns:
+            缓存值
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None:
+            if now < entry.fresh_until:
+                self.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self.stale_hits += 1
+                self._refresh_in_background(key, loader)
+                return entry.value
+
+        self.misses += 1
+        return await self._load(key, loader)
+
+    def get_nowait(self, key: str, loader: Callable[[], Awaitable[T]]) -> Optional[CacheEntry[T]]:
+        """立即返回缓存条目，不等待加载
+
+        新鲜期过后或无缓存时在后台加载；超过陈旧期的条目不再返回。
+
+        Args:
+            key: 缓存键
+            loader: 加载函数
+
+        Returns:
+            可用的缓存条目，没有时返回 None
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+
+        if entry is not None and now < entry.fresh_until:
+            self.hits += 1
+            return entry
+
+        self._refresh_in_background(key, loader)
+        if entry is not None and now < entry.stale_until:
+            self.stale_hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    def refresh(self, key: str, loader: Callable[[], Awaitable[T]]) -> None:
+        """在后台立即重新加载"""
+        self._refresh_in_background(key, loader)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存命中统计"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing)
+        }
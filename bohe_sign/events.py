@@ -0,0 +1,182 @@
+"""进程内事件总线
+
+签到结果、新日志、Token 有效性变化、定时任务变化等事件通过 publish() 发布，
+Web 层的 SSE 端点为每个连接订阅一个队列并推送给浏览器。无订阅者时发布为空操作。
+
+多个 worker 共用存储时（见 store.lock.multiprocess_enabled），事件还会经 EventRelay
+追加到共用的 RELAY_FILE，其它进程读取后发布到各自的事件总线，SSE 连接到任一 worker
+都能收到主进程的定时签到、日志与定时任务事件。
+"""
+
+import asyncio
+import json
+import os
+from typing import IO, Any, Dict, Optional, Set, Tuple
+
+from store.lock import multiprocess_enabled
+
+MAX_QUEUE_SIZE = 100  # 单个订阅者最多缓存的事件数，超出时丢弃最旧的事件
+
+RELAY_FILE = "./data/events.jsonl"
+RELAY_INTERVAL = 0.5  # 读取其它进程事件的间隔（秒）
+MAX_RELAY_BYTES = 1024 * 1024  # 转发文件超过该大小时轮换
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class EventBus:
+    """简单的发布 / 订阅事件总线（仅在事件循环线程中使用）"""
+
+    def __init__(self, max_queue_size: int = MAX_QUEUE_SIZE) -> None:
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.published = 0
+
+    def subscribe(self) -> "asyncio.Queue[Event]":
+        """新增订阅者，返回其事件队列"""
+        queue: asyncio.Queue = asyncio.Queue(self.max_queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """移除订阅者"""
+        self._subscribers.discard(queue)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """向全部订阅者发布事件"""
+        self.published += 1
+        for queue in list(self._subscribers):
+            if queue.full():
+                # 订阅者处理过慢，丢弃最旧的事件
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait((event, data))
+
+    def subscriber_count(self) -> int:
+        """当前订阅者数量"""
+        return len(self._subscribers)
+
+
+class EventRelay:
+    """经共用的追加文件在进程间转发事件
+
+    每个进程把自身发布的事件（附带 pid）追加到文件末尾，并每隔 interval 秒读取新追加的
+    其它进程的事件，发布到本进程的事件总线。文件超过 MAX_RELAY_BYTES 时重命名为 .1，
+    读取方读完旧文件剩余的内容后从新文件开头继续。
+    """
+
+    def __init__(self, target: EventBus, path: str = RELAY_FILE, interval: float = RELAY_INTERVAL) -> None:
+        self.bus = target
+        self.path = path
+        self.interval = interval
+        self.enabled = False
+        self.relayed = 0
+        self._file: Optional[IO[bytes]] = None
+        self._inode: Optional[int] = None
+        self._buffer = b""
+        self._task: Optional[asyncio.Task] = None
+
+    def write(self, event: str, data: Dict[str, Any]) -> None:
+        """把本进程发布的事件追加到转发文件"""
+        if not self.enabled:
+            return
+        line = json.dumps({"pid": os.getpid(), "event": event, "data": data}, ensure_ascii=False) + "\n"
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > MAX_RELAY_BYTES:
+                os.replace(self.path, self.path + ".1")
+            # O_APPEND 的单次小写入不会与其它进程的写入交错
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode("utf-8"))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"Error relaying event: {e}")
+
+    def _open(self, at_end: bool) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file, self._inode, self._buffer = None, None, b""
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        if at_end:
+            self._file.seek(0, os.SEEK_END)
+
+    def _drain(self) -> int:
+        if self._file is None:
+            return 0
+        self._buffer += self._file.read()
+        *lines, self._buffer = self._buffer.split(b"\n")
+        count = 0
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("pid") == os.getpid():
+                continue
+            self.bus.publish(record["event"], record["data"])
+            count += 1
+        self.relayed += count
+        return count
+
+    def poll(self) -> int:
+        """发布其它进程新追加的事件，返回转发的事件数"""
+        count = self._drain()
+        try:
+            inode: Optional[int] = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode != self._inode:
+            # 文件已轮换（或首次出现）：旧文件已读完，从新文件开头读取
+            self._open(at_end=False)
+            count += self._drain()
+        return count
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error reading relayed events: {e}")
+
+    def start(self) -> None:
+        """多个进程共用存储时开始转发（只转发此后发布的事件）"""
+        if not multiprocess_enabled() or self._task is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.enabled = True
+        self._open(at_end=True)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """停止转发"""
+        self.enabled = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+bus = EventBus()
+relay = EventRelay(bus)
+
+
+def publish(event: str, data: Dict[str, Any]) -> None:
+    """向全局事件总线发布事件（多进程时同时转发给其它进程）"""
+    bus.publish(event, data)
+    relay.write(event, data)
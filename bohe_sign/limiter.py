@@ -0,0 +1,126 @@
+"""上游主机的并发与速率限制
+
+每个上游主机一个进程级共用的限制器（信号量 + 令牌桶）。发往上游的每次请求
+（每次重试尝试）都在 bohe_sign.resilience.request 中占用所属主机的限制器，
+因此定时签到、手动签到、Token 刷新和批量调用同时进行时也不会超过主机上限。
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Tuple
+
+from bohe_sign.session import _host_of
+
+MAX_CONCURRENCY = 8  # 每个上游主机同时进行的请求数上限
+MAX_RATE = 5.0  # 每个上游主机每秒请求数上限
+PREPAID_HOLD = 10.0  # 预取的令牌在预取截止后仍可使用的时长（秒）
+
+
+class HostLimiter:
+    """单个上游主机的并发与速率限制器（信号量 + 令牌桶）"""
+
+    def __init__(self, concurrency: int, rate: float) -> None:
+        self.concurrency = max(1, concurrency)
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+        # 提前取得、尚未使用的令牌及其失效时间（time.monotonic()）
+        self.prepaid = 0
+        self.prepaid_until = 0.0
+
+    async def _take_token(self, use_prepaid: bool = True) -> None:
+        """按速率获取一个令牌，不足时等待；use_prepaid 时优先使用预取的令牌"""
+        if self.rate <= 0:
+            return
+        if use_prepaid and self.prepaid > 0 and time.monotonic() < self.prepaid_until:
+            self.prepaid -= 1
+            return
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    async def prepay(self, count: int, timeout: float, hold: float = PREPAID_HOLD) -> int:
+        """提前按速率取得至多 count 个令牌，之后的请求先使用这些令牌而不再等待令牌桶
+
+        令牌仍按主机速率取得，长期来看不会超过速率上限；用于需要在某一时刻集中
+        发出请求的场景（如精确模式的定时签到）。
+
+        Args:
+            count: 需要的令牌数
+            timeout: 最多等待的秒数，到时返回已取得的数量
+            hold: 预取截止后令牌仍可使用的秒数，过期未用的令牌作废
+
+        Returns:
+            取得的令牌数
+        """
+        if self.rate <= 0:
+            return count
+        deadline = time.monotonic() + timeout
+        taken = 0
+        while taken < count:
+            try:
+                await asyncio.wait_for(self._take_token(use_prepaid=False), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
+            taken += 1
+        if time.monotonic() >= self.prepaid_until:
+            self.prepaid = 0
+        self.prepaid += taken
+        self.prepaid_until = max(deadline, time.monotonic()) + hold
+        return taken
+
+    async def __aenter__(self) -> "HostLimiter":
+        await self.semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.semaphore.release()
+
+
+# 上游主机 -> (并发上限, 每秒请求数上限)，未设置的主机使用 MAX_CONCURRENCY / MAX_RATE
+_host_limits: Dict[str, Tuple[int, float]] = {}
+# 上游主机 -> (所属事件循环, 限制器)
+_host_limiters: Dict[str, Tuple[asyncio.AbstractEventLoop, HostLimiter]] = {}
+
+
+def set_host_limits(url: str, concurrency: int, rate: float) -> None:
+    """设置上游主机的并发与速率上限（如命令行按参数调整本进程的上限）
+
+    Args:
+        url: 上游地址（按其中的主机区分）
+        concurrency: 同时进行的请求数上限
+        rate: 每秒请求数上限，<= 0 表示不限速
+    """
+    host = _host_of(url)
+    _host_limits[host] = (concurrency, rate)
+    _host_limiters.pop(host, None)
+
+
+def get_host_limits(url: str) -> Tuple[int, float]:
+    """获取上游主机的 (并发上限, 每秒请求数上限)"""
+    return _host_limits.get(_host_of(url), (MAX_CONCURRENCY, MAX_RATE))
+
+
+def host_limiter(url: str) -> HostLimiter:
+    """获取上游主机共用的限制器（限制器与当前事件循环绑定）"""
+    host = _host_of(url)
+    loop = asyncio.get_running_loop()
+    entry = _host_limiters.get(host)
+    if entry is None or entry[0] is not loop:
+        entry = (loop, HostLimiter(*get_host_limits(url)))
+        _host_limiters[host] = entry
+    return entry[1]
@@ -0,0 +1,141 @@
+"""Linux.do 客户端池
+
+为每个账号保留一个 LinuxDoConnect 客户端，跨多次 Token 刷新复用其连接与 Cookie，
+并将 Cookie 持久化到存储后端（见 store.cookies），进程重启后仍可继续使用未过期的
+connect.linux.do 登录会话，无需重新执行完整登录。
+
+linux_do_connect 在首次创建客户端时才导入。客户端与创建它的事件循环绑定；池中最多
+保留 MAX_CLIENTS 个客户端，按最近使用淘汰，被淘汰账号的 Cookie 已持久化，下次使用时重新加载。
+"""
+
+import asyncio
+import inspect
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from store.backend import run_write
+from store.cookies import load_cookies, save_cookies
+
+CONNECT_DOMAIN = "connect.linux.do"
+SESSION_COOKIE = "auth.session-token"
+MAX_CLIENTS = 64  # 池中保留的客户端数上限
+
+# 客户端类，首次使用时从 linux_do_connect 导入
+LinuxDoConnect: Any = None
+
+# 账号 -> (所属事件循环, 客户端)
+_clients: "OrderedDict[str, Tuple[asyncio.AbstractEventLoop, Any]]" = OrderedDict()
+
+
+def _new_client() -> Any:
+    global LinuxDoConnect
+    if LinuxDoConnect is None:
+        from linux_do_connect import LinuxDoConnect as client_class
+        LinuxDoConnect = client_class
+    return LinuxDoConnect()
+
+
+def dump_cookies(cookies: Any) -> List[Dict[str, Any]]:
+    """导出客户端 Cookie 为可序列化的列表"""
+    jar = getattr(cookies, "jar", None)
+    if jar is None:
+        return [
+            {"name": name, "value": value, "domain": CONNECT_DOMAIN, "path": "/", "expires": None}
+            for name, value in dict(cookies).items()
+        ]
+    return [
+        {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires}
+        for c in jar if c.value is not None
+    ]
+
+
+def restore_cookies(cookies: Any, saved: List[Dict[str, Any]]) -> int:
+    """将保存的 Cookie 写回客户端，跳过已过期的，返回恢复的条数"""
+    now = time.time()
+    restored = 0
+    for cookie in saved:
+        expires = cookie.get("expires")
+        if expires is not None and expires <= now:
+            continue
+        cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain") or CONNECT_DOMAIN)
+        restored += 1
+    return restored
+
+
+def _find_session_token(saved: List[Dict[str, Any]]) -> Optional[str]:
+    now = time.time()
+    for cookie in saved:
+        expires = cookie.get("expires")
+        if cookie["name"] == SESSION_COOKIE and (expires is None or expires > now):
+            return cookie["value"]
+    return None
+
+
+def client_session_token(client: Any) -> Optional[str]:
+    """客户端当前持有的 connect.linux.do 会话 Cookie"""
+    return _find_session_token(dump_cookies(client.session.cookies))
+
+
+def saved_session_token(account: str) -> Optional[str]:
+    """账号的 connect.linux.do 会话 Cookie（优先取池中客户端，其次取已保存的 Cookie）"""
+    entry = _clients.get(account)
+    if entry is not None:
+        return client_session_token(entry[1])
+    return _find_session_token(load_cookies(account))
+
+
+async def _close_client(client: Any) -> None:
+    close = getattr(client.session, "close", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        print(f"Error closing Linux.do client: {e}")
+
+
+async def get_client(account: Optional[str] = None) -> Any:
+    """获取账号的 Linux.do 客户端，未指定账号时返回不入池的新客户端"""
+    if account is None:
+        return _new_client()
+
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(account)
+    if entry is not None and entry[0] is loop:
+        _clients.move_to_end(account)
+        return entry[1]
+
+    client = _new_client()
+    restore_cookies(client.session.cookies, load_cookies(account))
+    _clients[account] = (loop, client)
+    _clients.move_to_end(account)
+
+    while len(_clients) > MAX_CLIENTS:
+        _, (owner_loop, evicted) = _clients.popitem(last=False)
+        if owner_loop is loop:
+            await _close_client(evicted)
+    return client
+
+
+async def persist_client(account: Optional[str], client: Any) -> None:
+    """保存客户端的 Cookie"""
+    if account is not None:
+        await run_write(save_cookies, dump_cookies(client.session.cookies), account=account)
+
+
+async def close_clients() -> None:
+    """关闭池中的全部客户端"""
+    entries = list(_clients.values())
+    _clients.clear()
+    loop = asyncio.get_running_loop()
+    for owner_loop, client in entries:
+        if owner_loop is loop:
+            await _close_client(client)
+
+
+def get_client_stats() -> Dict[str, Any]:
+    """客户端池状态"""
+    return {"clients": len(_clients), "max_clients": MAX_CLIENTS}
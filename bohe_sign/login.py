@@ -1,68 +1,121 @@
+import asyncio
 import traceback
+from typing import TYPE_CHECKING
 from http import HTTPStatus
 from urllib.parse import urlparse, parse_qs
-from curl_cffi import requests, Response
-from store.token import load_tokens, save_tokens
-from linux_do_connect import LinuxDoConnect
+from bohe_sign.linux_do import (
+    CONNECT_DOMAIN, SESSION_COOKIE, client_session_token, get_client, persist_client, saved_session_token
+)
+from bohe_sign.metrics import TOKEN_REFRESH_REQUESTS, TOKEN_REFRESH_TOTAL, track_upstream
+from bohe_sign.resilience import request
+from bohe_sign.sign import AUTH_LOGIN_API, USER_INFO_API
+from bohe_sign.singleflight import SingleFlight
+from bohe_sign.tracing import tracer
+from bohe_sign.token_cache import cached_verify, mark_token_valid
+from store.backend import run_write
+from store.token import DEFAULT_ACCOUNT, load_tokens, save_tokens
+
+if TYPE_CHECKING:
+    from curl_cffi import Response
 
 IMPERSONATE = "chrome"
+LINUX_DO_TIMEOUT = 30.0  # Linux.do 各步骤（登录、授权）的超时（秒）
+
+# 同一账号（及同一登录凭据）的并发刷新只执行一次 OAuth 流程
+_refresh_flight: SingleFlight[tuple[str | None, str | None, str | None]] = SingleFlight()
 
-async def verify_bohe_token(token: str) -> bool:
+async def verify_bohe_token(token: str, use_cache: bool = True) -> bool:
     if not token:
         return False
-    
-    url = "https://up.x666.me/api/user/info"
-    
+
+    if use_cache:
+        return await cached_verify(token, _request_verify_bohe_token)
+    return await _request_verify_bohe_token(token)
+
+async def _request_verify_bohe_token(token: str) -> bool:
     try:
-        async with requests.AsyncSession() as session:
-            r = await session.post(url, headers={
-                "Authorization": f"Bearer {token}"
-            }, json={}, impersonate=IMPERSONATE)
-            if r.status_code == HTTPStatus.OK:
-                return r.json().get("success") == True
-            return False
+        r = await request("POST", USER_INFO_API, headers={
+            "Authorization": f"Bearer {token}"
+        }, json={}, impersonate=IMPERSONATE, operation="verify")
+        if r.status_code == HTTPStatus.OK:
+            return r.json().get("success") == True
+        return False
     except Exception:
         return False
 
-async def fetch_token_workflow(token: str | None = None, connect_token: str | None = None) -> tuple[str | None, str | None, str | None]:
-    try:
-        async with requests.AsyncSession() as session:
-            # 薄荷的恩情还不完 ✋😭✋
-            r: Response = await session.get("https://up.x666.me/api/auth/login", impersonate=IMPERSONATE)
-            auth_url = r.json().get("authUrl")
-            
+async def fetch_token_workflow(token: str | None = None, connect_token: str | None = None,
+                               account: str | None = None) -> tuple[str | None, str | None, str | None]:
+    mode = "full_login" if token is not None and connect_token is None else "connect_token"
+    with tracer.trace("fetch_token_workflow", mode=mode) as trace:
+        ld_auth = None
+        try:
+            with trace.span("auth_login") as span:
+                # 薄荷的恩情还不完 ✋😭✋
+                r: Response = await request("GET", AUTH_LOGIN_API,
+                                            impersonate=IMPERSONATE, operation="oauth_login")
+                span.set_attribute("http.status_code", r.status_code)
+                # 共享会话不保存 Cookie（见 bohe_sign.session），OAuth state 等 Cookie 需随本次流程显式传递
+                flow_cookies = dict(r.cookies)
+                auth_url = r.json().get("authUrl")
+                
             if not auth_url:
                 print("Failed to get authUrl")
+                trace.fail("Failed to get authUrl")
                 return None, connect_token, token
 
-            ld_auth = LinuxDoConnect()
+            # 同一账号复用 Linux.do 客户端的连接与 Cookie（见 bohe_sign.linux_do）
+            ld_auth = await get_client(account)
 
-            if token is not None and connect_token is None:
-                connect_token, token = await (await ld_auth.login(token)).get_connect_token()
+            if mode == "full_login":
+                with trace.span("linux_do_login"), track_upstream("linux_do_login"):
+                    connect_token, token = await asyncio.wait_for(
+                        _linux_do_login(ld_auth, token), LINUX_DO_TIMEOUT
+                    )
 
-            ld_auth.session.cookies.set("auth.session-token", connect_token, domain="connect.linux.do")
+            cookie_reused = client_session_token(ld_auth) == connect_token
+            trace.set_attribute("linux_do.cookie_reused", cookie_reused)
+            if not cookie_reused:
+                ld_auth.session.cookies.set(SESSION_COOKIE, connect_token, domain=CONNECT_DOMAIN)
 
-            approve_url = await ld_auth.approve_oauth(auth_url)
+            with trace.span("linux_do_approve"), track_upstream("linux_do_approve"):
+                approve_url = await asyncio.wait_for(ld_auth.approve_oauth(auth_url), LINUX_DO_TIMEOUT)
+            # 授权时 connect.linux.do 可能轮换会话 Cookie，以客户端中的最新值为准
+            connect_token = client_session_token(ld_auth) or connect_token
             if not approve_url:
+                trace.fail("OAuth approval returned no redirect URL")
                 return None, connect_token, token
-            
-            r: Response = await session.get(approve_url,
+                
+            with trace.span("oauth_callback") as span:
+                # 回调会消耗一次性的 OAuth code，按非幂等请求处理
+                r: Response = await request("GET", approve_url,
+                                            cookies=flow_cookies,
                                             impersonate=IMPERSONATE,
-                                            allow_redirects=False)
+                                            allow_redirects=False,
+                                            idempotent=False,
+                                            operation="oauth_callback")
+                span.set_attribute("http.status_code", r.status_code)
             location = r.headers.get("Location")
             if location:
                 token_list = parse_qs(urlparse(location).query).get("token")
                 if token_list:
                     return token_list[0], connect_token, token
-                    
-    except Exception as e:
-        print(f"Token acquisition failed: {e}")
-        traceback.print_exc()
+            trace.fail("OAuth callback returned no token")
+                        
+        except Exception as e:
+            print(f"Token acquisition failed: {e}")
+            traceback.print_exc()
+            trace.fail(str(e), type(e).__name__)
+        finally:
+            if ld_auth is not None:
+                await persist_client(account, ld_auth)
 
     return None, connect_token, token
 
-async def get_bohe_token(token: str = "") -> tuple[str | None, str | None, str | None]:
-    tokens = load_tokens()
+async def _linux_do_login(ld_auth, token: str) -> tuple[str, str]:
+    return await (await ld_auth.login(token)).get_connect_token()
+
+async def get_bohe_token(token: str = "", account: str = DEFAULT_ACCOUNT) -> tuple[str | None, str | None, str | None]:
+    tokens = load_tokens(account)
     bohe_token = tokens.get("bohe_sign_token")
     linux_do_connect_token = tokens.get("linux_do_connect_token")
     linux_do_token = tokens.get("linux_do_token")
@@ -73,12 +126,35 @@ async def get_bohe_token(token: str = "") -> tuple[str | None, str | None, str |
     
     print("bohe_sign_token invalid!")
 
+    TOKEN_REFRESH_REQUESTS.inc()
+    # 同一账号的刷新（含 renew_bohe_token 的主动续期）只按账号合并
+    return await _refresh_flight.do(
+        account,
+        lambda: _refresh_bohe_token(token, account, linux_do_connect_token, linux_do_token)
+    )
+
+async def renew_bohe_token(account: str = DEFAULT_ACCOUNT) -> tuple[str | None, str | None, str | None]:
+    """不验证现有 Token，直接用已保存的凭据获取新的薄荷 Token（用于过期前主动续期）"""
+    tokens = load_tokens(account)
+    return await _refresh_flight.do(
+        account,
+        lambda: _refresh_bohe_token("", account, tokens.get("linux_do_connect_token"), tokens.get("linux_do_token"))
+    )
+
+async def _refresh_bohe_token(token: str, account: str,
+                              linux_do_connect_token: str | None,
+                              linux_do_token: str | None) -> tuple[str | None, str | None, str | None]:
+    # 客户端 Cookie 中仍有 connect.linux.do 会话时优先使用，跳过完整登录
+    linux_do_connect_token = saved_session_token(account) or linux_do_connect_token
     if linux_do_connect_token:
         print("Attempting to refresh bohe_sign_token using stored linux_do_connect_token...")
-        new_bohe, new_ld_connect, new_ld = await fetch_token_workflow(connect_token=linux_do_connect_token)
+        new_bohe, new_ld_connect, new_ld = await fetch_token_workflow(connect_token=linux_do_connect_token,
+                                                                      account=account)
         if new_bohe:
             print("Refreshed bohe_sign_token successfully via stored linux_do_connect_token")
-            save_tokens(new_bohe, new_ld_connect, new_ld)
+            mark_token_valid(new_bohe)
+            await run_write(save_tokens, new_bohe, new_ld_connect, new_ld, account=account)
+            TOKEN_REFRESH_TOTAL.inc(result="connect_token")
             return new_bohe, new_ld_connect or linux_do_connect_token, new_ld or linux_do_token
         print("Refresh bohe_sign_token via linux_do_connect_token failed")
     
@@ -86,13 +162,20 @@ async def get_bohe_token(token: str = "") -> tuple[str | None, str | None, str |
     
     if target_cookie:
         print("Attempting full login with linux_do_token/cookie...")
-        new_bohe, new_ld_connect, new_ld = await fetch_token_workflow(token=target_cookie)
+        new_bohe, new_ld_connect, new_ld = await fetch_token_workflow(token=target_cookie, account=account)
         
         if new_bohe:
             print("Login successful")
-            save_tokens(new_bohe, new_ld_connect, new_ld)
+            mark_token_valid(new_bohe)
+            await run_write(save_tokens, new_bohe, new_ld_connect, new_ld, account=account)
+            TOKEN_REFRESH_TOTAL.inc(result="full_login")
             return new_bohe, new_ld_connect, new_ld
     else:
         print("No LINUX_DO_TOKEN available for full login.")
         
-    return None, linux_do_connect_token, linux_do_token
\ No newline at end of file
+    TOKEN_REFRESH_TOTAL.inc(result="failed")
+    return None, linux_do_connect_token, linux_do_token
+
+def get_refresh_stats() -> dict:
+    """获取 Token 刷新合并统计（executed: 实际执行次数，coalesced: 被合并的次数）"""
+    return _refresh_flight.stats()
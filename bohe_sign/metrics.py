@@ -0,0 +1,225 @@
+"""进程内指标收集
+
+提供计数器、直方图以及输出时回调取值的指标，render() 按 Prometheus 文本格式（0.0.4）输出全部指标，
+由 Web 层的 /metrics 端点返回。指标可能在存储写线程中更新，读写均加锁。
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric(ABC):
+    """指标基类"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """按文本格式输出样本行"""
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}"
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """单调递增计数器"""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class GaugeFunc(Metric):
+    """在输出时通过回调读取当前值的指标"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str,
+                 fn: Callable[[], float], metric_type: str = "gauge") -> None:
+        super().__init__(name, documentation)
+        self.fn = fn
+        self.type = metric_type
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        return [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(Metric):
+    """累积分桶直方图"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # 标签值 -> (各分桶计数, 总和, 总数)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """记录代码块耗时（秒）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+_registry: List[Metric] = []
+
+
+def render() -> str:
+    """以 Prometheus 文本格式输出全部指标"""
+    return "\n".join(metric.render() for metric in list(_registry)) + "\n"
+
+
+# ---- 应用指标 ----
+
+UPSTREAM_SECONDS = Histogram(
+    "bohe_upstream_request_duration_seconds",
+    "Upstream request latency per operation, including retries.",
+    ("operation", "status")
+)
+
+SIGN_TOTAL = Counter(
+    "bohe_sign_total",
+    "Sign attempts by trigger and result.",
+    ("trigger", "status")
+)
+
+TOKEN_REFRESH_TOTAL = Counter(
+    "bohe_token_refresh_total",
+    "Token refresh workflow executions by result (connect_token, full_login or failed).",
+    ("result",)
+)
+
+TOKEN_REFRESH_REQUESTS = Counter(
+    "bohe_token_refresh_requests_total",
+    "Token refreshes requested, including ones coalesced into an in-flight refresh."
+)
+
+STORE_SECONDS = Histogram(
+    "bohe_store_operation_duration_seconds",
+    "Store read/write latency per operation.",
+    ("operation",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+)
+
+STORE_COMMIT_SECONDS = Histogram(
+    "bohe_store_commit_duration_seconds",
+    "Time spent committing one batch of queued store writes to disk.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+
+SCHEDULER_LAG_SECONDS = Histogram(
+    "bohe_scheduler_lag_seconds",
+    "Delay between a scheduled run's planned and actual start time.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 60.0, 300.0, 3600.0)
+)
+
+SCHEDULER_FIRING_ERROR_SECONDS = Histogram(
+    "bohe_scheduler_firing_error_seconds",
+    "Absolute difference between the planned and actual send time of precision-mode scheduled signs.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+
+
+@contextmanager
+def track_upstream(operation: str) -> Iterator[None]:
+    """记录非 HTTP 响应类上游步骤（如 Linux.do 登录）的耗时，异常时以异常类名作为状态"""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, operation=operation, status=status)
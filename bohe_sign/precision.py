@@ -0,0 +1,199 @@
+"""定时签到的精确触发
+
+精确模式下调度器提前 PRECISION_LEAD 秒启动任务，依次：
+
+1. 预热：为各账号确认薄荷 Token 有效（必要时刷新），同时建立到上游的连接；
+2. 校时：多次请求上游，用响应的 Date 头估算本机与上游的时钟偏差（总耗时受距目标时刻的剩余时间限制）；
+3. 触发：等待到按上游时钟计算的目标时刻发出签到请求。
+
+预热与校时期间同时按主机速率预取签到所需的令牌（见 bohe_sign.limiter.HostLimiter.prepay），
+目标时刻发出的签到请求不必再等待令牌桶。
+
+Date 头只精确到秒，单次采样只能确定"上游时间在 [t0, t1] 内某一刻位于 [D, D+1)"，
+即偏差落在 [D - t1, D + 1 - t0]。在一秒内错开相位多次采样并取区间交集，
+误差可收敛到往返时延量级。为保证请求不早于上游的目标时刻到达（例如零点签到时
+早到会算作前一天），触发时间按偏差区间的下界计算。
+"""
+
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+from bohe_sign.limiter import host_limiter
+from bohe_sign.metrics import SCHEDULER_FIRING_ERROR_SECONDS
+from bohe_sign.resilience import request
+from bohe_sign.sign import IMPERSONATE, SIGN_API, UPSTREAM_URL
+from store.token import list_accounts
+
+PRECISION_LEAD = 15  # 精确模式下任务提前启动的秒数
+CLOCK_SAMPLES = 8  # 校时采样次数
+CLOCK_PROBE_TIMEOUT = 2.0  # 单次校时请求超时（秒）
+WARM_UP_CONCURRENCY = 8  # 预热 Token 的并发数
+FIRE_RESERVE = 3.0  # 预热最晚在触发前该秒数结束，留给校时
+PROBE_RESERVE = 1.0  # 校时最晚在目标时刻前该秒数结束
+MIN_PROBE_TIMEOUT = 0.2  # 剩余时间不足该秒数时不再发起校时请求
+FINE_SLEEP_THRESHOLD = 0.02  # 距触发不足该秒数时改为短间隔休眠
+FINE_SLEEP_STEP = 0.001  # 短间隔休眠的步长（秒）
+
+
+class ClockEstimate:
+    """本机与上游的时钟偏差估计（上游时间 - 本机时间）"""
+
+    def __init__(self, lower: float, upper: float, rtt: float, samples: int) -> None:
+        self.lower = lower
+        self.upper = upper
+        self.rtt = rtt
+        self.samples = samples
+
+    @property
+    def offset(self) -> float:
+        return (self.lower + self.upper) / 2
+
+    @property
+    def uncertainty(self) -> float:
+        return (self.upper - self.lower) / 2
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "clock_offset_ms": round(self.offset * 1000, 2),
+            "clock_uncertainty_ms": round(self.uncertainty * 1000, 2),
+            "rtt_ms": round(self.rtt * 1000, 2),
+            "clock_samples": self.samples
+        }
+
+
+async def estimate_clock_offset(
+    url: str = UPSTREAM_URL,
+    samples: int = CLOCK_SAMPLES,
+    deadline: Optional[float] = None
+) -> Optional[ClockEstimate]:
+    """根据上游响应的 Date 头估算时钟偏差，上游未返回 Date 头时返回 None
+
+    Args:
+        url: 校时请求的地址
+        samples: 采样次数
+        deadline: 校时的截止时刻（time.time()），到时以已有的采样估算
+    """
+    lower, upper = float("-inf"), float("inf")
+    rtts: List[float] = []
+    # 采样间隔略大于 1/samples 秒，使各次采样落在秒内不同相位
+    spacing = 1.0 / samples + 0.013
+
+    for _ in range(samples):
+        t0 = time.time()
+        timeout = CLOCK_PROBE_TIMEOUT
+        if deadline is not None:
+            timeout = min(timeout, deadline - t0)
+            if timeout < MIN_PROBE_TIMEOUT:
+                break
+        try:
+            r = await request("HEAD", url, impersonate=IMPERSONATE, timeout=timeout,
+                              max_attempts=1, operation="clock_probe")
+        except Exception:
+            continue
+        t1 = time.time()
+        date = r.headers.get("Date")
+        if not date:
+            continue
+        server = parsedate_to_datetime(date).timestamp()
+        rtts.append(t1 - t0)
+        sample_lower, sample_upper = server - t1, server + 1 - t0
+        if sample_lower > upper or sample_upper < lower:
+            # 与之前的采样矛盾（上游时钟跳变），以本次采样重新开始
+            lower, upper = sample_lower, sample_upper
+        else:
+            lower, upper = max(lower, sample_lower), min(upper, sample_upper)
+        if deadline is not None and time.time() + spacing >= deadline:
+            break
+        await asyncio.sleep(spacing)
+
+    if not rtts:
+        return None
+    return ClockEstimate(lower, upper, statistics.median(rtts), len(rtts))
+
+
+async def warm_up(accounts: List[str], deadline: float) -> int:
+    """在截止时间（time.time()）前为各账号确认 Token 有效，返回已就绪的账号数"""
+    # 延迟导入避免循环依赖
+    from bohe_sign.login import get_bohe_token
+
+    semaphore = asyncio.Semaphore(WARM_UP_CONCURRENCY)
+
+    async def warm_one(account: str) -> bool:
+        async with semaphore:
+            bohe_token, _, _ = await get_bohe_token(account=account)
+            return bohe_token is not None
+
+    tasks = [asyncio.create_task(warm_one(account)) for account in accounts]
+    if not tasks:
+        return 0
+    done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.time()))
+    for task in pending:
+        task.cancel()
+    return sum(1 for task in done if not task.exception() and task.result())
+
+
+async def sleep_until(when: float) -> None:
+    """等待到指定时刻（time.time()），最后 FINE_SLEEP_THRESHOLD 秒改为短间隔休眠以减小唤醒误差"""
+    remaining = when - time.time()
+    if remaining > FINE_SLEEP_THRESHOLD:
+        await asyncio.sleep(remaining - FINE_SLEEP_THRESHOLD)
+    while (remaining := when - time.time()) > 0:
+        await asyncio.sleep(min(remaining, FINE_SLEEP_STEP))
+
+
+async def prepare_and_wait(target: datetime, accounts: Optional[List[str]] = None) -> Dict[str, Any]:
+    """预热、校时并等待到按上游时钟计算的目标时刻
+
+    Args:
+        target: 上游时钟下的目标签到时刻
+        accounts: 要预热的账号，默认为全部账号
+
+    Returns:
+        触发信息，含时钟偏差估计、计划 / 实际触发时间、预取的令牌数 prepaid_requests，
+        以及触发误差 firing_error_ms（实际发出时刻与计划时刻之差）和 landing_error_ms
+        （估计的请求到达上游时刻与目标之差）
+    """
+    target_ts = target.timestamp()
+    info: Dict[str, Any] = {"precision": True, "prepaid_requests": 0}
+    estimate = None
+    if target_ts - time.time() > FIRE_RESERVE:
+        if accounts is None:
+            accounts = list_accounts()
+        # 与预热、校时同时按主机速率预取令牌，到目标时刻为止
+        prepay = asyncio.create_task(
+            host_limiter(SIGN_API).prepay(len(accounts), max(0.0, target_ts - PROBE_RESERVE - time.time()))
+        )
+        try:
+            info["warmed_accounts"] = await warm_up(accounts, target_ts - FIRE_RESERVE)
+            estimate = await estimate_clock_offset(deadline=target_ts - PROBE_RESERVE)
+            info["prepaid_requests"] = await prepay
+        finally:
+            prepay.cancel()
+    else:
+        # 补执行等已来不及预热的运行，直接触发
+        info["late"] = True
+
+    one_way = 0.0
+    if estimate is not None:
+        info.update(estimate.to_dict())
+        one_way = estimate.rtt / 2
+        # 按偏差下界计算，保证请求不早于目标时刻到达上游
+        fire_at = target_ts - estimate.lower - one_way
+        offset = estimate.offset
+    else:
+        fire_at, offset = target_ts, 0.0
+
+    await sleep_until(fire_at)
+    fired = time.time()
+    SCHEDULER_FIRING_ERROR_SECONDS.observe(abs(fired - fire_at))
+    info.update({
+        "fire_at": datetime.fromtimestamp(fire_at).astimezone().isoformat(),
+        "fired_at": datetime.fromtimestamp(fired).astimezone().isoformat(),
+        "firing_error_ms": round((fired - fire_at) * 1000, 2),
+        "landing_error_ms": round((fired + offset + one_way - target_ts) * 1000, 2)
+    })
+    return info
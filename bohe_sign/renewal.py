@@ -0,0 +1,153 @@
+"""薄荷 Token 主动续期
+
+后台任务定期检查各账号的薄荷 Token，在过期前（JWT 的 exp 声明，或根据上游拒绝
+Token 的观测学习到的有效期，见 bohe_sign.token_cache）提前执行 OAuth 流程换取
+新 Token，使定时签到等对时间敏感的路径总能直接拿到有效 Token。
+
+续期避开定时签到前后的时间窗口（按调度器的时区 SCHEDULE_TIMEZONE 计算），
+同一账号与请求路径上的刷新共用 SingleFlight，不会重复执行 OAuth 流程。
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from bohe_sign.login import renew_bohe_token, verify_bohe_token
+from bohe_sign.token_cache import estimate_token_expiry
+from store.config import SCHEDULE_TIMEZONE, get_schedule_config
+from store.token import list_accounts, load_tokens
+
+CHECK_INTERVAL = 300  # 检查间隔（秒）
+RENEW_AHEAD = 6 * 3600  # 在过期前多久续期（秒）
+RENEW_AHEAD_RATIO = 0.5  # 有效期较短时，最多提前有效期的该比例续期
+SIGN_GUARD = 120  # 定时签到前后该秒数内不执行续期
+RETRY_DELAY = 600  # 续期失败后的重试间隔（秒）
+
+SCHEDULE_TZ = ZoneInfo(SCHEDULE_TIMEZONE)
+
+
+def _now() -> datetime:
+    return datetime.now(SCHEDULE_TZ)
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, SCHEDULE_TZ).isoformat()
+
+
+def next_sign_time(now: Optional[datetime] = None) -> Optional[datetime]:
+    """根据定时任务配置计算下一次定时签到时间（SCHEDULE_TIMEZONE 时区），未启用时返回 None"""
+    config = get_schedule_config()
+    if not config.get("enabled") or not config.get("time"):
+        return None
+    now = now.astimezone(SCHEDULE_TZ) if now else _now()
+    hour, minute = map(int, config["time"].split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target < now - timedelta(seconds=SIGN_GUARD):
+        target += timedelta(days=1)
+    return target
+
+
+def in_sign_window(now: Optional[datetime] = None) -> bool:
+    """当前是否处于定时签到前后的保护窗口内"""
+    now = now.astimezone(SCHEDULE_TZ) if now else _now()
+    target = next_sign_time(now)
+    return target is not None and abs((target - now).total_seconds()) <= SIGN_GUARD
+
+
+def renew_at(token: str) -> Optional[float]:
+    """计算 Token 应当续期的时间，无法估算过期时间时返回 None"""
+    expiry, first_seen = estimate_token_expiry(token)
+    if expiry is None:
+        return None
+    ahead = RENEW_AHEAD
+    if first_seen is not None:
+        # 避免有效期短于 RENEW_AHEAD 的 Token 一拿到就续期
+        ahead = min(ahead, max(0.0, expiry - first_seen) * RENEW_AHEAD_RATIO)
+    return expiry - ahead
+
+
+class TokenRenewer:
+    """薄荷 Token 后台续期任务"""
+
+    def __init__(self, interval: float = CHECK_INTERVAL) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._retry_at: Dict[str, float] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Token renewal check failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def check(self) -> None:
+        """检查全部账号，为即将过期的 Token 续期"""
+        for account in list_accounts():
+            if in_sign_window():
+                return
+            await self.check_account(account)
+
+    async def check_account(self, account: str) -> None:
+        now = time.time()
+        if self._retry_at.get(account, 0) > now:
+            return
+
+        tokens = load_tokens(account)
+        if not tokens.get("linux_do_connect_token") and not tokens.get("linux_do_token"):
+            return  # 没有可用于续期的凭据
+
+        bohe_token = tokens.get("bohe_sign_token")
+        due = renew_at(bohe_token) if bohe_token else now
+        if due is None:
+            # 过期时间未知：临近定时签到时借助（带缓存的）验证发现失效，失效时立即续期
+            sign_at = next_sign_time()
+            if sign_at is not None and sign_at.timestamp() - now <= RENEW_AHEAD:
+                due = None if await verify_bohe_token(bohe_token) else now
+
+        self._status[account] = {
+            **self._status.get(account, {}),
+            "renew_at": _isoformat(due) if due else None,
+            "checked_at": _isoformat(now)
+        }
+        if due is None or due > now:
+            return
+
+        new_token, _, _ = await renew_bohe_token(account)
+        status = self._status[account]
+        status["last_renewal"] = _now().isoformat()
+        status["last_result"] = "success" if new_token else "failed"
+        if new_token:
+            self._retry_at.pop(account, None)
+            next_due = renew_at(new_token)
+            status["renew_at"] = _isoformat(next_due) if next_due else None
+        else:
+            self._retry_at[account] = now + RETRY_DELAY
+
+    def status(self) -> Dict[str, Any]:
+        """续期任务状态"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "accounts": dict(self._status)
+        }
+
+
+renewer = TokenRenewer()
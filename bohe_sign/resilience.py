@@ -0,0 +1,271 @@
+"""上游请求容错模块
+
+对 up.x666.me 等上游的请求统一经由 request() 发出：
+
+- 每次尝试都有超时（timeout），整个调用另有总时限（deadline），不会无限挂起
+- 仅对可重试的失败（连接错误、超时、429 / 5xx）按带随机抖动的指数退避重试
+- 每个主机一个熔断器：连续失败达到阈值后熔断，熔断期间直接失败，
+  冷却后放行一个探测请求，成功则恢复
+- 每次尝试都占用所属主机共用的并发与速率限制器（见 bohe_sign.limiter），
+  退避等待期间不占用
+
+非幂等的调用（例如转盘抽奖）传入 idempotent=False，只在请求确定未被上游处理时重试
+（连接失败、429、503）。
+"""
+
+import asyncio
+import random
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from bohe_sign.limiter import host_limiter
+from bohe_sign.metrics import UPSTREAM_SECONDS
+from bohe_sign.session import _host_of, get_session
+
+if TYPE_CHECKING:
+    from curl_cffi import Response
+
+DEFAULT_TIMEOUT = 10.0  # 单次尝试超时（秒）
+DEFAULT_DEADLINE = 30.0  # 单次调用（含重试）的总时限（秒）
+MAX_ATTEMPTS = 3  # 最多尝试次数
+BACKOFF_BASE = 0.5  # 退避基数（秒）
+BACKOFF_MAX = 8.0  # 单次退避上限（秒）
+
+FAILURE_THRESHOLD = 5  # 连续失败多少次后熔断
+RESET_TIMEOUT = 30.0  # 熔断后多久放行探测请求（秒）
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# 上游明确表示未处理请求的状态码，非幂等调用也可重试
+UNPROCESSED_STATUS = {429, 503}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """上游主机处于熔断状态"""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        super().__init__(f"上游 {host} 暂不可用，{retry_in:.0f} 秒后重试")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """单个上游主机的熔断器"""
+
+    def __init__(self, host: str,
+                 failure_threshold: int = FAILURE_THRESHOLD,
+                 reset_timeout: float = RESET_TIMEOUT) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        # 统计
+        self.requests = 0
+        self.attempts = 0
+        self.retries = 0
+        self.rejected = 0
+        self.trips = 0
+        self.last_error: Optional[str] = None
+
+    def _retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> None:
+        """检查是否允许发出请求
+
+        Raises:
+            CircuitOpenError: 熔断中，或半开状态下已有探测请求在进行
+        """
+        if self.state == OPEN and self._retry_in() <= 0:
+            self.state = HALF_OPEN
+        if self.state == CLOSED:
+            return
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.host, self._retry_in())
+
+    def record_success(self) -> None:
+        """记录一次成功（上游可正常响应）"""
+        self.state = CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self, error: str) -> None:
+        """记录一次失败（连接错误、超时或 5xx）"""
+        self.failures += 1
+        self.last_error = error
+        self._probing = False
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """请求因与主机健康无关的原因中止，释放探测名额"""
+        self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        """熔断与重试统计"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": round(self._retry_in(), 1) if self.state == OPEN else None,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "requests": self.requests,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "last_error": self.last_error
+        }
+
+
+# host -> 熔断器
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """获取 URL 所属主机的熔断器"""
+    host = _host_of(url)
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = CircuitBreaker(host)
+    return breaker
+
+
+def backoff_delay(attempt: int) -> float:
+    """第 attempt 次重试前的等待时间（指数退避 + 全抖动）"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _retry_after(r: "Response") -> Optional[float]:
+    """解析 Retry-After 响应头（仅支持秒数）"""
+    value = r.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+async def request(
+    method: str,
+    url: str,
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    deadline: float = DEFAULT_DEADLINE,
+    max_attempts: int = MAX_ATTEMPTS,
+    idempotent: bool = True,
+    operation: str = "other",
+    **kwargs: Any
+) -> "Response":
+    """经共享会话向上游发出请求，带超时、重试与熔断
+
+    Args:
+        method: HTTP 方法
+        url: 请求地址
+        timeout: 单次尝试超时（秒）
+        deadline: 含重试在内的总时限（秒）
+        max_attempts: 最多尝试次数
+        idempotent: 请求是否可安全重复发送
+        operation: 指标中的操作名
+        **kwargs: 透传给 AsyncSession.request 的参数
+
+    Returns:
+        上游响应；重试用尽时返回最后一次的响应
+
+    Raises:
+        CircuitOpenError: 主机处于熔断状态
+        curl_cffi.requests.exceptions.RequestException: 重试用尽后的最后一次请求异常
+    """
+    started = time.perf_counter()
+    status = "error"
+    try:
+        r = await _request_with_retry(method, url, timeout, deadline, max_attempts, idempotent, **kwargs)
+        status = str(r.status_code)
+        return r
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        UPSTREAM_SECONDS.observe(time.perf_counter() - started, operation=operation, status=status)
+
+
+async def _request_with_retry(
+    method: str,
+    url: str,
+    timeout: float,
+    deadline: float,
+    max_attempts: int,
+    idempotent: bool,
+    **kwargs: Any
+) -> "Response":
+    # curl_cffi 在首次发出请求时才导入（get_session 中），以加快命令行启动
+    from curl_cffi.requests.exceptions import ConnectionError as UpstreamConnectionError
+    from curl_cffi.requests.exceptions import Timeout as UpstreamTimeout
+
+    breaker = get_breaker(url)
+    breaker.requests += 1
+    session = get_session(url)
+    limiter = host_limiter(url)
+    retry_status = RETRYABLE_STATUS if idempotent else UNPROCESSED_STATUS
+    started = time.monotonic()
+    attempt = 0
+
+    while True:
+        breaker.allow()
+        breaker.attempts += 1
+        attempt += 1
+        wait: Optional[float] = None
+
+        try:
+            async with limiter:
+                # 等待限制器的时间计入总时限
+                remaining = deadline - (time.monotonic() - started)
+                r = await session.request(method, url, timeout=max(0.1, min(timeout, remaining)), **kwargs)
+        except (UpstreamConnectionError, UpstreamTimeout) as e:
+            breaker.record_failure(type(e).__name__)
+            # 非幂等请求读取超时时，上游可能已经处理，不能重发
+            if not idempotent and not isinstance(e, UpstreamConnectionError):
+                raise
+            error: Optional[BaseException] = e
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if r.status_code >= 500:
+                breaker.record_failure(f"HTTP {r.status_code}")
+            else:
+                breaker.record_success()
+            if r.status_code not in retry_status:
+                return r
+            error = None
+            wait = _retry_after(r)
+
+        if wait is None:
+            wait = backoff_delay(attempt - 1)
+        remaining = deadline - (time.monotonic() - started)
+        if attempt >= max_attempts or wait >= remaining:
+            if error is not None:
+                raise error
+            return r
+
+        breaker.retries += 1
+        await asyncio.sleep(wait)
+
+
+def get_upstream_stats() -> Dict[str, Any]:
+    """获取各上游主机的熔断与重试状态"""
+    return {host: breaker.stats() for host, breaker in _breakers.items()}
+
+
+def reset_breakers() -> None:
+    """清空全部熔断器状态与统计"""
+    _breakers.clear()
@@ -0,0 +1,111 @@
+"""上游 HTTP 会话池管理模块
+
+为每个上游主机维护一个进程级共享的 curl_cffi AsyncSession，
+复用 keep-alive 连接，避免每次请求都重新进行 DNS 解析、TCP 和 TLS 握手。
+共享会话不保存响应设置的 Cookie（各账号的请求共用同一会话），需要 Cookie 的请求
+从响应的 r.cookies 读取并在后续请求中通过 cookies 参数显式传递。
+curl_cffi 在首次创建会话时才导入，不需要访问上游的命令（如 status）无需加载它。
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession
+
+IMPERSONATE = "chrome"
+MAX_CONNECTIONS_PER_HOST = 10  # 每个上游主机的最大并发连接数
+WARM_UP_TIMEOUT = 3.0  # 启动时预建连接的请求超时（秒）
+
+# host -> (所属事件循环, 会话)
+_sessions: Dict[str, Tuple[asyncio.AbstractEventLoop, "AsyncSession"]] = {}
+
+
+def _host_of(url: str) -> str:
+    """提取 URL 中的主机名"""
+    return urlparse(url).netloc or url
+
+
+def get_session(url: str) -> "AsyncSession":
+    """获取指定 URL 所属主机的共享会话
+
+    会话与创建它的事件循环绑定，若当前事件循环已变化（例如多次 asyncio.run），
+    会重新创建会话。
+
+    Args:
+        url: 请求地址或主机名
+
+    Returns:
+        该主机的共享 AsyncSession
+    """
+    host = _host_of(url)
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(host)
+
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+
+    from curl_cffi.requests import AsyncSession
+
+    session = AsyncSession(
+        loop=loop,
+        impersonate=IMPERSONATE,
+        max_clients=MAX_CONNECTIONS_PER_HOST,
+        # 不把响应的 Cookie 写入会话，避免一个账号的 Cookie 随其它账号的请求发出
+        discard_cookies=True
+    )
+    _sessions[host] = (loop, session)
+    return session
+
+
+async def _warm_up(url: str) -> None:
+    """向上游发送一次 HEAD 请求建立连接（DNS、TCP、TLS），失败时忽略"""
+    try:
+        await get_session(url).request("HEAD", url, timeout=WARM_UP_TIMEOUT)
+    except Exception as e:
+        print(f"Warm-up request to {_host_of(url)} failed: {e}")
+
+
+async def init_sessions(*urls: str) -> None:
+    """为给定上游主机创建共享会话，并各发送一次 HEAD 请求预先建立连接"""
+    await asyncio.gather(*(_warm_up(url) for url in urls))
+
+
+async def close_sessions() -> None:
+    """关闭所有共享会话，释放连接"""
+    entries = list(_sessions.values())
+    _sessions.clear()
+
+    loop = asyncio.get_running_loop()
+    for owner_loop, session in entries:
+        if owner_loop is not loop:
+            continue
+        try:
+            await session.close()
+        except Exception as e:
+            print(f"Error closing session: {e}")
+
+
+def get_pool_stats(url: Optional[str] = None) -> Dict[str, Any]:
+    """获取会话池状态
+
+    Args:
+        url: 仅返回该主机的状态，默认返回全部
+
+    Returns:
+        主机名到连接池信息的字典
+    """
+    hosts = [_host_of(url)] if url else list(_sessions.keys())
+    stats: Dict[str, Any] = {}
+
+    for host in hosts:
+        entry = _sessions.get(host)
+        if entry is None:
+            continue
+        session = entry[1]
+        stats[host] = {
+            "max_connections": session.max_clients,
+            "available_slots": session.pool.qsize()
+        }
+    return stats
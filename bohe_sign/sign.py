@@ -1,37 +1,80 @@
 """签到逻辑实现模块"""
 
+import os
+from datetime import datetime
 from http import HTTPStatus
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-from curl_cffi import requests
+from bohe_sign.cache import SWRCache
+from bohe_sign.events import publish
+from bohe_sign.metrics import SIGN_TOTAL
+from bohe_sign.resilience import request
+from bohe_sign.token_cache import mark_token_invalid
 
-from store.token import load_tokens
+from store.backend import run_read, run_write
+from store.token import DEFAULT_ACCOUNT, load_tokens
 from store.log import add_sign_log, get_sign_stats
 
 IMPERSONATE = "chrome"
-SIGN_API = "https://up.x666.me/api/user/sign"
-USER_INFO_API = "https://up.x666.me/api/user/info"
-SPIN_API = "https://up.x666.me/api/checkin/spin"
+# 上游地址，可通过环境变量指向本地模拟服务（见 bench/）
+UPSTREAM_URL = os.environ.get("BOHE_UPSTREAM_URL", "https://up.x666.me").rstrip("/")
+SIGN_API = f"{UPSTREAM_URL}/api/user/sign"
+USER_INFO_API = f"{UPSTREAM_URL}/api/user/info"
+SPIN_API = f"{UPSTREAM_URL}/api/checkin/spin"
+AUTH_LOGIN_API = f"{UPSTREAM_URL}/api/auth/login"
 
+USER_INFO_TTL = 300  # 用户信息新鲜期（秒），过期后后台刷新
+USER_INFO_STALE_TTL = 7 * 24 * 3600  # 刷新失败时旧的用户信息最多继续使用的时长（秒）
 
-async def do_sign(trigger: str = "manual") -> Dict[str, Any]:
+# 账号 -> {"data": 上游用户信息, "updated_at": 获取时间}
+_user_info_cache: SWRCache[Dict[str, Any]] = SWRCache(lambda _: (USER_INFO_TTL, USER_INFO_STALE_TTL))
+
+
+async def _record_sign(status: str, message: str, trigger: str, account: str) -> Dict[str, Any]:
+    """记录签到日志并发布签到结果与新日志事件"""
+    entry = await run_write(
+        add_sign_log,
+        status=status,
+        message=message,
+        trigger=trigger,
+        account=account
+    )
+    SIGN_TOTAL.inc(trigger=trigger, status=status)
+    publish("log", entry)
+    publish("sign", {
+        "account": account,
+        "success": status == "success",
+        "message": message,
+        "trigger": trigger
+    })
+    return entry
+
+
+async def do_sign(
+    trigger: str = "manual",
+    account: str = DEFAULT_ACCOUNT,
+    tokens: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
     """执行签到操作
     
     Args:
-        trigger: 触发方式 (manual/scheduled)
+        trigger: 触发方式 (manual/scheduled/batch)
+        account: 账号名
+        tokens: 本次使用的 Token（如批量文件中附带的），覆盖已保存的同名 Token，不写入存储
         
     Returns:
         签到结果字典，包含 success, message, data 字段
     """
-    tokens = load_tokens()
+    tokens = {**load_tokens(account), **tokens} if tokens else load_tokens(account)
     bohe_token = tokens.get("bohe_sign_token")
     
     if not bohe_token:
         error_msg = "未找到有效的薄荷 Token，请先设置 Linux.do Token 并刷新"
-        add_sign_log(
+        await _record_sign(
             status="failed",
             message=error_msg,
-            trigger=trigger
+            trigger=trigger,
+            account=account
         )
         return {
             "success": False,
@@ -39,60 +82,70 @@ async def do_sign(trigger: str = "manual") -> Dict[str, Any]:
         }
     
     try:
-        async with requests.AsyncSession() as session:
-            r = await session.post(
-                SIGN_API,
-                headers={"Authorization": f"Bearer {bohe_token}"},
-                json={},
-                impersonate=IMPERSONATE
-            )
+        # 上游按自然日去重签到，重复提交不会重复计数，可按幂等请求重试
+        r = await request(
+            "POST",
+            SIGN_API,
+            headers={"Authorization": f"Bearer {bohe_token}"},
+            json={},
+            impersonate=IMPERSONATE,
+            operation="sign"
+        )
             
-            if r.status_code == HTTPStatus.OK:
-                result = r.json()
+        if r.status_code == HTTPStatus.OK:
+            result = r.json()
                 
-                if result.get("success"):
-                    # 签到成功
-                    message = result.get("message", "签到成功")
-                    add_sign_log(
-                        status="success",
-                        message=message,
-                        trigger=trigger
-                    )
-                    return {
-                        "success": True,
-                        "message": message,
-                        "data": result.get("data", {})
-                    }
-                else:
-                    # API 返回失败
-                    message = result.get("message", "签到失败")
-                    add_sign_log(
-                        status="failed",
-                        message=message,
-                        trigger=trigger
-                    )
-                    return {
-                        "success": False,
-                        "message": message
-                    }
+            if result.get("success"):
+                # 签到成功
+                message = result.get("message", "签到成功")
+                await _record_sign(
+                    status="success",
+                    message=message,
+                    trigger=trigger,
+                    account=account
+                )
+                # 连续天数等已变化，立即刷新用户信息
+                refresh_user_info(account, bohe_token)
+                return {
+                    "success": True,
+                    "message": message,
+                    "data": result.get("data", {})
+                }
             else:
-                error_msg = f"签到请求失败，HTTP 状态码: {r.status_code}"
-                add_sign_log(
+                # API 返回失败
+                message = result.get("message", "签到失败")
+                await _record_sign(
                     status="failed",
-                    message=error_msg,
-                    trigger=trigger
+                    message=message,
+                    trigger=trigger,
+                    account=account
                 )
                 return {
                     "success": False,
-                    "message": error_msg
+                    "message": message
                 }
+        else:
+            if r.status_code == HTTPStatus.UNAUTHORIZED:
+                mark_token_invalid(bohe_token)
+            error_msg = f"签到请求失败，HTTP 状态码: {r.status_code}"
+            await _record_sign(
+                status="failed",
+                message=error_msg,
+                trigger=trigger,
+                account=account
+            )
+            return {
+                "success": False,
+                "message": error_msg
+            }
                 
     except Exception as e:
         error_msg = f"签到请求异常: {str(e)}"
-        add_sign_log(
+        await _record_sign(
             status="failed",
             message=error_msg,
-            trigger=trigger
+            trigger=trigger,
+            account=account
         )
         return {
             "success": False,
@@ -100,41 +153,92 @@ async def do_sign(trigger: str = "manual") -> Dict[str, Any]:
         }
 
 
-async def get_sign_status() -> Dict[str, Any]:
+async def fetch_user_info(bohe_token: str) -> Dict[str, Any]:
+    """请求上游用户信息
+
+    Args:
+        bohe_token: 薄荷 Token
+
+    Returns:
+        用户信息字典
+
+    Raises:
+        RuntimeError: 请求失败或上游返回失败
+    """
+    r = await request(
+        "POST",
+        USER_INFO_API,
+        headers={"Authorization": f"Bearer {bohe_token}"},
+        json={},
+        impersonate=IMPERSONATE,
+        operation="user_info"
+    )
+    if r.status_code != HTTPStatus.OK:
+        raise RuntimeError(f"User info request failed, HTTP status code: {r.status_code}")
+    result = r.json()
+    if not result.get("success"):
+        raise RuntimeError(f"User info request failed: {result.get('message', '')}")
+    return result.get("data", {})
+
+
+def _user_info_loader(account: str, bohe_token: str) -> Callable[[], Awaitable[Dict[str, Any]]]:
+    async def loader() -> Dict[str, Any]:
+        user_data = await fetch_user_info(bohe_token)
+        previous = _user_info_cache.peek(account)
+        if previous is None or previous.value["data"] != user_data:
+            # 后台刷新得到新数据，通知面板重新获取签到状态
+            publish("sign", {"account": account, "user_info": True})
+        return {
+            "data": user_data,
+            "updated_at": datetime.now().isoformat()
+        }
+    return loader
+
+
+def refresh_user_info(account: str, bohe_token: str) -> None:
+    """在后台刷新账号的用户信息缓存"""
+    _user_info_cache.refresh(account, _user_info_loader(account, bohe_token))
+
+
+def get_user_info_age(status: Dict[str, Any]) -> Optional[float]:
+    """根据 get_sign_status() 的结果计算用户信息的数据年龄（秒）"""
+    updated_at = status.get("user_info_updated_at")
+    if not updated_at:
+        return None
+    return round((datetime.now() - datetime.fromisoformat(updated_at)).total_seconds(), 1)
+
+
+async def get_sign_status(account: str = DEFAULT_ACCOUNT,
+                          tokens: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """获取签到状态
     
+    Args:
+        account: 账号名
+        tokens: 已读取的 Token 快照，为空时从存储读取
+        
     Returns:
-        签到状态字典，包含 signed_today, last_sign_time, continuous_days, total_signs
+        签到状态字典，包含 signed_today, last_sign_time, continuous_days, longest_streak, total_signs，
+        以及上游用户信息的获取时间 user_info_updated_at
     """
     # 从本地日志获取基础统计
-    stats = get_sign_stats()
+    stats = await run_read(get_sign_stats, account)
     
-    # 尝试从 API 获取更多信息（如果 token 有效）
-    tokens = load_tokens()
+    # 补充上游用户信息（缓存值立即返回，过期后在后台刷新）
+    if tokens is None:
+        tokens = await run_read(load_tokens, account)
     bohe_token = tokens.get("bohe_sign_token")
     
+    stats["user_info_updated_at"] = None
     if bohe_token:
-        try:
-            async with requests.AsyncSession() as session:
-                r = await session.post(
-                    USER_INFO_API,
-                    headers={"Authorization": f"Bearer {bohe_token}"},
-                    json={},
-                    impersonate=IMPERSONATE
-                )
-                
-                if r.status_code == HTTPStatus.OK:
-                    result = r.json()
-                    if result.get("success"):
-                        user_data = result.get("data", {})
-                        # 如果 API 返回了更准确的数据，可以补充
-                        if "continuous_days" in user_data:
-                            stats["continuous_days"] = user_data["continuous_days"]
-                        if "total_signs" in user_data:
-                            stats["total_signs"] = user_data["total_signs"]
-        except Exception:
-            # API 调用失败，使用本地统计数据
-            pass
+        entry = _user_info_cache.get_nowait(account, _user_info_loader(account, bohe_token))
+        if entry is not None:
+            user_data = entry.value["data"]
+            # 如果 API 返回了更准确的数据，可以补充
+            if "continuous_days" in user_data:
+                stats["continuous_days"] = user_data["continuous_days"]
+            if "total_signs" in user_data:
+                stats["total_signs"] = user_data["total_signs"]
+            stats["user_info_updated_at"] = entry.value["updated_at"]
     
     return stats
 
@@ -152,26 +256,29 @@ async def spin(token: str) -> Dict[str, Any]:
         return {"success": False, "message": "Token not provided"}
 
     try:
-        async with requests.AsyncSession() as session:
-            r = await session.post(
-                SPIN_API,
-                headers={"Authorization": f"Bearer {token}"},
-                json={},
-                impersonate=IMPERSONATE,
-            )
+        # 每次抽奖都会消耗次数，仅在确定上游未处理时重试
+        r = await request(
+            "POST",
+            SPIN_API,
+            headers={"Authorization": f"Bearer {token}"},
+            json={},
+            impersonate=IMPERSONATE,
+            idempotent=False,
+            operation="spin",
+        )
 
-            if r.status_code == HTTPStatus.OK:
-                result = r.json()
-                return {
-                    "success": result.get("success", False),
-                    "message": result.get("message", ""),
-                    "data": result.get("data", {}),
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"Spin request failed, HTTP status code: {r.status_code}",
-                }
+        if r.status_code == HTTPStatus.OK:
+            result = r.json()
+            return {
+                "success": result.get("success", False),
+                "message": result.get("message", ""),
+                "data": result.get("data", {}),
+            }
+        else:
+            return {
+                "success": False,
+                "message": f"Spin request failed, HTTP status code: {r.status_code}",
+            }
 
     except Exception as e:
         return {"success": False, "message": f"Spin request exception: {str(e)}"}
\ No newline at end of file
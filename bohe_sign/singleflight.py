@@ -0,0 +1,59 @@
+"""Single-flight 请求合并
+
+同一个键上并发发起的调用只执行一次，其余调用等待并共享该次执行的结果。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """按键合并并发调用"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """执行或加入进行中的调用
+
+        执行放在独立任务中，某个等待者被取消不会影响其它等待者。
+
+        Args:
+            key: 合并键
+            fn: 实际执行的协程函数
+
+        Returns:
+            本次（或共享的）执行结果
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            self.executed += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+
+            def _forget(_: asyncio.Task) -> None:
+                if self._calls.get(key) is task:
+                    del self._calls[key]
+
+            task.add_done_callback(_forget)
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """进行中的调用数"""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """合并统计"""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight()
+        }
@@ -0,0 +1,171 @@
+"""薄荷 Token 有效性缓存
+
+以 Token 的 SHA-256 作为缓存键，避免在内存中保存明文 Token 的索引。
+若 Token 是 JWT，则结合其 exp 声明确定缓存有效期，已过期的 Token
+无需请求上游即可判定为无效。对于不带 exp 的 Token，根据首次确认有效到
+被上游拒绝之间的时长学习 Token 的有效期，供主动续期估算过期时间。
+"""
+
+import base64
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from bohe_sign.cache import SWRCache
+from bohe_sign.events import publish
+
+VALID_TTL = 300  # 有效结果的新鲜期（秒）
+VALID_STALE_TTL = 600  # 有效结果过期后仍可先返回、后台刷新的时长（秒）
+INVALID_TTL = 30  # 无效结果的缓存时长（秒）
+EXPIRY_MARGIN = 30  # 距 JWT 过期不足该秒数时视为无效
+MAX_FIRST_SEEN = 100000  # 记录首次确认有效时间的 Token 数上限
+
+
+def token_key(token: str) -> str:
+    """计算 Token 的缓存键"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_token_expiry(token: str) -> Optional[float]:
+    """解析 JWT 的 exp 声明
+
+    Args:
+        token: 薄荷 Token
+
+    Returns:
+        过期时间的 Unix 时间戳，非 JWT 或无 exp 声明时返回 None
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        exp = claims.get("exp")
+        return float(exp) if exp is not None else None
+    except Exception:
+        return None
+
+
+def _seconds_until_expiry(exp: Optional[float]) -> Optional[float]:
+    if exp is None:
+        return None
+    return exp - time.time() - EXPIRY_MARGIN
+
+
+def _validity_policy(value: Tuple[bool, Optional[float]]) -> Tuple[float, float]:
+    """根据验证结果和 JWT 过期时间计算 TTL"""
+    valid, exp = value
+    if not valid:
+        return INVALID_TTL, 0
+    fresh, stale = VALID_TTL, VALID_STALE_TTL
+    remaining = _seconds_until_expiry(exp)
+    if remaining is not None:
+        fresh = min(fresh, remaining)
+        stale = min(stale, max(0.0, remaining - fresh))
+    return fresh, stale
+
+
+# 缓存值为 (是否有效, JWT 过期时间)
+_cache: SWRCache[Tuple[bool, Optional[float]]] = SWRCache(_validity_policy)
+
+# Token 键 -> 首次确认有效的时间
+_first_seen: Dict[str, float] = {}
+# 最近一次观测到的 Token 有效期（首次确认有效到被拒绝），单位秒
+_learned_lifetime: Optional[float] = None
+
+
+def _observe(key: str, valid: bool) -> None:
+    """记录 Token 有效性的观测结果，用于学习有效期"""
+    global _learned_lifetime
+    now = time.time()
+    if valid:
+        if key not in _first_seen:
+            if len(_first_seen) >= MAX_FIRST_SEEN:
+                # 丢弃最早记录的 Token
+                del _first_seen[next(iter(_first_seen))]
+            _first_seen[key] = now
+        return
+    seen = _first_seen.pop(key, None)
+    if seen is not None and now > seen:
+        _learned_lifetime = now - seen
+
+
+def estimate_token_expiry(token: str) -> Tuple[Optional[float], Optional[float]]:
+    """估算 Token 的过期时间
+
+    优先使用 JWT 的 exp 声明，否则按学习到的有效期推算。
+
+    Args:
+        token: 薄荷 Token
+
+    Returns:
+        (过期时间, 首次确认有效的时间) 的 Unix 时间戳，无法估算时对应项为 None
+    """
+    seen = _first_seen.get(token_key(token))
+    exp = get_token_expiry(token)
+    if exp is None and seen is not None and _learned_lifetime is not None:
+        exp = seen + _learned_lifetime
+    return exp, seen
+
+
+async def cached_verify(token: str, verifier: Callable[[str], Awaitable[bool]]) -> bool:
+    """带缓存的 Token 验证
+
+    Args:
+        token: 薄荷 Token
+        verifier: 实际请求上游验证 Token 的函数
+
+    Returns:
+        Token 是否有效
+    """
+    exp = get_token_expiry(token)
+    remaining = _seconds_until_expiry(exp)
+    if remaining is not None and remaining <= 0:
+        # JWT 已过期，无需请求上游
+        return False
+
+    key = token_key(token)
+
+    async def loader() -> Tuple[bool, Optional[float]]:
+        valid = await verifier(token)
+        _notify_if_changed(key, valid)
+        _observe(key, valid)
+        return valid, exp
+
+    valid, _ = await _cache.get(key, loader)
+    return valid
+
+
+def _notify_if_changed(key: str, valid: bool) -> None:
+    """有效性与缓存中的结果不同时发布 token 事件"""
+    entry = _cache.peek(key)
+    if entry is None or entry.value[0] != valid:
+        publish("token", {"valid": valid})
+
+
+def _mark(token: str, valid: bool) -> None:
+    key = token_key(token)
+    _notify_if_changed(key, valid)
+    _observe(key, valid)
+    _cache.set(key, (valid, get_token_expiry(token)))
+
+
+def mark_token_valid(token: str) -> None:
+    """记录刚获取的新 Token 为有效"""
+    if token:
+        _mark(token, True)
+
+
+def mark_token_invalid(token: str) -> None:
+    """记录 Token 已被上游拒绝"""
+    if token:
+        _mark(token, False)
+
+
+def get_token_cache_stats() -> Dict[str, Any]:
+    """获取 Token 缓存统计"""
+    stats = _cache.stats()
+    stats["learned_lifetime"] = _learned_lifetime
+    return stats
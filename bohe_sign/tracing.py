@@ -0,0 +1,188 @@
+"""轻量级调用链追踪
+
+用于记录多步骤网络流程（如 OAuth 获取 Token）中每一步的耗时与结果：
+
+    with tracer.trace("fetch_token_workflow") as trace:
+        with trace.span("auth_login"):
+            ...
+
+最近的追踪保存在内存环形缓冲区中，可通过调试接口查看。设置环境变量
+BOHE_TRACE_FILE 后，每条追踪结束时还会以 OTLP/JSON（ExportTraceServiceRequest）
+格式追加一行到该文件，可被 OpenTelemetry Collector 的 otlpjsonfile 接收器读取。
+"""
+
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from store.writer import get_writer
+
+TRACE_FILE_ENV = "BOHE_TRACE_FILE"
+MAX_TRACES = 50  # 内存中保留的追踪条数
+SERVICE_NAME = "bohe-api-auto-sign"
+
+OK = "ok"
+ERROR = "error"
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    """一个计时步骤"""
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> None:
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = OK
+        self.error: Optional[str] = None
+        self.message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def fail(self, message: str, error: Optional[str] = None) -> None:
+        """将步骤标记为失败"""
+        self.status = ERROR
+        self.message = message
+        if error is not None:
+            self.error = error
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return round((self.end_ns - self.start_ns) / 1e6, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "start": self.start_ns / 1e9,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "error": self.error,
+            "message": self.message,
+            "attributes": self.attributes
+        }
+
+
+class Trace(Span):
+    """一次完整的流程，包含若干步骤"""
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        super().__init__(name, None, attributes)
+        self.trace_id = _new_id(16)
+        self.spans: List[Span] = []
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """记录一个步骤，异常时记录异常类型并继续抛出"""
+        span = Span(name, self.span_id, attributes)
+        self.spans.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(str(e), type(e).__name__)
+            raise
+        finally:
+            span.end()
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = super().to_dict()
+        data["trace_id"] = self.trace_id
+        data["spans"] = [span.to_dict() for span in self.spans]
+        return data
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span, trace_id: str) -> Dict[str, Any]:
+    attributes = dict(span.attributes)
+    if span.error:
+        attributes["error.type"] = span.error
+    data: Dict[str, Any] = {
+        "traceId": trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()],
+        # STATUS_CODE_OK = 1, STATUS_CODE_ERROR = 2
+        "status": {"code": 2, "message": span.message} if span.status == ERROR else {"code": 1}
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """转换为 OTLP/JSON 的 ExportTraceServiceRequest"""
+    return {
+        "resourceSpans": [{
+            "resource": {
+                "attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]
+            },
+            "scopeSpans": [{
+                "scope": {"name": "bohe_sign.tracing"},
+                "spans": [_otlp_span(trace, trace.trace_id)] + [
+                    _otlp_span(span, trace.trace_id) for span in trace.spans
+                ]
+            }]
+        }]
+    }
+
+
+class Tracer:
+    """追踪记录器"""
+
+    def __init__(self, max_traces: int = MAX_TRACES, export_file: Optional[str] = None) -> None:
+        self._traces: Deque[Trace] = deque(maxlen=max_traces)
+        self.export_file = export_file
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[Trace]:
+        """记录一次流程，结束后保存到环形缓冲区并导出"""
+        trace = Trace(name, attributes)
+        try:
+            yield trace
+        except BaseException as e:
+            trace.fail(str(e), type(e).__name__)
+            raise
+        finally:
+            trace.end()
+            self._traces.append(trace)
+            self._export(trace)
+
+    def _export(self, trace: Trace) -> None:
+        if not self.export_file:
+            return
+        line = json.dumps(to_otlp(trace), ensure_ascii=False) + "\n"
+        get_writer().append(self.export_file, line)
+
+    def recent(self, limit: int = MAX_TRACES) -> List[Dict[str, Any]]:
+        """最近的追踪（按时间倒序）"""
+        return [trace.to_dict() for trace in list(reversed(self._traces))[:limit]]
+
+
+tracer = Tracer(export_file=os.environ.get(TRACE_FILE_ENV) or None)
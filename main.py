@@ -1,17 +1,319 @@
+"""命令行入口（无需启动 Web 服务）
+
+    python main.py                          # 获取 / 刷新默认账号的薄荷 Token（兼容旧用法）
+    python main.py sign [--account A | --all] [--concurrency N]
+    python main.py refresh [--account A]
+    python main.py spin [--account A] [--count N]
+    python main.py status [--account A]
+    python main.py batch FILE [--format jsonl|csv] [--concurrency N] [--rate R]
+
+各子命令只加载自身需要的模块：不会导入 FastAPI / APScheduler，status 只读取本地存储，
+不会加载 curl_cffi 与 linux_do_connect。结果以 JSON 输出到标准输出，运行过程中的日志
+输出到标准错误；成功时退出码为 0，否则为 1。
+
+batch 逐行读取账号文件（FILE 为 - 时读取标准输入）并发签到，每完成一个账号即向标准输出
+写一行 JSON 结果，最后在标准错误输出汇总；内存占用与账号数量无关。
+
+加上 --profile-startup 会在标准错误输出各模块的导入耗时与各初始化步骤的耗时。
+"""
+
+import argparse
 import asyncio
-import os
+import contextlib
+import csv
+import importlib
+import itertools
+import json
+import sys
+import time
+from types import ModuleType
+from typing import IO, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+_STARTED = time.perf_counter()
+
+# (子命令结果, 是否成功)
+CommandResult = Tuple[Dict[str, Any], bool]
+
+READ_CHUNK = 256  # batch 每次在线程中读取的账号文件行数
+
+
+class StartupProfiler:
+    """记录按需导入的模块与初始化步骤的耗时"""
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        # (类型, 名称, 耗时（毫秒）, 新加载的模块数)
+        self.records: List[Tuple[str, str, float, int]] = []
+
+    def load(self, name: str) -> ModuleType:
+        """导入模块并记录耗时（含其首次加载的依赖）"""
+        loaded = len(sys.modules)
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.records.append(("import", name, elapsed, len(sys.modules) - loaded))
+        return module
+
+    @contextlib.contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """记录一个初始化步骤的耗时"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append(("init", name, (time.perf_counter() - started) * 1000, 0))
+
+    def report(self) -> None:
+        if not self.enabled:
+            return
+        total = (time.perf_counter() - _STARTED) * 1000
+        print("startup profile (ms):", file=sys.stderr)
+        for kind, name, elapsed, modules in self.records:
+            extra = f"  (+{modules} modules)" if modules else ""
+            print(f"  {kind:<6} {name:<24} {elapsed:8.1f}{extra}", file=sys.stderr)
+        print(f"  {'total':<31} {total:8.1f}", file=sys.stderr)
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="薄荷自动签到命令行工具")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="在标准错误输出各模块的导入与初始化耗时")
+    commands = parser.add_subparsers(dest="command")
+
+    sign = commands.add_parser("sign", help="执行签到")
+    target = sign.add_mutually_exclusive_group()
+    target.add_argument("--account", default=None, help="账号名，默认为 default")
+    target.add_argument("--all", action="store_true", help="为全部账号并发签到")
+    sign.add_argument("--concurrency", type=int, default=None, help="--all 时的并发上限")
+
+    refresh = commands.add_parser("refresh", help="获取 / 刷新薄荷 Token")
+    refresh.add_argument("--account", default=None, help="账号名，默认为 default")
+
+    spin = commands.add_parser("spin", help="执行转盘抽奖")
+    spin.add_argument("--account", default=None, help="账号名，默认为 default")
+    spin.add_argument("--count", type=int, default=1, help="抽奖次数")
+
+    status = commands.add_parser("status", help="查看本地保存的账号与签到状态（不访问上游）")
+    status.add_argument("--account", default=None, help="仅查看该账号")
+
+    batch = commands.add_parser("batch", help="从 JSONL / CSV 文件流式读取账号并批量签到")
+    batch.add_argument("file", help="账号文件路径，- 表示标准输入")
+    batch.add_argument("--format", choices=("jsonl", "csv"), default=None,
+                       help="文件格式，默认按扩展名判断（.csv 为 CSV，其余为 JSONL）")
+    batch.add_argument("--concurrency", type=int, default=None, help="同时进行的签到数上限")
+    batch.add_argument("--rate", type=float, default=None, help="每秒签到请求数上限，<= 0 表示不限速")
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        # 兼容旧用法：不带子命令时刷新默认账号的 Token
+        args.command = "refresh"
+        args.account = None
+    return args
+
+
+def _account(args: argparse.Namespace, profiler: StartupProfiler) -> str:
+    return args.account or profiler.load("store.backend").DEFAULT_ACCOUNT
+
+
+def _set_sign_limits(args: argparse.Namespace, profiler: StartupProfiler) -> None:
+    """命令行进程只运行当前子命令，按参数设置签到上游主机的并发与速率上限"""
+    limiter = profiler.load("bohe_sign.limiter")
+    sign = profiler.load("bohe_sign.sign")
+    rate = getattr(args, "rate", None)
+    limiter.set_host_limits(
+        sign.SIGN_API,
+        args.concurrency or limiter.MAX_CONCURRENCY,
+        limiter.MAX_RATE if rate is None else rate
+    )
+
+
+async def cmd_sign(args: argparse.Namespace, profiler: StartupProfiler) -> CommandResult:
+    if args.all:
+        batch = profiler.load("bohe_sign.batch")
+        _set_sign_limits(args, profiler)
+        result = await batch.sign_accounts(trigger="cli")
+        return result, result["summary"]["failed"] == 0
+
+    sign = profiler.load("bohe_sign.sign")
+    account = _account(args, profiler)
+    result = await sign.do_sign(trigger="cli", account=account)
+    return {"account": account, **result}, bool(result.get("success"))
+
+
+async def cmd_refresh(args: argparse.Namespace, profiler: StartupProfiler) -> CommandResult:
+    login = profiler.load("bohe_sign.login")
+    token_cache = profiler.load("bohe_sign.token_cache")
+    account = _account(args, profiler)
+    bohe_token, _, _ = await login.get_bohe_token(account=account)
+    expiry = token_cache.get_token_expiry(bohe_token) if bohe_token else None
+    return {
+        "account": account,
+        "success": bohe_token is not None,
+        "message": "Successfully obtained Bohe Token" if bohe_token else "Failed to obtain Bohe Token",
+        "expires_at": expiry
+    }, bohe_token is not None
+
+
+async def cmd_spin(args: argparse.Namespace, profiler: StartupProfiler) -> CommandResult:
+    token_store = profiler.load("store.token")
+    account = _account(args, profiler)
+    token = token_store.load_tokens(account).get("bohe_sign_token", "")
+    if args.count > 1:
+        batch = profiler.load("bohe_sign.batch")
+        result = await batch.spin_tokens([(token, args.count)])
+        return {"account": account, **result}, result["summary"]["failed"] == 0
+
+    sign = profiler.load("bohe_sign.sign")
+    result = await sign.spin(token)
+    return {"account": account, **result}, bool(result.get("success"))
+
+
+async def cmd_status(args: argparse.Namespace, profiler: StartupProfiler) -> CommandResult:
+    token_store = profiler.load("store.token")
+    log = profiler.load("store.log")
+    config = profiler.load("store.config")
+    token_cache = profiler.load("bohe_sign.token_cache")
+
+    accounts = [args.account] if args.account else token_store.list_accounts()
+    result: Dict[str, Any] = {"schedule": config.get_schedule_config(), "accounts": {}}
+    for account in accounts:
+        tokens = token_store.load_tokens(account)
+        bohe_token = tokens.get("bohe_sign_token")
+        result["accounts"][account] = {
+            "has_bohe_token": bool(bohe_token),
+            "bohe_token_expires_at": token_cache.get_token_expiry(bohe_token) if bohe_token else None,
+            "has_linux_do_token": bool(tokens.get("linux_do_token")),
+            "has_linux_do_connect_token": bool(tokens.get("linux_do_connect_token")),
+            **log.get_sign_stats(account)
+        }
+    return result, True
+
+
+def iter_account_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], str]]:
+    """逐行解析账号文件
+
+    JSONL 每行为含 account 字段的对象或账号名字符串；CSV 需带表头且含 account 列。
+    两种格式都可附带 store.token.TOKEN_KEYS 中的 Token 字段。
+
+    Yields:
+        (行号, 账号记录, 错误信息)，无效行的记录为 None
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        if "account" not in (reader.fieldnames or []):
+            yield reader.line_num, None, "CSV 缺少 account 列"
+            return
+        for row in reader:
+            account = (row.get("account") or "").strip()
+            if account:
+                yield reader.line_num, {**row, "account": account}, ""
+            else:
+                yield reader.line_num, None, "账号名为空"
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"无效的 JSON: {e}"
+            continue
+        if isinstance(record, str):
+            record = {"account": record}
+        if not isinstance(record, dict) or not isinstance(record.get("account"), str) or not record["account"].strip():
+            yield line_no, None, "缺少账号名 account"
+            continue
+        yield line_no, {**record, "account": record["account"].strip()}, ""
+
+
+async def cmd_batch(args: argparse.Namespace, profiler: StartupProfiler) -> CommandResult:
+    batch = profiler.load("bohe_sign.batch")
+    token_store = profiler.load("store.token")
+    fmt = args.format or ("csv" if args.file.lower().endswith(".csv") else "jsonl")
+    counts = {"total": 0, "succeeded": 0, "failed": 0, "invalid": 0}
+
+    def emit(line: Dict[str, Any]) -> None:
+        args.stdout.write(json.dumps(line, ensure_ascii=False) + "\n")
+        args.stdout.flush()
+
+    async def accounts(stream: IO[str]) -> AsyncIterator[Tuple[str, Dict[str, str]]]:
+        # 在线程中逐块读取与解析，标准输入等待数据时不阻塞事件循环
+        records = iter_account_records(stream, fmt)
+        while True:
+            chunk = await asyncio.to_thread(lambda: list(itertools.islice(records, READ_CHUNK)))
+            if not chunk:
+                return
+            for line_no, record, error in chunk:
+                if record is None:
+                    counts["invalid"] += 1
+                    emit({"line": line_no, "success": False, "message": error})
+                    continue
+                # 附带的 Token 直接用于本次签到，不写入存储
+                tokens = {key: record[key] for key in token_store.TOKEN_KEYS if record.get(key)}
+                yield record["account"], tokens
+
+    try:
+        stream = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8", newline="")
+    except OSError as e:
+        return {"success": False, "message": f"无法读取账号文件: {e}"}, False
+
+    _set_sign_limits(args, profiler)
+    started = time.perf_counter()
+    try:
+        async for result in batch.sign_stream(accounts(stream), trigger="cli"):
+            counts["total"] += 1
+            counts["succeeded" if result["success"] else "failed"] += 1
+            emit(result)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    summary = {**counts, "wall_time_ms": round((time.perf_counter() - started) * 1000, 2)}
+    return {"summary": summary}, counts["failed"] == 0 and counts["invalid"] == 0
+
+
+COMMANDS = {
+    "sign": (cmd_sign, True),
+    "refresh": (cmd_refresh, True),
+    "spin": (cmd_spin, True),
+    "status": (cmd_status, False),  # 只读本地存储，不访问上游
+    "batch": (cmd_batch, True)
+}
+
+# 逐行输出结果的子命令，最终汇总写到标准错误
+STREAMING_COMMANDS = {"batch"}
+
+
+async def run(args: argparse.Namespace, profiler: StartupProfiler) -> CommandResult:
+    command, uses_upstream = COMMANDS[args.command]
+    writer = profiler.load("store.writer")
+    try:
+        with profiler.step(f"command {args.command}"):
+            return await command(args, profiler)
+    finally:
+        with profiler.step("shutdown"):
+            if uses_upstream:
+                await profiler.load("bohe_sign.linux_do").close_clients()
+                await profiler.load("bohe_sign.session").close_sessions()
+            await writer.flush_writes()
 
-from bohe_sign.login import get_bohe_token
 
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    profiler = StartupProfiler(args.profile_startup)
+    args.stdout = sys.stdout
 
-async def main():
-    bohe_token, linux_do_connect_token, linux_do_token = await get_bohe_token()
+    # 运行过程中的日志输出到标准错误，标准输出只保留结果
+    with contextlib.redirect_stdout(sys.stderr):
+        result, ok = asyncio.run(run(args, profiler))
 
-    if bohe_token:
-        print("Successfully obtained Bohe Token")
-    else:
-        print("Failed to obtain Bohe Token")
+    output = sys.stderr if args.command in STREAMING_COMMANDS else sys.stdout
+    print(json.dumps(result, ensure_ascii=False, default=str), file=output)
+    profiler.report()
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    sys.exit(main(sys.argv[1:]))
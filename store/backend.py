@@ -0,0 +1,224 @@
+"""存储后端接口
+
+store.token / store.config / store.log 通过 get_backend() 获取当前后端读写数据。
+默认使用 JSON 文件后端，可通过环境变量 BOHE_STORE_BACKEND=sqlite 切换到 SQLite。
+多个进程共用存储时（见 store.lock.multiprocess_enabled），两种后端的写入都在跨进程文件锁内进行。
+此时等待锁与同步落盘可能耗时较长，事件循环中的写操作应通过 run_write() / submit_write()
+放到线程中执行。SQLite 后端即使单进程运行也在调用线程中直接查询与提交（WAL 提交需要落盘），
+因此事件循环中对它的写操作同样放到线程中执行，日志等较重的读取通过 run_read() 执行。
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+BACKEND_ENV = "BOHE_STORE_BACKEND"
+DEFAULT_BACKEND = "json"
+
+# 未指定账号时使用的账号名
+DEFAULT_ACCOUNT = "default"
+
+
+class StorageBackend(ABC):
+    """存储后端抽象基类"""
+
+    name = ""
+    # 是否与其它进程共用存储（写入需等待跨进程锁）
+    shared = False
+    # 读写是否在调用线程中直接访问磁盘（如 SQLite 的查询与提交）
+    blocking = False
+
+    # ---- Token ----
+
+    @abstractmethod
+    def load_tokens(self, account: str) -> Optional[Dict[str, str]]:
+        """读取账号 Token，账号不存在时返回 None"""
+
+    @abstractmethod
+    def save_tokens(self, account: str, tokens: Dict[str, str]) -> None:
+        """保存账号 Token（整体覆盖）"""
+
+    @abstractmethod
+    def list_accounts(self) -> List[str]:
+        """返回已保存的全部账号名"""
+
+    # ---- Linux.do Cookie ----
+
+    @abstractmethod
+    def load_cookies(self, account: str) -> List[Dict[str, Any]]:
+        """读取账号的 Linux.do Cookie，不存在时返回空列表"""
+
+    @abstractmethod
+    def save_cookies(self, account: str, cookies: List[Dict[str, Any]]) -> None:
+        """保存账号的 Linux.do Cookie（整体覆盖）"""
+
+    # ---- 配置 ----
+
+    @abstractmethod
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        """读取配置，不存在时返回 None"""
+
+    @abstractmethod
+    def save_config(self, config: Dict[str, Any]) -> None:
+        """保存配置（整体覆盖）"""
+
+    # ---- 签到日志 ----
+
+    @abstractmethod
+    def append_log(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """追加一条日志并分配 id"""
+
+    @abstractmethod
+    def get_logs(
+        self,
+        offset: int = 0,
+        limit: int = 10,
+        before_id: Optional[int] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """按 id 倒序读取日志
+
+        Args:
+            offset: 跳过的条数（偏移分页）
+            limit: 返回条数
+            before_id: 仅返回 id 小于该值的日志（键集分页），指定时忽略 offset
+
+        Returns:
+            (日志总数, 日志列表)
+        """
+
+    @abstractmethod
+    def iter_logs(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        status: Optional[str] = None,
+        trigger: Optional[str] = None,
+        account: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """按 id 正序遍历日志
+
+        Args:
+            since: 仅返回 time 不早于该时间的日志（ISO 格式，与日志 time 字段同格式）
+            until: 仅返回 time 早于该时间的日志
+            status / trigger / account: 仅返回对应字段等于该值的日志
+        """
+
+    @abstractmethod
+    def load_log_stats(self, account: str) -> Optional[Dict[str, Any]]:
+        """读取账号签到统计"""
+
+    @abstractmethod
+    def save_log_stats(self, account: str, stats: Dict[str, Any]) -> None:
+        """保存账号签到统计"""
+
+    @abstractmethod
+    def all_log_stats(self) -> Dict[str, Dict[str, Any]]:
+        """读取全部账号的签到统计"""
+
+    # ---- 定时任务 ----
+
+    @abstractmethod
+    def load_jobs(self) -> Dict[str, bytes]:
+        """读取持久化的调度任务（任务 id -> 序列化的任务状态）"""
+
+    @abstractmethod
+    def save_job(self, job_id: str, state: bytes) -> None:
+        """保存调度任务状态（整体覆盖）"""
+
+    @abstractmethod
+    def delete_job(self, job_id: Optional[str] = None) -> None:
+        """删除调度任务，job_id 为空时删除全部"""
+
+    @abstractmethod
+    def append_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        """追加一条定时任务运行记录并分配 id"""
+
+    @abstractmethod
+    def get_runs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """按 id 倒序读取最近的运行记录"""
+
+    def locked(self) -> ContextManager[Any]:
+        """跨进程互斥的读-改-写区间（可重入）
+
+        多个进程共用存储时，读取后再写回的操作（如合并 Token 字段、更新签到索引）
+        需在此区间内完成，避免覆盖其它进程的写入。默认不加锁。
+        """
+        return nullcontext()
+
+    def close(self) -> None:
+        """释放后端资源"""
+
+
+_backend: Optional[StorageBackend] = None
+
+
+def create_backend(name: str) -> StorageBackend:
+    """按名称创建存储后端"""
+    if name == "json":
+        from store.json_backend import JsonBackend
+        return JsonBackend()
+    if name == "sqlite":
+        from store.sqlite_backend import SqliteBackend
+        return SqliteBackend()
+    raise ValueError(f"未知的存储后端: {name}")
+
+
+def get_backend() -> StorageBackend:
+    """获取当前存储后端（首次调用时按环境变量创建）"""
+    global _backend
+    if _backend is None:
+        _backend = create_backend(os.environ.get(BACKEND_ENV, DEFAULT_BACKEND).lower())
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]) -> None:
+    """替换当前存储后端，传入 None 则在下次访问时重新创建"""
+    global _backend
+    if _backend is not None and _backend is not backend:
+        _backend.close()
+    _backend = backend
+
+
+def close_backend() -> None:
+    """关闭当前存储后端"""
+    set_backend(None)
+
+
+async def run_write(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在事件循环中执行存储写操作（如 store.token.save_tokens）
+
+    多个进程共用存储或后端直接访问磁盘时在线程池中执行，等待其它进程释放锁与落盘期间
+    事件循环照常处理请求；否则直接调用（单进程的 JSON 后端的落盘本就由写线程完成）。
+    """
+    backend = get_backend()
+    if backend.shared or backend.blocking:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+async def run_read(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在事件循环中执行存储读操作（如 store.log.get_sign_logs）
+
+    后端直接访问磁盘时在线程池中执行；JSON 后端的读取来自内存缓存，直接调用。
+    """
+    if get_backend().blocking:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def submit_write(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """在无法 await 的回调中（如调度器的任务存储）提交存储写操作
+
+    多个进程共用存储或后端直接访问磁盘时交给写线程按提交顺序执行，不等待完成；
+    否则直接调用。
+    """
+    backend = get_backend()
+    if backend.shared or backend.blocking:
+        from store.writer import get_writer
+        get_writer().call(lambda: fn(*args, **kwargs))
+        return
+    fn(*args, **kwargs)
@@ -1,26 +1,24 @@
 """配置存储模块 - 管理定时任务配置等"""
 
-import json
-import os
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-CONFIG_FILE = "./data/config.json"
+from bohe_sign.metrics import STORE_SECONDS
+from store.backend import get_backend
 
-
-def _ensure_data_dir() -> None:
-    """确保 data 目录存在"""
-    os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+# 定时签到时间（HH:MM）所在的时区，调度器与 Token 续期均按该时区计算
+SCHEDULE_TIMEZONE = "Asia/Shanghai"
 
 
 def load_config() -> Dict[str, Any]:
-    """加载配置文件"""
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
+    """加载配置"""
+    try:
+        with STORE_SECONDS.time(operation="load_config"):
+            config = get_backend().load_config()
+        if config is not None:
+            return config
+    except Exception as e:
+        print(f"Error loading config: {e}")
 
     # 返回默认配置
     default_config = {
@@ -32,7 +30,7 @@ def load_config() -> Dict[str, Any]:
 
 
 def save_config(config: Dict[str, Any]) -> bool:
-    """保存配置到文件
+    """保存配置
     
     Args:
         config: 要保存的配置字典
@@ -40,14 +38,12 @@ def save_config(config: Dict[str, Any]) -> bool:
     Returns:
         是否保存成功
     """
-    _ensure_data_dir()
-    
     # 更新修改时间
     config["last_modified"] = datetime.now().isoformat()
     
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=4, ensure_ascii=False)
+        with STORE_SECONDS.time(operation="save_config"):
+            get_backend().save_config(config)
         return True
     except Exception as e:
         print(f"Error saving config: {e}")
@@ -78,7 +74,19 @@ def set_schedule_config(enabled: bool, time_str: Optional[str] = None) -> bool:
     Returns:
         是否设置成功
     """
-    config = load_config()
-    config["schedule_enabled"] = enabled
-    config["schedule_time"] = time_str if enabled else None
-    return save_config(config)
\ No newline at end of file
+    return update_config(schedule_enabled=enabled, schedule_time=time_str if enabled else None)
+
+
+def update_config(**changes: Any) -> bool:
+    """修改部分配置项（读取、修改、保存在同一跨进程锁内完成）
+
+    Args:
+        **changes: 要修改的配置项
+
+    Returns:
+        是否保存成功
+    """
+    with get_backend().locked():
+        config = load_config()
+        config.update(changes)
+        return save_config(config)
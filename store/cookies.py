@@ -0,0 +1,33 @@
+"""Linux.do Cookie 存储模块
+
+各账号 Linux.do 客户端的 Cookie 由当前存储后端持久化（见 store.backend），
+进程重启后可继续使用未过期的登录会话。
+"""
+
+from typing import Any, Dict, List
+
+from bohe_sign.metrics import STORE_SECONDS
+from store.backend import DEFAULT_ACCOUNT, get_backend
+
+
+def load_cookies(account: str = DEFAULT_ACCOUNT) -> List[Dict[str, Any]]:
+    """读取账号的 Linux.do Cookie
+
+    Returns:
+        Cookie 列表，每项包含 name, value, domain, path, expires
+    """
+    try:
+        with STORE_SECONDS.time(operation="load_cookies"):
+            return get_backend().load_cookies(account)
+    except Exception as e:
+        print(f"Error loading cookies: {e}")
+        return []
+
+
+def save_cookies(cookies: List[Dict[str, Any]], account: str = DEFAULT_ACCOUNT) -> None:
+    """保存账号的 Linux.do Cookie（整体覆盖）"""
+    try:
+        with STORE_SECONDS.time(operation="save_cookies"):
+            get_backend().save_cookies(account, cookies)
+    except Exception as e:
+        print(f"Error saving cookies: {e}")
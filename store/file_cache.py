@@ -0,0 +1,122 @@
+"""JSON 文件内存缓存
+
+读取时直接返回内存中的解析结果；文件的 mtime / inode / 大小变化（例如被外部编辑）
+时重新加载。为避免每次读取都产生 stat 系统调用，同一文件两次检查之间至少间隔
+CHECK_INTERVAL 秒。写入通过 store() 同步更新缓存；异步落盘期间（pending）不检查文件，
+落盘完成后由 mark_written() 记录新的文件签名。
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+CHECK_INTERVAL = 1.0  # 文件变更检查间隔（秒）
+
+# 文件签名：(mtime_ns, inode, size)，文件不存在时为 None
+Signature = Optional[Tuple[int, int, int]]
+
+# 等待落盘的条目使用的占位签名
+PENDING = (-1, -1, -1)
+
+
+def file_signature(path: str) -> Signature:
+    """文件签名，文件不存在时返回 None"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_ino, st.st_size
+
+
+class JsonFileCache:
+    """按文件路径缓存 JSON 内容"""
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL) -> None:
+        self.check_interval = check_interval
+        # path -> (签名, 上次检查时间, 数据)
+        self._entries: Dict[str, Tuple[Signature, float, Any]] = {}
+        # 每个文件最近一次 store() 的序号，用于在写线程中识别过期的落盘通知
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    def _load(self, path: str, default: Any) -> Any:
+        signature = file_signature(path)
+        data = default
+        if signature is not None:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception:
+                data = default
+        self.loads += 1
+        self._entries[path] = (signature, time.monotonic(), data)
+        return data
+
+    def read(self, path: str, default: Any = None) -> Any:
+        """读取文件内容（返回副本，调用方可自由修改）"""
+        entry = self._entries.get(path)
+        now = time.monotonic()
+
+        if entry is None:
+            data = self._load(path, default)
+        else:
+            signature, checked_at, data = entry
+            if signature != PENDING and now - checked_at >= self.check_interval:
+                current = file_signature(path)
+                if current != signature:
+                    return copy.deepcopy(self._load(path, default))
+                self._entries[path] = (signature, now, data)
+            self.hits += 1
+
+        return copy.deepcopy(data) if data is not None else default
+
+    def store(self, path: str, data: Any, pending: bool = False) -> int:
+        """记录写入文件的内容
+
+        Args:
+            path: 文件路径
+            data: 写入的数据
+            pending: 数据尚未落盘，落盘前不根据文件签名重新加载
+
+        Returns:
+            本次写入的序号，供 mark_written() 使用
+        """
+        signature = PENDING if pending else file_signature(path)
+        with self._lock:
+            generation = self._generations.get(path, 0) + 1
+            self._generations[path] = generation
+            self._entries[path] = (signature, time.monotonic(), copy.deepcopy(data))
+        return generation
+
+    def mark_written(self, path: str, generation: int) -> None:
+        """数据已落盘，记录当前文件签名（在写线程中调用）
+
+        若此后又有新的写入，则保持等待状态，由新写入落盘后再更新。
+        """
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or self._generations.get(path) != generation:
+                return
+            self._entries[path] = (file_signature(path), time.monotonic(), entry[2])
+
+    def revalidate(self) -> None:
+        """下次读取时立即检查文件签名，不等待检查间隔（其它进程可能已修改文件）"""
+        with self._lock:
+            for path, (signature, _, data) in list(self._entries.items()):
+                self._entries[path] = (signature, float("-inf"), data)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """丢弃缓存，path 为空时清空全部"""
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(path, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        return {"files": len(self._entries), "hits": self.hits, "loads": self.loads}
@@ -0,0 +1,247 @@
+"""JSON 文件存储后端（默认）
+
+- token.json      默认账号的 Token
+- accounts.json   其它账号的 Token（按账号名索引）
+- cookies.json    各账号的 Linux.do Cookie（按账号名索引）
+- config.json     定时任务等配置
+- scheduler.json  持久化的调度任务与最近的运行记录
+- sign_log/       分段签到日志，见 store.segment_log
+
+单进程运行时写入由写线程异步合并落盘。多个进程共用 ./data 时（见 store.lock），
+每次写入都在跨进程锁 store.lock 内先重新读取其它进程的修改，再直接落盘后释放锁；
+事件循环中的调用方通过 store.backend.run_write() 在线程中执行，等待锁期间不阻塞请求。
+"""
+
+import base64
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from store.backend import DEFAULT_ACCOUNT, StorageBackend
+from store.file_cache import JsonFileCache
+from store.lock import ProcessLock, multiprocess_enabled
+from store.segment_log import SegmentLog
+from store.writer import atomic_write_text, get_writer
+
+TOKEN_FILE = "./data/token.json"
+ACCOUNTS_FILE = "./data/accounts.json"
+COOKIES_FILE = "./data/cookies.json"
+CONFIG_FILE = "./data/config.json"
+SCHEDULER_FILE = "./data/scheduler.json"
+LOG_DIR = "./data/sign_log"
+LEGACY_LOG_FILE = "./data/sign_log.json"  # 旧版单文件日志，首次加载时迁移
+LOCK_FILE = "./data/store.lock"
+
+MAX_RUN_HISTORY = 100  # scheduler.json 中保留的运行记录条数
+
+
+class JsonBackend(StorageBackend):
+    """基于本地 JSON 文件的存储后端"""
+
+    name = "json"
+
+    def __init__(self) -> None:
+        self._log: Optional[SegmentLog] = None
+        # token.json / accounts.json / cookies.json / config.json / scheduler.json 的内存缓存
+        self.files = JsonFileCache()
+        self.shared = multiprocess_enabled()
+        self.lock = ProcessLock(LOCK_FILE, shared=self.shared)
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        with self.lock.hold() as outermost:
+            if outermost and self.shared:
+                # 其它进程可能已修改文件，读-改-写前立即重新检查
+                self.files.revalidate()
+                if self._log is not None:
+                    self._log.refresh(force=True)
+            yield
+
+    def _write(self, path: str, data: Any) -> None:
+        if self.shared:
+            # 调用方已持有跨进程锁：直接落盘，释放锁后其它进程即可读到
+            atomic_write_text(path, json.dumps(data, indent=4, ensure_ascii=False))
+            self.files.store(path, data)
+            return
+        # 先更新内存缓存，落盘交给写线程；落盘后刷新缓存中的文件签名
+        generation = self.files.store(path, data, pending=True)
+        get_writer().write_json(
+            path, data,
+            on_commit=lambda: self.files.mark_written(path, generation)
+        )
+
+    # ---- Token ----
+
+    def load_tokens(self, account: str) -> Optional[Dict[str, str]]:
+        if account != DEFAULT_ACCOUNT:
+            return self.files.read(ACCOUNTS_FILE, {}).get(account)
+        return self.files.read(TOKEN_FILE)
+
+    def save_tokens(self, account: str, tokens: Dict[str, str]) -> None:
+        with self.locked():
+            if account != DEFAULT_ACCOUNT:
+                accounts = self.files.read(ACCOUNTS_FILE, {})
+                accounts[account] = tokens
+                self._write(ACCOUNTS_FILE, accounts)
+                return
+            self._write(TOKEN_FILE, tokens)
+
+    def list_accounts(self) -> List[str]:
+        return [DEFAULT_ACCOUNT] + [
+            name for name in self.files.read(ACCOUNTS_FILE, {}) if name != DEFAULT_ACCOUNT
+        ]
+
+    # ---- Linux.do Cookie ----
+
+    def load_cookies(self, account: str) -> List[Dict[str, Any]]:
+        return self.files.read(COOKIES_FILE, {}).get(account, [])
+
+    def save_cookies(self, account: str, cookies: List[Dict[str, Any]]) -> None:
+        with self.locked():
+            data = self.files.read(COOKIES_FILE, {})
+            if data.get(account) == cookies:
+                return
+            data[account] = cookies
+            self._write(COOKIES_FILE, data)
+
+    # ---- 配置 ----
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        return self.files.read(CONFIG_FILE)
+
+    def save_config(self, config: Dict[str, Any]) -> None:
+        with self.locked():
+            self._write(CONFIG_FILE, config)
+
+    # ---- 定时任务 ----
+
+    def _read_scheduler(self) -> Dict[str, Any]:
+        data = self.files.read(SCHEDULER_FILE, {})
+        data.setdefault("jobs", {})
+        data.setdefault("runs", [])
+        return data
+
+    def load_jobs(self) -> Dict[str, bytes]:
+        return {
+            job_id: base64.b64decode(state)
+            for job_id, state in self._read_scheduler()["jobs"].items()
+        }
+
+    def save_job(self, job_id: str, state: bytes) -> None:
+        with self.locked():
+            data = self._read_scheduler()
+            data["jobs"][job_id] = base64.b64encode(state).decode("ascii")
+            self._write(SCHEDULER_FILE, data)
+
+    def delete_job(self, job_id: Optional[str] = None) -> None:
+        with self.locked():
+            data = self._read_scheduler()
+            if job_id is None:
+                data["jobs"] = {}
+            elif data["jobs"].pop(job_id, None) is None:
+                return
+            self._write(SCHEDULER_FILE, data)
+
+    def append_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        with self.locked():
+            data = self._read_scheduler()
+            runs = data["runs"]
+            run["id"] = runs[-1]["id"] + 1 if runs else 1
+            runs.append(run)
+            data["runs"] = runs[-MAX_RUN_HISTORY:]
+            self._write(SCHEDULER_FILE, data)
+        return run
+
+    def get_runs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        runs = self._read_scheduler()["runs"]
+        return list(reversed(runs[-limit:])) if limit > 0 else []
+
+    # ---- 签到日志 ----
+
+    @property
+    def log(self) -> SegmentLog:
+        """分段日志（首次访问时加载，并迁移旧版日志）"""
+        if self._log is None:
+            with self.locked():
+                if self._log is None:
+                    log = SegmentLog(LOG_DIR, sync_writes=self.shared)
+                    if os.path.exists(LEGACY_LOG_FILE):
+                        self._migrate_legacy_log(log)
+                    self._log = log
+        elif self.shared:
+            # 读取其它进程追加的日志（至多每 CHECK_INTERVAL 秒检查一次）
+            self._log.refresh()
+        return self._log
+
+    def _migrate_legacy_log(self, log: SegmentLog) -> None:
+        """将旧版 sign_log.json 迁移为分段日志"""
+        try:
+            with open(LEGACY_LOG_FILE, "r", encoding="utf-8") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            print(f"Error reading legacy logs: {e}")
+            return
+
+        legacy_logs = legacy.get("logs", [])
+
+        # 旧版日志按时间倒序保存
+        for entry in sorted(legacy_logs, key=lambda item: item.get("id", 0)):
+            entry.setdefault("account", DEFAULT_ACCOUNT)
+            log.append(entry)
+
+        legacy_stats = {DEFAULT_ACCOUNT: legacy.get("stats", {})}
+        legacy_stats.update(legacy.get("account_stats", {}))
+        for account, account_stats in legacy_stats.items():
+            merged = dict(account_stats)
+            merged["last_sign_time"] = next(
+                (
+                    item.get("time") for item in legacy_logs
+                    if item.get("status") == "success"
+                    and item.get("account", DEFAULT_ACCOUNT) == account
+                ),
+                None
+            )
+            log.save_stats(account, merged)
+
+        os.replace(LEGACY_LOG_FILE, LEGACY_LOG_FILE + ".migrated")
+        print(f"已迁移旧版签到日志 {len(legacy_logs)} 条")
+
+    def append_log(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        with self.locked():
+            return self.log.append(entry)
+
+    def get_logs(
+        self,
+        offset: int = 0,
+        limit: int = 10,
+        before_id: Optional[int] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        return self.log.page(offset, limit, before_id)
+
+    def iter_logs(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        status: Optional[str] = None,
+        trigger: Optional[str] = None,
+        account: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        fields = {"status": status, "trigger": trigger, "account": account}
+        fields = {key: value for key, value in fields.items() if value is not None}
+        for entry in self.log.iter_entries(since, until):
+            if all(entry.get(key) == value for key, value in fields.items()):
+                yield entry
+
+    def load_log_stats(self, account: str) -> Optional[Dict[str, Any]]:
+        return self.log.load_stats(account)
+
+    def save_log_stats(self, account: str, stats: Dict[str, Any]) -> None:
+        with self.locked():
+            self.log.save_stats(account, stats)
+
+    def all_log_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self.log.all_stats()
+
+    def close(self) -> None:
+        self.lock.close()
@@ -0,0 +1,99 @@
+"""跨进程文件锁
+
+多个进程（如 uvicorn --workers N 的各个 worker）共用同一份存储时，对锁文件加
+fcntl.flock 排它锁，保证读-改-写过程不被其它进程打断。进程退出（包括异常退出）
+时锁由操作系统自动释放。
+
+不支持 fcntl 的平台（Windows）上退化为进程内的线程锁，此时只能单进程运行。
+"""
+
+import multiprocessing
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+MULTIPROCESS_ENV = "BOHE_MULTIPROCESS"
+
+
+def multiprocess_enabled() -> bool:
+    """是否有多个进程共用存储
+
+    由环境变量 BOHE_MULTIPROCESS（1 / 0）显式指定；未设置时自动检测：
+    uvicorn --workers N 的 worker 由 multiprocessing 启动，WEB_CONCURRENCY 为 uvicorn 的 worker 数。
+    """
+    value = os.environ.get(MULTIPROCESS_ENV, "").strip().lower()
+    if value:
+        return value in ("1", "true", "yes", "on")
+    try:
+        workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    except ValueError:
+        workers = 1
+    return workers > 1 or multiprocessing.parent_process() is not None
+
+
+class ProcessLock:
+    """可重入的跨进程排它锁"""
+
+    def __init__(self, path: str, shared: bool = True) -> None:
+        """
+        Args:
+            path: 锁文件路径
+            shared: 是否加跨进程锁，为 False 时只使用进程内的线程锁
+        """
+        self.path = path
+        self.shared = shared and fcntl is not None
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd: Optional[int] = None
+
+    def _open(self) -> int:
+        if self._fd is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """加锁，非阻塞模式下锁被其它进程持有时返回 False"""
+        if not self._lock.acquire(blocking):
+            return False
+        if self._depth == 0 and self.shared:
+            flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+            try:
+                fcntl.flock(self._open(), flags)
+            except BlockingIOError:
+                self._lock.release()
+                return False
+            except BaseException:
+                self._lock.release()
+                raise
+        self._depth += 1
+        return True
+
+    def release(self) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self.shared:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._lock.release()
+
+    @contextmanager
+    def hold(self) -> Iterator[bool]:
+        """持有锁的上下文，返回是否为最外层加锁"""
+        self.acquire()
+        try:
+            yield self._depth == 1
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        """关闭锁文件（持有的锁随之释放）"""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
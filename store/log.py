@@ -1,200 +1,211 @@
-"""签到日志存储模块 - 管理签到日志的读写操作"""
+"""签到日志存储模块 - 管理签到日志的读写操作
+
+日志与统计的持久化由当前存储后端负责（见 store.backend）。每个账号的签到统计
+是一份按天的签到索引（见 store.sign_index），随日志追加更新，查询无需扫描日志。
+"""
 
-import json
-import os
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, Optional
 
-LOG_FILE = "./data/sign_log.json"
-MAX_LOGS = 50  # 保存最近 50 条记录
+from bohe_sign.metrics import STORE_SECONDS
+from store.backend import DEFAULT_ACCOUNT, StorageBackend, get_backend
+from store.sign_index import current_streak, empty_index, is_index, mark_signed, merge_legacy
 
+# 导出 CSV 时的列
+LOG_EXPORT_FIELDS = ("id", "time", "account", "status", "trigger", "message")
 
-def _ensure_data_dir() -> None:
-    """确保 data 目录存在"""
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
+def _load_index(backend: StorageBackend, account: str) -> Dict[str, Any]:
+    """读取账号的签到索引，旧版本的统计数据先由日志重建"""
+    stats = backend.load_log_stats(account)
+    if stats is None:
+        return empty_index()
+    if not is_index(stats):
+        rebuild_sign_index()
+        stats = backend.load_log_stats(account) or empty_index()
+    return stats
 
-def _get_default_data() -> Dict[str, Any]:
-    """获取默认的日志数据结构"""
-    return {
-        "logs": [],
-        "stats": {
-            "total_signs": 0,
-            "continuous_days": 0,
-            "last_sign_date": None
-        }
-    }
 
+def rebuild_sign_index(account: Optional[str] = None) -> int:
+    """遍历一次签到日志，重建签到索引
 
-def load_logs() -> Dict[str, Any]:
-    """加载签到日志数据"""
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return _get_default_data()
-
+    旧版本统计中的签到次数与连续签到日期会一并并入（见 store.sign_index.merge_legacy）。
 
-def save_logs(data: Dict[str, Any]) -> bool:
-    """保存签到日志数据
-    
     Args:
-        data: 日志数据字典
-        
+        account: 仅重建该账号，默认为全部账号
+
     Returns:
-        是否保存成功
+        重建的账号数
     """
-    _ensure_data_dir()
-    
-    try:
-        with open(LOG_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"Error saving logs: {e}")
-        return False
+    backend = get_backend()
+    indexes: Dict[str, Dict[str, Any]] = {}
+    with backend.locked(), STORE_SECONDS.time(operation="rebuild_sign_index"):
+        for entry in backend.iter_logs():
+            entry_account = entry.get("account", DEFAULT_ACCOUNT)
+            if entry.get("status") != "success" or (account is not None and entry_account != account):
+                continue
+            try:
+                at = datetime.fromisoformat(entry["time"])
+            except (KeyError, ValueError):
+                continue
+            mark_signed(indexes.setdefault(entry_account, empty_index()), at)
+
+        legacy_stats = backend.all_log_stats()
+        if account is not None:
+            legacy_stats = {account: legacy_stats[account]} if account in legacy_stats else {}
+        for name, legacy in legacy_stats.items():
+            index = indexes.setdefault(name, empty_index())
+            if not is_index(legacy):
+                merge_legacy(index, legacy)
+
+        for name, index in indexes.items():
+            backend.save_log_stats(name, index)
+    return len(indexes)
 
 
 def add_sign_log(
     status: str,
     message: str,
-    trigger: str = "manual"
+    trigger: str = "manual",
+    account: str = DEFAULT_ACCOUNT
 ) -> Dict[str, Any]:
     """添加签到日志
-    
+
     Args:
         status: 签到状态 (success/failed)
         message: 签到消息
-        trigger: 触发方式 (manual/scheduled)
-        
+        trigger: 触发方式 (manual/scheduled/batch)
+        account: 账号名
+
     Returns:
         新添加的日志条目
     """
-    data = load_logs()
-    logs = data.get("logs", [])
-    stats = data.get("stats", {})
-    
-    # 生成新的日志 ID
-    new_id = 1
-    if logs:
-        new_id = max(log.get("id", 0) for log in logs) + 1
-    
-    # 创建日志条目
+    backend = get_backend()
     now = datetime.now()
+
+    # 创建日志条目
     log_entry = {
-        "id": new_id,
         "time": now.isoformat(),
         "status": status,
         "message": message,
-        "trigger": trigger
+        "trigger": trigger,
+        "account": account
     }
-    
-    # 添加到日志列表头部
-    logs.insert(0, log_entry)
-    
-    # 保持最多 MAX_LOGS 条记录
-    if len(logs) > MAX_LOGS:
-        logs = logs[:MAX_LOGS]
-    
-    # 更新统计数据
-    today_str = now.date().isoformat()
-    
-    if status == "success":
-        stats["total_signs"] = stats.get("total_signs", 0) + 1
-        
-        last_sign_date = stats.get("last_sign_date")
-        
-        if last_sign_date:
+
+    # 追加日志与更新索引在同一跨进程锁内完成，多进程时索引不会遗漏其它进程的签到
+    with backend.locked():
+        # 旧版本统计需由日志重建索引，须在追加本条日志之前读取，避免重复计入
+        index = None
+        if status == "success":
+            try:
+                with STORE_SECONDS.time(operation="load_log_stats"):
+                    index = _load_index(backend, account)
+            except Exception as e:
+                print(f"Error loading log stats: {e}")
+
+        try:
+            with STORE_SECONDS.time(operation="append_log"):
+                backend.append_log(log_entry)
+        except Exception as e:
+            print(f"Error saving logs: {e}")
+
+        # 更新签到索引
+        if index is not None:
             try:
-                last_date = date.fromisoformat(last_sign_date)
-                today = now.date()
-                days_diff = (today - last_date).days
-                
-                if days_diff == 1:
-                    # 连续签到
-                    stats["continuous_days"] = stats.get("continuous_days", 0) + 1
-                elif days_diff > 1:
-                    # 连续签到中断
-                    stats["continuous_days"] = 1
-                # days_diff == 0 表示同一天重复签到，不更新连续天数
-            except ValueError:
-                stats["continuous_days"] = 1
-        else:
-            stats["continuous_days"] = 1
-        
-        stats["last_sign_date"] = today_str
-    
-    data["logs"] = logs
-    data["stats"] = stats
-    save_logs(data)
-    
+                with STORE_SECONDS.time(operation="save_log_stats"):
+                    mark_signed(index, now)
+                    backend.save_log_stats(account, index)
+            except Exception as e:
+                print(f"Error saving log stats: {e}")
+
     return log_entry
 
 
-def get_sign_logs(page: int = 1, limit: int = 10) -> Dict[str, Any]:
-    """获取签到日志列表（分页）
-    
+def get_sign_logs(
+    page: int = 1,
+    limit: int = 10,
+    before_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """获取签到日志列表（分页，按时间倒序）
+
     Args:
         page: 页码（从 1 开始）
         limit: 每页数量
-        
+        before_id: 键集分页游标，仅返回 id 小于该值的日志，指定时忽略 page
+
     Returns:
-        包含分页信息和日志列表的字典
+        包含分页信息和日志列表的字典，next_before_id 为下一页的游标
     """
-    data = load_logs()
-    logs = data.get("logs", [])
-    total = len(logs)
-    
-    # 计算分页
-    start = (page - 1) * limit
-    end = start + limit
-    page_logs = logs[start:end]
-    
+    with STORE_SECONDS.time(operation="get_logs"):
+        total, page_logs = get_backend().get_logs(
+            offset=(page - 1) * limit,
+            limit=limit,
+            before_id=before_id
+        )
+
     return {
         "total": total,
         "page": page,
         "limit": limit,
-        "logs": page_logs
+        "logs": page_logs,
+        "next_before_id": page_logs[-1]["id"] if len(page_logs) == limit else None
     }
 
 
-def get_sign_stats() -> Dict[str, Any]:
+def _to_log_time(value: Optional[datetime]) -> Optional[str]:
+    """转换为与日志 time 字段可比较的本地时间字符串"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat()
+
+
+def iter_sign_logs(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status: Optional[str] = None,
+    trigger: Optional[str] = None,
+    account: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """按时间正序遍历签到日志（逐段读取，不加载全部历史）
+
+    Args:
+        since: 起始时间（含）
+        until: 结束时间（不含）
+        status: 签到状态 (success/failed)
+        trigger: 触发方式
+        account: 账号名
+
+    Yields:
+        符合条件的日志条目
+    """
+    return get_backend().iter_logs(
+        since=_to_log_time(since),
+        until=_to_log_time(until),
+        status=status,
+        trigger=trigger,
+        account=account
+    )
+
+
+def get_sign_stats(account: str = DEFAULT_ACCOUNT) -> Dict[str, Any]:
     """获取签到统计数据
-    
+
+    Args:
+        account: 账号名
+
     Returns:
         签到统计数据字典
     """
-    data = load_logs()
-    stats = data.get("stats", {})
-    logs = data.get("logs", [])
-    
-    # 检查今日是否已签到
-    signed_today = False
-    last_sign_time = None
-    today_str = date.today().isoformat()
-    
-    if logs:
-        for log in logs:
-            if log.get("status") == "success":
-                log_time = log.get("time", "")
-                if log_time:
-                    try:
-                        log_date = datetime.fromisoformat(log_time).date()
-                        if log_date.isoformat() == today_str:
-                            signed_today = True
-                            last_sign_time = log_time
-                            break
-                        # 找到最近一次成功签到时间
-                        if last_sign_time is None:
-                            last_sign_time = log_time
-                    except ValueError:
-                        pass
-    
+    with STORE_SECONDS.time(operation="load_log_stats"):
+        index = _load_index(get_backend(), account)
+
+    today = date.today()
     return {
-        "signed_today": signed_today,
-        "last_sign_time": last_sign_time,
-        "continuous_days": stats.get("continuous_days", 0),
-        "total_signs": stats.get("total_signs", 0)
-    }
\ No newline at end of file
+        "signed_today": index.get("last_sign_date") == today.isoformat(),
+        "last_sign_time": index.get("last_sign_time"),
+        "continuous_days": current_streak(index, today),
+        "longest_streak": index.get("longest_streak", 0),
+        "total_signs": index.get("total_signs", 0)
+    }
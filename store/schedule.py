@@ -0,0 +1,65 @@
+"""定时任务运行记录存储模块
+
+运行记录由当前存储后端持久化（见 store.backend）。
+"""
+
+from typing import Any, Dict, List, Optional
+
+from bohe_sign.metrics import STORE_SECONDS
+from store.backend import get_backend
+
+
+def add_schedule_run(
+    job_id: str,
+    outcome: str,
+    message: str = "",
+    scheduled_at: Optional[str] = None,
+    started_at: Optional[str] = None,
+    finished_at: Optional[str] = None,
+    duration_ms: Optional[float] = None,
+    extra: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """添加一条定时任务运行记录
+
+    Args:
+        job_id: 任务 ID
+        outcome: 运行结果 (success/partial/failed/missed)
+        message: 结果说明
+        scheduled_at: 计划运行时间
+        started_at: 实际开始时间
+        finished_at: 结束时间
+        duration_ms: 运行耗时（毫秒）
+        extra: 附加字段（如精确触发的时钟偏差与触发误差）
+
+    Returns:
+        新添加的运行记录
+    """
+    run = {
+        "job_id": job_id,
+        "scheduled_at": scheduled_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "duration_ms": duration_ms,
+        "outcome": outcome,
+        "message": message
+    }
+    if extra:
+        run.update(extra)
+
+    try:
+        with STORE_SECONDS.time(operation="append_run"):
+            get_backend().append_run(run)
+    except Exception as e:
+        print(f"Error saving schedule run: {e}")
+
+    return run
+
+
+def get_schedule_runs(limit: int = 10) -> List[Dict[str, Any]]:
+    """获取最近的定时任务运行记录（按时间倒序）"""
+    try:
+        with STORE_SECONDS.time(operation="get_runs"):
+            return get_backend().get_runs(limit)
+    except Exception as e:
+        print(f"Error loading schedule runs: {e}")
+        return []
@@ -0,0 +1,357 @@
+"""追加写分段日志文件
+
+日志以 JSONL 分段文件保存在 log_dir 下：
+
+- segment-000001.jsonl       当前写入的活动分段
+- segment-000000.jsonl.gz    已封存并压缩的历史分段
+- index.json                 已封存分段的 id / 时间范围索引（仅在封存时更新）
+- stats/<账号>.json          各账号的签到统计，每个账号一个文件（文件名为账号名的 URL 安全 base64）
+
+追加一条日志只需写入一行，写入成本与历史长度无关；分页读取通过索引
+按条数或 id 定位到所需分段，无需读取全部历史。更新统计只重写所属账号的文件，
+与账号数无关；统计不常驻内存，只保留尚未落盘的写入。
+
+所有写入经由 store.writer 的写线程完成。活动分段（至多 segment_max_entries 条）
+同时保存在内存中，读取不依赖尚未落盘的写入。
+
+多个进程共用日志目录时（sync_writes），写入改为在调用方（已持有跨进程锁）中直接落盘，
+并通过 refresh() 读取其它进程追加的日志与封存的分段（统计每次都从文件读取）。
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from store.file_cache import CHECK_INTERVAL, file_signature
+from store.writer import append_text, atomic_write_text, get_writer
+
+SEGMENT_MAX_ENTRIES = 1000  # 单个分段的最大条数，达到后封存压缩
+LEGACY_STATS_FILE = "stats.json"  # 旧版本保存全部账号统计的文件
+
+
+def read_json(path: str, default: Any) -> Any:
+    """读取 JSON 文件，不存在或损坏时返回默认值"""
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            pass
+    return default
+
+
+def _stats_name(account: str) -> str:
+    """账号统计文件名"""
+    return base64.urlsafe_b64encode(account.encode("utf-8")).decode("ascii").rstrip("=") + ".json"
+
+
+def _stats_account(name: str) -> str:
+    """由统计文件名还原账号名"""
+    encoded = name[:-len(".json")]
+    return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8")
+
+
+def _segment_meta(seq: int, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """根据分段条目生成索引信息"""
+    return {
+        "seq": seq,
+        "count": len(entries),
+        "first_id": entries[0]["id"] if entries else None,
+        "last_id": entries[-1]["id"] if entries else None,
+        "first_time": entries[0]["time"] if entries else None,
+        "last_time": entries[-1]["time"] if entries else None
+    }
+
+
+class SegmentLog:
+    """分段日志存储"""
+
+    def __init__(
+        self,
+        log_dir: str,
+        segment_max_entries: int = SEGMENT_MAX_ENTRIES,
+        sync_writes: bool = False
+    ) -> None:
+        """
+        Args:
+            log_dir: 日志目录
+            segment_max_entries: 单个分段的最大条数
+            sync_writes: 是否在调用方直接落盘（多个进程共用日志目录时使用）
+        """
+        self.log_dir = log_dir
+        self.index_file = os.path.join(log_dir, "index.json")
+        self.stats_dir = os.path.join(log_dir, "stats")
+        self.segment_max_entries = segment_max_entries
+        self.sync_writes = sync_writes
+        # 正在后台封存的分段：seq -> 条目
+        self._sealing: Dict[int, List[Dict[str, Any]]] = {}
+        # 本进程最近一次读取或写入后的文件签名：路径 -> 签名
+        self._signatures: Dict[str, Any] = {}
+        self._refreshed_at = time.monotonic()
+        # 已提交写线程、尚未落盘的账号统计：账号 -> JSON 文本
+        self._pending_stats: Dict[str, str] = {}
+        self._stats_lock = threading.Lock()
+
+        os.makedirs(self.stats_dir, exist_ok=True)
+        self._load_segments()
+        self._load_active()
+        self._split_legacy_stats()
+
+    def _load_segments(self) -> None:
+        """读取已封存分段的索引"""
+        self._signatures[self.index_file] = file_signature(self.index_file)
+        index = read_json(self.index_file, {"segments": []})
+        self.segments: List[Dict[str, Any]] = index.get("segments", [])
+
+    def _load_active(self) -> None:
+        """读取活动分段并确定下一个 id"""
+        active_seq = self.segments[-1]["seq"] + 1 if self.segments else 1
+        path = self._segment_path(active_seq, sealed=False)
+        self._signatures[path] = file_signature(path)
+        self.active_entries = self._read_segment(active_seq, sealed=False)
+        self.active = _segment_meta(active_seq, self.active_entries)
+
+        last_id = self.active["last_id"]
+        if last_id is None and self.segments:
+            last_id = self.segments[-1]["last_id"]
+        self.next_id = (last_id or 0) + 1
+
+    def _changed(self, path: str) -> bool:
+        return file_signature(path) != self._signatures.get(path)
+
+    def refresh(self, force: bool = False) -> None:
+        """读取其它进程写入的日志、封存的分段与统计
+
+        Args:
+            force: 立即检查；否则同一进程两次检查之间至少间隔 CHECK_INTERVAL 秒
+        """
+        now = time.monotonic()
+        if not force and now - self._refreshed_at < CHECK_INTERVAL:
+            return
+        self._refreshed_at = now
+
+        sealed = self._changed(self.index_file)
+        if sealed:
+            self._load_segments()
+        if sealed or self._changed(self._segment_path(self.active["seq"], sealed=False)):
+            self._load_active()
+
+    def _append_text(self, path: str, text: str) -> None:
+        """追加写入文件"""
+        if self.sync_writes:
+            append_text(path, text)
+            self._signatures[path] = file_signature(path)
+        else:
+            get_writer().append(path, text)
+
+    def _run(self, fn: Callable[[], None]) -> None:
+        """执行写入函数"""
+        if self.sync_writes:
+            fn()
+        else:
+            get_writer().call(fn)
+
+    def _segment_path(self, seq: int, sealed: bool) -> str:
+        """分段文件路径"""
+        name = f"segment-{seq:06d}.jsonl"
+        return os.path.join(self.log_dir, name + ".gz" if sealed else name)
+
+    def _read_segment(self, seq: int, sealed: bool) -> List[Dict[str, Any]]:
+        """读取一个分段的全部条目（按写入顺序）"""
+        path = self._segment_path(seq, sealed)
+        if not os.path.exists(path):
+            return []
+
+        opener = gzip.open if sealed else open
+        entries = []
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # 忽略写入中断产生的残缺行
+                    pass
+        return entries
+
+    def _read_meta(self, meta: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if meta is self.active:
+            return list(self.active_entries)
+        sealing = self._sealing.get(meta["seq"])
+        if sealing is not None:
+            return list(sealing)
+        return self._read_segment(meta["seq"], sealed=True)
+
+    def _seal_active(self) -> None:
+        """封存并压缩当前活动分段，开启新的分段（压缩在写线程中进行）"""
+        seq = self.active["seq"]
+        entries = self.active_entries
+        self.segments.append(self.active)
+        index_text = json.dumps({"segments": self.segments}, ensure_ascii=False)
+        self._sealing[seq] = entries
+
+        src = self._segment_path(seq, sealed=False)
+        dst = self._segment_path(seq, sealed=True)
+
+        def seal() -> None:
+            try:
+                with gzip.open(dst, "wt", encoding="utf-8") as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                atomic_write_text(self.index_file, index_text)
+                if os.path.exists(src):
+                    os.remove(src)
+            finally:
+                self._sealing.pop(seq, None)
+
+        self._run(seal)
+        if self.sync_writes:
+            self._signatures[self.index_file] = file_signature(self.index_file)
+
+        self.active_entries = []
+        self.active = _segment_meta(seq + 1, [])
+
+    def append(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """追加一条日志到活动分段，必要时封存"""
+        if "id" not in entry or entry["id"] < self.next_id:
+            entry["id"] = self.next_id
+        self.next_id = entry["id"] + 1
+
+        active = self.active
+        self.active_entries.append(entry)
+        self._append_text(
+            self._segment_path(active["seq"], sealed=False),
+            json.dumps(entry, ensure_ascii=False) + "\n"
+        )
+
+        active["count"] += 1
+        active["last_id"] = entry["id"]
+        active["last_time"] = entry["time"]
+        if active["first_id"] is None:
+            active["first_id"] = entry["id"]
+            active["first_time"] = entry["time"]
+
+        if active["count"] >= self.segment_max_entries:
+            self._seal_active()
+
+        return entry
+
+    def _segments_newest_first(self) -> List[Dict[str, Any]]:
+        """按从新到旧的顺序返回分段索引（含活动分段）"""
+        return [self.active] + list(reversed(self.segments))
+
+    def total(self) -> int:
+        """日志总数"""
+        return self.active["count"] + sum(meta["count"] for meta in self.segments)
+
+    def page(
+        self,
+        offset: int = 0,
+        limit: int = 10,
+        before_id: Optional[int] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """按 id 倒序读取一页日志
+
+        根据索引中的条数或 id 范围跳过整段，只读取目标页覆盖的分段。
+        """
+        skip = 0 if before_id is not None else offset
+        logs: List[Dict[str, Any]] = []
+
+        for meta in self._segments_newest_first():
+            if len(logs) >= limit:
+                break
+            if not meta["count"]:
+                continue
+            if before_id is not None:
+                if meta["first_id"] >= before_id:
+                    continue
+            elif skip >= meta["count"]:
+                skip -= meta["count"]
+                continue
+
+            entries = self._read_meta(meta)
+            entries.reverse()
+            if before_id is not None:
+                entries = [entry for entry in entries if entry["id"] < before_id]
+            logs.extend(entries[skip:skip + limit - len(logs)])
+            skip = 0
+
+        return self.total(), logs
+
+    def iter_entries(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """按写入顺序遍历日志，每次只加载一个分段
+
+        指定时间范围 [since, until) 时，根据索引中的时间范围跳过整段。
+        """
+        for meta in self.segments + [self.active]:
+            if not meta["count"]:
+                continue
+            if since is not None and meta["last_time"] < since:
+                continue
+            if until is not None and meta["first_time"] >= until:
+                continue
+            for entry in self._read_meta(meta):
+                if since is not None and entry["time"] < since:
+                    continue
+                if until is not None and entry["time"] >= until:
+                    continue
+                yield entry
+
+    def _split_legacy_stats(self) -> None:
+        """将旧版本的 stats.json 拆分为每个账号一个文件"""
+        legacy_file = os.path.join(self.log_dir, LEGACY_STATS_FILE)
+        if not os.path.exists(legacy_file):
+            return
+        for account, stats in read_json(legacy_file, {}).items():
+            atomic_write_text(self._stats_path(account), json.dumps(stats, ensure_ascii=False))
+        os.replace(legacy_file, legacy_file + ".migrated")
+
+    def _stats_path(self, account: str) -> str:
+        """账号统计文件路径"""
+        return os.path.join(self.stats_dir, _stats_name(account))
+
+    def load_stats(self, account: str) -> Optional[Dict[str, Any]]:
+        """读取账号统计，不存在时返回 None"""
+        with self._stats_lock:
+            text = self._pending_stats.get(account)
+        if text is not None:
+            return json.loads(text)
+        return read_json(self._stats_path(account), None)
+
+    def save_stats(self, account: str, stats: Dict[str, Any]) -> None:
+        """保存账号统计（只写入该账号的文件）"""
+        path = self._stats_path(account)
+        text = json.dumps(stats, ensure_ascii=False)
+        if self.sync_writes:
+            atomic_write_text(path, text)
+            return
+
+        with self._stats_lock:
+            self._pending_stats[account] = text
+
+        def write() -> None:
+            atomic_write_text(path, text)
+            with self._stats_lock:
+                # 期间又有新的写入时由其自己的写入完成后移除
+                if self._pending_stats.get(account) is text:
+                    del self._pending_stats[account]
+
+        get_writer().call(write)
+
+    def all_stats(self) -> Dict[str, Dict[str, Any]]:
+        """读取全部账号的统计（逐个读取账号文件）"""
+        accounts = {_stats_account(name) for name in os.listdir(self.stats_dir) if name.endswith(".json")}
+        with self._stats_lock:
+            accounts.update(self._pending_stats)
+        stats = {}
+        for account in sorted(accounts):
+            account_stats = self.load_stats(account)
+            if account_stats is not None:
+                stats[account] = account_stats
+        return stats
@@ -0,0 +1,136 @@
+"""账号每日签到索引
+
+为每个账号保存一张按天的签到位图：first_day 为第 0 位对应的日期，days 为十六进制
+表示的位图（第 i 位为 1 表示 first_day 之后第 i 天有成功签到）。位图每年约 92 个
+十六进制字符，序列化后的整个索引约 190 字节再加每年约 92 字节，与日志条数无关。
+
+索引随签到统计一起保存（见 store.log），同时维护最后签到时间、当前连续签到的
+起始日期与最长连续天数，追加一次签到与查询今日是否已签到、当前 / 最长连续天数
+都是常数时间；需要时可仅凭位图精确重算连续天数，无需扫描日志。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, Optional
+
+
+def empty_index() -> Dict[str, Any]:
+    """获取空的签到索引"""
+    return {
+        "total_signs": 0,
+        "last_sign_date": None,
+        "last_sign_time": None,
+        "first_day": None,
+        "days": "0",
+        "streak_start": None,
+        "longest_streak": 0
+    }
+
+
+def is_index(stats: Dict[str, Any]) -> bool:
+    """统计数据是否已包含签到位图（旧版本只有增量维护的 continuous_days）"""
+    return "days" in stats and "first_day" in stats
+
+
+def _bits(index: Dict[str, Any]) -> int:
+    return int(index.get("days") or "0", 16)
+
+
+def signed_on(index: Dict[str, Any], day: date) -> bool:
+    """指定日期是否有成功签到"""
+    if not index.get("first_day"):
+        return False
+    offset = (day - date.fromisoformat(index["first_day"])).days
+    return offset >= 0 and bool(_bits(index) >> offset & 1)
+
+
+def iter_sign_days(index: Dict[str, Any]) -> Iterator[date]:
+    """按日期正序遍历有成功签到的日期"""
+    if not index.get("first_day"):
+        return
+    first = date.fromisoformat(index["first_day"])
+    bits = _bits(index)
+    offset = 0
+    while bits:
+        if bits & 1:
+            yield first + timedelta(days=offset)
+        bits >>= 1
+        offset += 1
+
+
+def recompute_streaks(index: Dict[str, Any]) -> None:
+    """根据位图精确重算当前连续签到的起始日期与最长连续天数"""
+    longest = run = 0
+    start: Optional[date] = None
+    previous: Optional[date] = None
+    for day in iter_sign_days(index):
+        if previous is not None and (day - previous).days == 1:
+            run += 1
+        else:
+            run, start = 1, day
+        longest = max(longest, run)
+        previous = day
+    index["streak_start"] = start.isoformat() if start else None
+    index["longest_streak"] = longest
+
+
+def mark_signed(index: Dict[str, Any], at: datetime) -> None:
+    """记录一次成功签到"""
+    day = at.date()
+    index["total_signs"] = index.get("total_signs", 0) + 1
+
+    if not index.get("first_day"):
+        index["first_day"] = day.isoformat()
+    first = date.fromisoformat(index["first_day"])
+    bits = _bits(index)
+    if day < first:
+        # 早于位图起点（如系统时间回拨），整体平移
+        bits <<= (first - day).days
+        index["first_day"] = day.isoformat()
+        first = day
+    index["days"] = format(bits | 1 << (day - first).days, "x")
+
+    last = date.fromisoformat(index["last_sign_date"]) if index.get("last_sign_date") else None
+    if last is None or day > last:
+        if last is None or (day - last).days > 1 or not index.get("streak_start"):
+            index["streak_start"] = day.isoformat()
+        index["last_sign_date"] = day.isoformat()
+        index["last_sign_time"] = at.isoformat()
+        streak = (day - date.fromisoformat(index["streak_start"])).days + 1
+        index["longest_streak"] = max(index.get("longest_streak", 0), streak)
+    elif day < last:
+        # 补记更早的日期可能连接两段连续签到
+        recompute_streaks(index)
+    else:
+        index["last_sign_time"] = at.isoformat()
+
+
+def current_streak(index: Dict[str, Any], today: date) -> int:
+    """截至今天的连续签到天数（今天尚未签到时按截至昨天计算）"""
+    if not index.get("last_sign_date") or not index.get("streak_start"):
+        return 0
+    last = date.fromisoformat(index["last_sign_date"])
+    if (today - last).days > 1:
+        return 0
+    return (last - date.fromisoformat(index["streak_start"])).days + 1
+
+
+def merge_legacy(index: Dict[str, Any], legacy: Dict[str, Any]) -> None:
+    """将旧版本统计数据并入由日志重建的索引
+
+    旧统计中 last_sign_date 与 continuous_days 所覆盖的日期一并计入位图，
+    总次数取两者中较大的值。
+    """
+    total = index.get("total_signs", 0)
+    if legacy.get("last_sign_date") and legacy.get("continuous_days"):
+        try:
+            last = date.fromisoformat(legacy["last_sign_date"])
+            last_time = datetime.fromisoformat(legacy.get("last_sign_time") or last.isoformat())
+        except ValueError:
+            last = None
+        if last is not None:
+            for offset in range(int(legacy["continuous_days"]) - 1, -1, -1):
+                day = last - timedelta(days=offset)
+                if not signed_on(index, day):
+                    mark_signed(index, last_time if day == last else datetime.combine(day, datetime.min.time()))
+            recompute_streaks(index)
+    index["total_signs"] = max(total, legacy.get("total_signs", 0))
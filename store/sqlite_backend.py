@@ -0,0 +1,395 @@
+"""SQLite 存储后端
+
+使用 WAL 模式的单个数据库文件保存 Token、Linux.do Cookie、配置、签到日志以及定时任务。
+首次创建数据库时，会一次性从 JSON 文件后端迁移已有数据。
+
+单条语句的并发由 SQLite 自身的文件锁保证（其它进程写入时最多等待 BUSY_TIMEOUT_MS）；
+跨多条语句的读-改-写由 locked() 的跨进程锁（数据库旁的 .lock 文件）保证。
+查询与提交都在调用线程中同步进行（blocking），事件循环中的调用方通过
+store.backend.run_write() / run_read() 在线程中执行，连接由 _lock 在线程间串行使用。
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from store.backend import DEFAULT_ACCOUNT, StorageBackend
+from store.lock import ProcessLock, multiprocess_enabled
+
+SQLITE_PATH_ENV = "BOHE_SQLITE_PATH"
+DEFAULT_SQLITE_PATH = "./data/bohe.db"
+BUSY_TIMEOUT_MS = 5000  # 数据库被其它进程锁定时的等待时限
+
+TOKEN_COLUMNS = ("bohe_sign_token", "linux_do_connect_token", "linux_do_token")
+LOG_COLUMNS = ("id", "time", "status", "message", "trigger", "account")
+RUN_COLUMNS = ("id", "job_id", "scheduled_at", "started_at", "finished_at", "duration_ms", "outcome", "message")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    account TEXT PRIMARY KEY,
+    bohe_sign_token TEXT NOT NULL DEFAULT '',
+    linux_do_connect_token TEXT NOT NULL DEFAULT '',
+    linux_do_token TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS linux_do_cookies (
+    account TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS config (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sign_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    message TEXT NOT NULL DEFAULT '',
+    trigger TEXT NOT NULL DEFAULT 'manual',
+    account TEXT NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sign_logs_account_id ON sign_logs (account, id);
+CREATE INDEX IF NOT EXISTS idx_sign_logs_time ON sign_logs (time);
+CREATE INDEX IF NOT EXISTS idx_sign_logs_status ON sign_logs (status, id);
+CREATE INDEX IF NOT EXISTS idx_sign_logs_trigger ON sign_logs (trigger, id);
+CREATE TABLE IF NOT EXISTS sign_stats (
+    account TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scheduler_jobs (
+    id TEXT PRIMARY KEY,
+    state BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedule_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    scheduled_at TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    duration_ms REAL,
+    outcome TEXT NOT NULL,
+    message TEXT NOT NULL DEFAULT '',
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _row_to_log(row: sqlite3.Row) -> Dict[str, Any]:
+    entry = {column: row[column] for column in LOG_COLUMNS}
+    if row["extra"]:
+        entry.update(json.loads(row["extra"]))
+    return entry
+
+
+def _row_to_run(row: sqlite3.Row) -> Dict[str, Any]:
+    run = {column: row[column] for column in RUN_COLUMNS}
+    if row["extra"]:
+        run.update(json.loads(row["extra"]))
+    return run
+
+
+class SqliteBackend(StorageBackend):
+    """基于 SQLite（WAL 模式）的存储后端"""
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: Optional[str] = None, migrate: bool = True) -> None:
+        self.path = path or os.environ.get(SQLITE_PATH_ENV, DEFAULT_SQLITE_PATH)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.shared = multiprocess_enabled()
+        self.lock = ProcessLock(self.path + ".lock", shared=self.shared)
+
+        # 多个进程同时启动时只由其中一个建表并迁移
+        with self.locked():
+            self.conn.executescript(SCHEMA)
+            if migrate and self._get_meta("json_migrated") is None:
+                migrate_from_json(self)
+
+    def locked(self) -> ContextManager[Any]:
+        return self.lock.hold()
+
+    def _execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.conn.execute(sql, params)
+
+    def _fetchall(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        """执行查询并在持有连接锁期间取出全部结果（连接可能被多个线程同时使用）"""
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    # ---- Token ----
+
+    def load_tokens(self, account: str) -> Optional[Dict[str, str]]:
+        row = self._execute("SELECT * FROM tokens WHERE account = ?", (account,)).fetchone()
+        if row is None:
+            return None
+        return {column: row[column] for column in TOKEN_COLUMNS}
+
+    def save_tokens(self, account: str, tokens: Dict[str, str]) -> None:
+        values = [tokens.get(column) or "" for column in TOKEN_COLUMNS]
+        self._execute(
+            "INSERT INTO tokens (account, bohe_sign_token, linux_do_connect_token, linux_do_token) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT(account) DO UPDATE SET "
+            "bohe_sign_token = excluded.bohe_sign_token, "
+            "linux_do_connect_token = excluded.linux_do_connect_token, "
+            "linux_do_token = excluded.linux_do_token",
+            (account, *values)
+        )
+
+    def list_accounts(self) -> List[str]:
+        rows = self._fetchall("SELECT account FROM tokens ORDER BY account")
+        return [DEFAULT_ACCOUNT] + [row["account"] for row in rows if row["account"] != DEFAULT_ACCOUNT]
+
+    # ---- Linux.do Cookie ----
+
+    def load_cookies(self, account: str) -> List[Dict[str, Any]]:
+        row = self._execute("SELECT data FROM linux_do_cookies WHERE account = ?", (account,)).fetchone()
+        return json.loads(row["data"]) if row else []
+
+    def save_cookies(self, account: str, cookies: List[Dict[str, Any]]) -> None:
+        self._execute(
+            "INSERT INTO linux_do_cookies (account, data) VALUES (?, ?) "
+            "ON CONFLICT(account) DO UPDATE SET data = excluded.data",
+            (account, json.dumps(cookies, ensure_ascii=False))
+        )
+
+    # ---- 配置 ----
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        rows = self._fetchall("SELECT key, value FROM config")
+        if not rows:
+            return None
+        return {row["key"]: json.loads(row["value"]) for row in rows}
+
+    def save_config(self, config: Dict[str, Any]) -> None:
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.execute("DELETE FROM config")
+                self.conn.executemany(
+                    "INSERT INTO config (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value, ensure_ascii=False)) for key, value in config.items()]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # ---- 签到日志 ----
+
+    def append_log(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        extra = {key: value for key, value in entry.items() if key not in LOG_COLUMNS}
+        cursor = self._execute(
+            "INSERT INTO sign_logs (id, time, status, message, trigger, account, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.get("id"),
+                entry["time"],
+                entry["status"],
+                entry.get("message", ""),
+                entry.get("trigger", "manual"),
+                entry.get("account", DEFAULT_ACCOUNT),
+                json.dumps(extra, ensure_ascii=False) if extra else None
+            )
+        )
+        entry["id"] = cursor.lastrowid
+        return entry
+
+    def get_logs(
+        self,
+        offset: int = 0,
+        limit: int = 10,
+        before_id: Optional[int] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        total = self._execute("SELECT COUNT(*) AS n FROM sign_logs").fetchone()["n"]
+
+        if before_id is not None:
+            # 键集分页：沿主键索引定位，不受页码深度影响
+            rows = self._fetchall(
+                "SELECT * FROM sign_logs WHERE id < ? ORDER BY id DESC LIMIT ?",
+                (before_id, limit)
+            )
+        else:
+            rows = self._fetchall(
+                "SELECT * FROM sign_logs ORDER BY id DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            )
+
+        return total, [_row_to_log(row) for row in rows]
+
+    def iter_logs(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        status: Optional[str] = None,
+        trigger: Optional[str] = None,
+        account: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        conditions = ["id > ?"]
+        params: List[Any] = []
+        for condition, value in (
+            ("time >= ?", since),
+            ("time < ?", until),
+            ("status = ?", status),
+            ("trigger = ?", trigger),
+            ("account = ?", account)
+        ):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        sql = f"SELECT * FROM sign_logs WHERE {' AND '.join(conditions)} ORDER BY id LIMIT 500"
+
+        last_id = 0
+        while True:
+            rows = self._fetchall(sql, (last_id, *params))
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_log(row)
+            last_id = rows[-1]["id"]
+
+    def load_log_stats(self, account: str) -> Optional[Dict[str, Any]]:
+        row = self._execute("SELECT data FROM sign_stats WHERE account = ?", (account,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def save_log_stats(self, account: str, stats: Dict[str, Any]) -> None:
+        self._execute(
+            "INSERT INTO sign_stats (account, data) VALUES (?, ?) "
+            "ON CONFLICT(account) DO UPDATE SET data = excluded.data",
+            (account, json.dumps(stats, ensure_ascii=False))
+        )
+
+    def all_log_stats(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._fetchall("SELECT account, data FROM sign_stats")
+        return {row["account"]: json.loads(row["data"]) for row in rows}
+
+    # ---- 定时任务 ----
+
+    def load_jobs(self) -> Dict[str, bytes]:
+        rows = self._fetchall("SELECT id, state FROM scheduler_jobs")
+        return {row["id"]: bytes(row["state"]) for row in rows}
+
+    def save_job(self, job_id: str, state: bytes) -> None:
+        self._execute(
+            "INSERT INTO scheduler_jobs (id, state) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET state = excluded.state",
+            (job_id, state)
+        )
+
+    def delete_job(self, job_id: Optional[str] = None) -> None:
+        if job_id is None:
+            self._execute("DELETE FROM scheduler_jobs")
+        else:
+            self._execute("DELETE FROM scheduler_jobs WHERE id = ?", (job_id,))
+
+    def append_run(self, run: Dict[str, Any]) -> Dict[str, Any]:
+        extra = {key: value for key, value in run.items() if key not in RUN_COLUMNS}
+        cursor = self._execute(
+            "INSERT INTO schedule_runs "
+            "(id, job_id, scheduled_at, started_at, finished_at, duration_ms, outcome, message, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                run.get("id"),
+                run["job_id"],
+                run.get("scheduled_at"),
+                run.get("started_at"),
+                run.get("finished_at"),
+                run.get("duration_ms"),
+                run["outcome"],
+                run.get("message", ""),
+                json.dumps(extra, ensure_ascii=False) if extra else None
+            )
+        )
+        run["id"] = cursor.lastrowid
+        return run
+
+    def get_runs(self, limit: int = 10) -> List[Dict[str, Any]]:
+        rows = self._fetchall(
+            "SELECT * FROM schedule_runs ORDER BY id DESC LIMIT ?", (limit,)
+        )
+        return [_row_to_run(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+        self.lock.close()
+
+
+def migrate_from_json(target: SqliteBackend) -> None:
+    """一次性将 JSON 文件后端中的数据导入 SQLite
+
+    迁移在单个事务中完成，成功后在 meta 表中记录标记，之后不再重复执行。
+    """
+    from store.json_backend import MAX_RUN_HISTORY, JsonBackend
+
+    source = JsonBackend()
+    accounts = source.list_accounts()
+    imported_logs = 0
+
+    with target._lock:
+        target.conn.execute("BEGIN")
+        try:
+            for account in accounts:
+                tokens = source.load_tokens(account)
+                if tokens:
+                    target.save_tokens(account, tokens)
+                cookies = source.load_cookies(account)
+                if cookies:
+                    target.save_cookies(account, cookies)
+
+            config = source.load_config()
+            if config:
+                for key, value in config.items():
+                    target.conn.execute(
+                        "INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False))
+                    )
+
+            for entry in source.iter_logs():
+                target.append_log(dict(entry))
+                imported_logs += 1
+
+            for account, stats in source.all_log_stats().items():
+                target.save_log_stats(account, stats)
+
+            for job_id, state in source.load_jobs().items():
+                target.save_job(job_id, state)
+
+            for run in reversed(source.get_runs(limit=MAX_RUN_HISTORY)):
+                target.append_run(dict(run))
+
+            target._set_meta("json_migrated", "1")
+            target.conn.execute("COMMIT")
+        except Exception:
+            target.conn.execute("ROLLBACK")
+            raise
+
+    if imported_logs or len(accounts) > 1:
+        print(f"已从 JSON 文件迁移 {len(accounts)} 个账号、{imported_logs} 条签到日志到 SQLite")
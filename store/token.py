@@ -1,50 +1,56 @@
-import json
-import os
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-TOKEN_FILE = "./data/token.json"
+from bohe_sign.metrics import STORE_SECONDS
+from store.backend import DEFAULT_ACCOUNT, get_backend
 
+TOKEN_KEYS = ("bohe_sign_token", "linux_do_connect_token", "linux_do_token")
 
-def load_tokens() -> Dict[str, str]:
-    if os.path.exists(TOKEN_FILE):
-        try:
-            with open(TOKEN_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            pass
-
-    initial_tokens = {
-        "bohe_sign_token": "",
-        "linux_do_connect_token": "",
-        "linux_do_token": ""
-    }
+
+def _initial_tokens() -> Dict[str, str]:
+    return {key: "" for key in TOKEN_KEYS}
+
+
+def load_tokens(account: str = DEFAULT_ACCOUNT) -> Dict[str, str]:
+    # 读路径不写文件，账号尚未保存过 Token 时返回空模板
     try:
-        with open(TOKEN_FILE, "w", encoding="utf-8") as f:
-            json.dump(initial_tokens, f, indent=4, ensure_ascii=False)
-        return initial_tokens
-    except Exception:
-        pass
-    return {}
+        with STORE_SECONDS.time(operation="load_tokens"):
+            tokens = get_backend().load_tokens(account)
+    except Exception as e:
+        print(f"Error loading tokens: {e}")
+        return {}
+
+    if tokens is not None:
+        return tokens
+    return _initial_tokens()
 
 
 def save_tokens(bohe_token: Optional[str] = None,
                 linux_do_connect_token: Optional[str] = None,
-                linux_do_token: Optional[str] = None) -> None:
-    tokens = load_tokens()
-    
-    if bohe_token:
-        tokens["bohe_sign_token"] = bohe_token
-    if linux_do_connect_token:
-        tokens["linux_do_connect_token"] = linux_do_connect_token
-    if linux_do_token:
-        tokens["linux_do_token"] = linux_do_token
+                linux_do_token: Optional[str] = None,
+                account: str = DEFAULT_ACCOUNT) -> None:
+    backend = get_backend()
+    # 只更新传入的字段，其余字段以最新保存的值为准（多进程时在跨进程锁内读取）
+    with backend.locked():
+        tokens = load_tokens(account)
+
+        if bohe_token:
+            tokens["bohe_sign_token"] = bohe_token
+        if linux_do_connect_token:
+            tokens["linux_do_connect_token"] = linux_do_connect_token
+        if linux_do_token:
+            tokens["linux_do_token"] = linux_do_token
+
+        try:
+            with STORE_SECONDS.time(operation="save_tokens"):
+                backend.save_tokens(account, tokens)
+        except Exception as e:
+            print(f"Error saving tokens: {e}")
+
+def get_token(key: str, account: str = DEFAULT_ACCOUNT) -> Optional[str]:
+    tokens = load_tokens(account)
+    return tokens.get(key)
 
-    try:
-        with open(TOKEN_FILE, "w", encoding="utf-8") as f:
-            json.dump(tokens, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving tokens: {e}")
 
-def get_token(key: str) -> Optional[str]:
-    tokens = load_tokens()
-    return tokens.get(key)
\ No newline at end of file
+def list_accounts() -> List[str]:
+    """返回全部账号名，默认账号排在首位"""
+    return get_backend().list_accounts()
@@ -0,0 +1,219 @@
+"""存储写入队列（group commit）
+
+所有 JSON 文件写入都提交到同一个后台写线程，不在事件循环中执行磁盘 I/O：
+
+- 同一批次内对同一文件的多次整体写入只落盘最后一次
+- 对同一文件的连续追加合并为一次写入
+- 整体写入采用「写临时文件 → fsync → rename」，保证文件要么是旧内容要么是新内容
+
+提交操作返回 concurrent.futures.Future，在数据落盘后完成；异步代码可通过
+await flush() 等待此前提交的全部写入持久化。
+"""
+
+import asyncio
+import atexit
+import json
+import os
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from bohe_sign.metrics import STORE_COMMIT_SECONDS
+
+BATCH_DELAY = 0.005  # 收到写请求后等待的时间（秒），用于合并突发写入
+
+
+def atomic_write_text(path: str, text: str) -> None:
+    """原子写入文本文件：写临时文件、fsync 后替换"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def append_text(path: str, text: str) -> None:
+    """追加文本并 fsync"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+@dataclass
+class _Op:
+    """一次写入操作"""
+    kind: str  # replace / append / call
+    path: Optional[str] = None
+    text: str = ""
+    fn: Optional[Callable[[], None]] = None
+    on_commit: Optional[Callable[[], None]] = None
+    futures: List[Future] = field(default_factory=list)
+
+
+class GroupCommitWriter:
+    """单线程写入队列"""
+
+    def __init__(self, batch_delay: float = BATCH_DELAY) -> None:
+        self.batch_delay = batch_delay
+        self._cond = threading.Condition()
+        self._queue: List[_Op] = []
+        self._thread: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.committed = 0
+        self.batches = 0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+            self._thread.start()
+
+    def _submit(self, op: _Op) -> Future:
+        future: Future = Future()
+        op.futures.append(future)
+        with self._cond:
+            self._queue.append(op)
+            self.submitted += 1
+            self._ensure_thread()
+            self._cond.notify()
+        return future
+
+    def write_json(
+        self,
+        path: str,
+        data: Any,
+        indent: Optional[int] = 4,
+        on_commit: Optional[Callable[[], None]] = None
+    ) -> Future:
+        """提交一次 JSON 文件整体写入（提交时即完成序列化）"""
+        text = json.dumps(data, indent=indent, ensure_ascii=False)
+        return self._submit(_Op(kind="replace", path=path, text=text, on_commit=on_commit))
+
+    def append(self, path: str, text: str) -> Future:
+        """提交一次文件追加"""
+        return self._submit(_Op(kind="append", path=path, text=text))
+
+    def call(self, fn: Callable[[], None]) -> Future:
+        """在写线程中按提交顺序执行任意写入函数"""
+        return self._submit(_Op(kind="call", fn=fn))
+
+    @staticmethod
+    def _coalesce(batch: List[_Op]) -> List[_Op]:
+        """合并同一批次中的写入
+
+        - 同一文件的整体写入只保留最后一次，被覆盖的操作随之一起完成
+        - 相邻的同一文件追加合并为一次写入
+        """
+        last_replace: Dict[str, int] = {}
+        for i, op in enumerate(batch):
+            if op.kind == "replace":
+                last_replace[op.path] = i
+
+        merged: List[_Op] = []
+        superseded: Dict[str, List[Future]] = {}
+
+        for i, op in enumerate(batch):
+            if op.kind == "replace" and last_replace[op.path] != i:
+                superseded.setdefault(op.path, []).extend(op.futures)
+                continue
+            if op.kind == "replace":
+                op.futures.extend(superseded.pop(op.path, []))
+            if (
+                op.kind == "append"
+                and merged
+                and merged[-1].kind == "append"
+                and merged[-1].path == op.path
+            ):
+                merged[-1].text += op.text
+                merged[-1].futures.extend(op.futures)
+                continue
+            merged.append(op)
+
+        return merged
+
+    def _execute(self, op: _Op) -> None:
+        if op.kind == "replace":
+            atomic_write_text(op.path, op.text)
+        elif op.kind == "append":
+            append_text(op.path, op.text)
+        elif op.fn is not None:
+            op.fn()
+        if op.on_commit is not None:
+            op.on_commit()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+            # 稍作等待，让突发的写入进入同一批次
+            if self.batch_delay:
+                threading.Event().wait(self.batch_delay)
+
+            with self._cond:
+                batch, self._queue = self._queue, []
+
+            self.batches += 1
+            with STORE_COMMIT_SECONDS.time():
+                for op in self._coalesce(batch):
+                    try:
+                        self._execute(op)
+                        self.committed += 1
+                        for future in op.futures:
+                            future.set_result(None)
+                    except Exception as e:
+                        print(f"Error writing {op.path or 'store'}: {e}")
+                        for future in op.futures:
+                            future.set_exception(e)
+
+    def flush_sync(self, timeout: Optional[float] = None) -> None:
+        """阻塞等待此前提交的全部写入完成"""
+        barrier = self.call(lambda: None)
+        try:
+            barrier.result(timeout)
+        except Exception as e:
+            print(f"Error flushing store writes: {e}")
+
+    async def flush(self) -> None:
+        """等待此前提交的全部写入完成"""
+        await asyncio.wrap_future(self.call(lambda: None))
+
+    def stats(self) -> Dict[str, Any]:
+        """写入统计"""
+        with self._cond:
+            pending = len(self._queue)
+        return {
+            "submitted": self.submitted,
+            "committed": self.committed,
+            "batches": self.batches,
+            "pending": pending
+        }
+
+
+_writer = GroupCommitWriter()
+
+
+def get_writer() -> GroupCommitWriter:
+    """获取全局写入队列"""
+    return _writer
+
+
+async def flush_writes() -> None:
+    """等待全部已提交的写入落盘"""
+    await _writer.flush()
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    # 进程退出前尽量把队列中的写入落盘
+    if _writer._thread is not None and _writer._thread.is_alive():
+        _writer.flush_sync(timeout=5)
@@ -0,0 +1,23 @@
+"""测试公共夹具"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """在临时目录中运行（存储固定写入 ./data），并使用全新的单进程存储后端"""
+    from store.backend import set_backend
+    from store.writer import get_writer
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BOHE_MULTIPROCESS", "0")
+    monkeypatch.delenv("BOHE_STORE_BACKEND", raising=False)
+    set_backend(None)
+    yield tmp_path
+    get_writer().flush_sync(timeout=5)
+    set_backend(None)
@@ -0,0 +1,84 @@
+"""bohe_sign.resilience 熔断器状态转换"""
+
+import pytest
+
+from bohe_sign import resilience
+from bohe_sign.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """可手动推进的 time.monotonic"""
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_trips_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("up.example", failure_threshold=3, reset_timeout=10)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure("timeout")
+    assert breaker.state == CLOSED
+
+    breaker.allow()
+    breaker.record_failure("timeout")
+
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("up.example", failure_threshold=3, reset_timeout=10)
+    breaker.record_failure("500")
+    breaker.record_failure("500")
+    breaker.record_success()
+    breaker.record_failure("500")
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker("up.example", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure("timeout")
+
+    clock[0] += 10
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker("up.example", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure("timeout")
+    clock[0] += 10
+    breaker.allow()
+
+    breaker.record_failure("timeout")
+
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+    clock[0] += 5
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_released_probe_lets_next_request_probe(clock):
+    breaker = CircuitBreaker("up.example", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure("timeout")
+    clock[0] += 10
+    breaker.allow()
+
+    breaker.release()
+
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
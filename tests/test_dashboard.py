@@ -0,0 +1,66 @@
+"""web.routes.dashboard ETag 与 304"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from web.leader import election
+from web.routes import dashboard
+from web.routes.dashboard import dashboard_etag, etag_matches
+
+
+@pytest.fixture
+def client(data_dir):
+    app = FastAPI()
+    app.include_router(dashboard.router, prefix="/api/dashboard")
+    with TestClient(app) as client:
+        yield client
+
+
+def test_unchanged_dashboard_returns_304(client):
+    first = client.get("/api/dashboard")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.json()["success"] is True
+
+    second = client.get("/api/dashboard", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+    assert second.content == b""
+
+
+def test_changed_content_gets_new_etag(client):
+    etag = client.get("/api/dashboard").headers["etag"]
+    from store.token import save_tokens
+    save_tokens(bohe_token="new-token")
+
+    response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_leader_status_does_not_change_etag(client, monkeypatch):
+    etag = client.get("/api/dashboard").headers["etag"]
+    monkeypatch.setattr(election, "is_leader", not election.is_leader)
+
+    response = client.get("/api/dashboard", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_etag_ignores_only_per_process_fields():
+    payload = {"success": True, "data": {"schedule": {"enabled": True, "leader": {"pid": 1}}}}
+    other_leader = {"success": True, "data": {"schedule": {"enabled": True, "leader": {"pid": 2}}}}
+    disabled = {"success": True, "data": {"schedule": {"enabled": False, "leader": {"pid": 1}}}}
+
+    assert dashboard_etag(payload) == dashboard_etag(other_leader)
+    assert dashboard_etag(payload) != dashboard_etag(disabled)
+
+
+def test_if_none_match_list_and_wildcard():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches("", '"b"')
+    assert not etag_matches('"a"', '"b"')
@@ -0,0 +1,95 @@
+"""web.leader 选主与故障接管"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+
+from web.leader import LeaderElection
+
+INTERVAL = 0.05
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(INTERVAL)
+    return True
+
+
+def test_only_one_process_is_leader_and_other_takes_over(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    events = []
+
+    async def scenario():
+        first = LeaderElection(path, interval=INTERVAL)
+        second = LeaderElection(path, interval=INTERVAL)
+        await first.start(lambda: events.append("first elected"), lambda: events.append("first resigned"))
+        await second.start(lambda: events.append("second elected"), lambda: events.append("second resigned"))
+        await asyncio.sleep(INTERVAL * 3)
+        assert (first.is_leader, second.is_leader) == (True, False)
+
+        await first.stop()
+        took_over = await _wait_for(lambda: second.is_leader)
+        await second.stop()
+        return took_over
+
+    assert asyncio.run(scenario())
+    assert events == ["first elected", "first resigned", "second elected", "second resigned"]
+
+
+def test_leader_on_tick_runs_only_in_leader(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    ticks = {"first": 0, "second": 0}
+
+    async def scenario():
+        first = LeaderElection(path, interval=INTERVAL)
+        second = LeaderElection(path, interval=INTERVAL)
+        await first.start(lambda: None, lambda: None, on_tick=lambda: ticks.__setitem__("first", ticks["first"] + 1))
+        await second.start(lambda: None, lambda: None, on_tick=lambda: ticks.__setitem__("second", ticks["second"] + 1))
+        await asyncio.sleep(INTERVAL * 5)
+        await first.stop()
+        await second.stop()
+
+    asyncio.run(scenario())
+
+    assert ticks["first"] > 0
+    assert ticks["second"] == 0
+
+
+def test_killed_leader_process_is_replaced(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    # 子进程持有锁后被 SIGKILL，不执行任何清理
+    holder = subprocess.Popen(
+        [sys.executable, "-c", textwrap.dedent(f"""
+            import fcntl, os, sys, time
+            fd = os.open({path!r}, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            print("locked", flush=True)
+            time.sleep(60)
+        """)],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    try:
+        assert holder.stdout.readline().strip() == "locked"
+
+        async def scenario():
+            election = LeaderElection(path, interval=INTERVAL)
+            await election.start(lambda: None, lambda: None)
+            await asyncio.sleep(INTERVAL * 3)
+            blocked = not election.is_leader
+
+            os.kill(holder.pid, signal.SIGKILL)
+            took_over = await _wait_for(lambda: election.is_leader)
+            await election.stop()
+            return blocked, took_over
+
+        assert asyncio.run(scenario()) == (True, True)
+    finally:
+        holder.kill()
+        holder.wait()
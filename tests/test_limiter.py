@@ -0,0 +1,138 @@
+"""bohe_sign.limiter 上游主机限制器"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bohe_sign.batch import BatchLimiter
+from bohe_sign.limiter import MAX_CONCURRENCY, MAX_RATE, HostLimiter, host_limiter, set_host_limits
+from bohe_sign.resilience import request, reset_breakers
+from bohe_sign.session import close_sessions
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    """每个请求耗时 50 毫秒，记录同时处理的请求数峰值"""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def do_GET(self) -> None:
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.05)
+        with cls.lock:
+            cls.active -= 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _SlowHandler.active = _SlowHandler.peak = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SlowHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    reset_breakers()
+    yield url
+    set_host_limits(url, MAX_CONCURRENCY, MAX_RATE)
+    server.shutdown()
+    server.server_close()
+
+
+def test_every_request_shares_host_concurrency(upstream):
+    set_host_limits(upstream, 3, 0)
+
+    async def scenario():
+        try:
+            responses = await asyncio.gather(*(request("GET", f"{upstream}/x") for _ in range(12)))
+        finally:
+            await close_sessions()
+        return [r.status_code for r in responses]
+
+    assert asyncio.run(scenario()) == [200] * 12
+    assert _SlowHandler.peak == 3
+
+
+def test_every_request_shares_host_rate(upstream):
+    set_host_limits(upstream, MAX_CONCURRENCY, 10)
+
+    async def scenario():
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(request("GET", f"{upstream}/x") for _ in range(15)))
+        finally:
+            await close_sessions()
+        return time.monotonic() - started
+
+    # 桶中初始的 10 个令牌用完后，其余 5 个按每秒 10 个放行
+    assert asyncio.run(scenario()) >= 0.45
+
+
+def test_prepay_is_bounded_by_rate_and_timeout():
+    async def scenario():
+        limiter = HostLimiter(concurrency=8, rate=10)
+        return await limiter.prepay(100, timeout=0.5)
+
+    # 桶中初始的 10 个令牌加 0.5 秒内按速率补充的 5 个
+    assert 14 <= asyncio.run(scenario()) <= 16
+
+
+def test_prepaid_tokens_skip_rate_wait():
+    async def scenario():
+        limiter = HostLimiter(concurrency=4, rate=2)
+        prepaid = await limiter.prepay(6, timeout=2.5)
+        starts = []
+
+        async def one() -> None:
+            async with limiter:
+                starts.append(time.monotonic())
+
+        began = time.monotonic()
+        await asyncio.gather(*(one() for _ in range(7)))
+        return prepaid, [start - began for start in starts]
+
+    prepaid, offsets = asyncio.run(scenario())
+
+    assert prepaid == 6
+    assert all(offset < 0.1 for offset in offsets[:6])
+    # 预取的令牌用完后重新按速率等待
+    assert offsets[6] >= 0.4
+
+
+def test_unused_prepaid_tokens_expire():
+    async def scenario():
+        limiter = HostLimiter(concurrency=4, rate=2)
+        # 约 0.5 秒取完 3 个令牌，可用到预取截止（0.6 秒）为止
+        await limiter.prepay(3, timeout=0.6, hold=0)
+        await asyncio.sleep(0.2)
+        began = time.monotonic()
+        async with limiter:
+            return time.monotonic() - began
+
+    assert asyncio.run(scenario()) >= 0.2
+
+
+def test_batch_limits_only_narrow_host_limits():
+    url = "http://narrow.test/api"
+
+    async def scenario():
+        wide = BatchLimiter(url, concurrency=100, rate=100)
+        narrow = BatchLimiter(url, concurrency=2, rate=1)
+        return (wide.concurrency, wide.own.rate), (narrow.concurrency, narrow.own.rate), host_limiter(url).rate
+
+    wide, narrow, host_rate = asyncio.run(scenario())
+
+    assert wide == (MAX_CONCURRENCY, 0)
+    assert narrow == (2, 1)
+    assert host_rate == MAX_RATE
@@ -0,0 +1,52 @@
+"""bohe_sign.renewal 按调度器时区计算签到窗口，以及续期与请求路径的刷新合并"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from bohe_sign import login, renewal
+
+
+def _enable_schedule(monkeypatch, time_str):
+    monkeypatch.setattr(renewal, "get_schedule_config", lambda: {"enabled": True, "time": time_str})
+
+
+def test_next_sign_time_uses_schedule_timezone(monkeypatch):
+    _enable_schedule(monkeypatch, "08:00")
+    # UTC 23:30 即上海时间次日 07:30
+    now = datetime(2026, 1, 1, 23, 30, tzinfo=timezone.utc)
+    target = renewal.next_sign_time(now)
+    assert target.utcoffset().total_seconds() == 8 * 3600
+    assert target == datetime(2026, 1, 2, 0, 0, tzinfo=timezone.utc)
+
+
+def test_sign_window_uses_schedule_timezone(monkeypatch):
+    _enable_schedule(monkeypatch, "08:00")
+    assert renewal.in_sign_window(datetime(2026, 1, 1, 23, 59, tzinfo=timezone.utc))
+    assert not renewal.in_sign_window(datetime(2026, 1, 1, 8, 0, tzinfo=timezone.utc))
+
+
+def test_renewal_coalesces_with_request_path_refresh(monkeypatch):
+    calls = []
+
+    async def refresh(token, account, connect_token, ld_token):
+        calls.append(token)
+        await asyncio.sleep(0.05)
+        return "new", connect_token, ld_token
+
+    async def invalid(token):
+        return False
+
+    monkeypatch.setattr(login, "load_tokens", lambda account: {"bohe_sign_token": "old"})
+    monkeypatch.setattr(login, "verify_bohe_token", invalid)
+    monkeypatch.setattr(login, "_refresh_bohe_token", refresh)
+
+    async def main():
+        return await asyncio.gather(
+            login.renew_bohe_token("a"),
+            login.get_bohe_token("cookie", account="a"),
+            login.get_bohe_token(account="a")
+        )
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [result[0] for result in results] == ["new", "new", "new"]
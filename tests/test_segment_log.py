@@ -0,0 +1,100 @@
+"""store.segment_log 分段日志的封存与分页，以及按账号保存的统计"""
+
+import json
+import os
+
+from store.segment_log import SegmentLog
+from store.writer import get_writer
+
+
+def _fill(log_dir, count: int, segment_max_entries: int = 3) -> SegmentLog:
+    log = SegmentLog(str(log_dir), segment_max_entries=segment_max_entries)
+    for i in range(count):
+        log.append({"time": f"2026-01-01T00:00:{i:02d}", "status": "success", "n": i})
+    get_writer().flush_sync(timeout=5)
+    return log
+
+
+def test_full_segments_are_sealed_and_compressed(tmp_path):
+    _fill(tmp_path, 10)
+
+    names = sorted(os.listdir(tmp_path))
+    assert [name for name in names if name.endswith(".gz")] == [
+        "segment-000001.jsonl.gz", "segment-000002.jsonl.gz", "segment-000003.jsonl.gz"
+    ]
+    assert "segment-000004.jsonl" in names
+
+
+def test_page_before_id_crosses_sealed_segments(tmp_path):
+    _fill(tmp_path, 10)
+    # 重新加载，历史分段只能从 gzip 文件读取
+    log = SegmentLog(str(tmp_path), segment_max_entries=3)
+
+    total, first = log.page(limit=4)
+    assert total == 10
+    assert [entry["id"] for entry in first] == [10, 9, 8, 7]
+
+    _, second = log.page(limit=4, before_id=first[-1]["id"])
+    assert [entry["id"] for entry in second] == [6, 5, 4, 3]
+
+    _, last = log.page(limit=4, before_id=second[-1]["id"])
+    assert [entry["id"] for entry in last] == [2, 1]
+
+    _, empty = log.page(limit=4, before_id=1)
+    assert empty == []
+
+
+def test_page_offset_matches_keyset_pages(tmp_path):
+    log = _fill(tmp_path, 10)
+
+    _, by_offset = log.page(offset=5, limit=3)
+    _, by_keyset = log.page(limit=3, before_id=6)
+    assert [entry["id"] for entry in by_offset] == [entry["id"] for entry in by_keyset] == [5, 4, 3]
+
+
+def test_ids_continue_after_reload(tmp_path):
+    _fill(tmp_path, 7)
+    log = SegmentLog(str(tmp_path), segment_max_entries=3)
+
+    entry = log.append({"time": "2026-01-02T00:00:00", "status": "failed"})
+
+    assert entry["id"] == 8
+    assert log.total() == 8
+
+
+def test_iter_entries_filters_time_range(tmp_path):
+    log = _fill(tmp_path, 10)
+
+    entries = list(log.iter_entries(since="2026-01-01T00:00:02", until="2026-01-01T00:00:07"))
+
+    assert [entry["n"] for entry in entries] == [2, 3, 4, 5, 6]
+
+
+def test_stats_are_saved_per_account(tmp_path):
+    log = SegmentLog(str(tmp_path))
+    log.save_stats("a", {"total_signs": 1})
+    log.save_stats("账号/b", {"total_signs": 2})
+    # 尚未落盘的写入也能读到
+    assert log.load_stats("a") == {"total_signs": 1}
+    get_writer().flush_sync(timeout=5)
+
+    assert len(os.listdir(tmp_path / "stats")) == 2
+    before = os.stat(log._stats_path("账号/b")).st_mtime_ns
+    log.save_stats("a", {"total_signs": 3})
+    get_writer().flush_sync(timeout=5)
+    # 只重写所属账号的文件
+    assert os.stat(log._stats_path("账号/b")).st_mtime_ns == before
+
+    reloaded = SegmentLog(str(tmp_path))
+    assert reloaded.load_stats("a") == {"total_signs": 3}
+    assert reloaded.load_stats("missing") is None
+    assert reloaded.all_stats() == {"a": {"total_signs": 3}, "账号/b": {"total_signs": 2}}
+
+
+def test_legacy_stats_file_is_split(tmp_path):
+    (tmp_path / "stats.json").write_text(json.dumps({"a": {"total_signs": 5}, "b": {"total_signs": 6}}))
+
+    log = SegmentLog(str(tmp_path), sync_writes=True)
+
+    assert not (tmp_path / "stats.json").exists()
+    assert log.all_stats() == {"a": {"total_signs": 5}, "b": {"total_signs": 6}}
@@ -0,0 +1,91 @@
+"""bohe_sign.session 共享会话不在账号之间共用 Cookie"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from bohe_sign.session import close_sessions, get_session, init_sessions
+
+
+class _CookieHandler(BaseHTTPRequestHandler):
+    """/set?<值> 设置 Cookie，所有请求返回收到的 Cookie 头；记录每个请求的方法与连接端口"""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_HEAD(self) -> None:
+        self.requests.append(("HEAD", self.client_address[1]))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        self.requests.append(("GET", self.client_address[1]))
+        self.send_response(200)
+        if self.path.startswith("/set?"):
+            self.send_header("Set-Cookie", f"state={self.path.split('?', 1)[1]}; Path=/")
+        body = (self.headers.get("Cookie") or "").encode()
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def upstream():
+    _CookieHandler.requests = []
+    server = HTTPServer(("127.0.0.1", 0), _CookieHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_response_cookies_are_not_sent_with_later_requests(upstream):
+    async def scenario():
+        session = get_session(upstream)
+        try:
+            first = await session.get(f"{upstream}/set?account-a")
+            other = await session.get(f"{upstream}/echo")
+            explicit = await session.get(f"{upstream}/echo", cookies=dict(first.cookies))
+            return dict(first.cookies), other.text, explicit.text, dict(session.cookies)
+        finally:
+            await close_sessions()
+
+    flow_cookies, other, explicit, jar = asyncio.run(scenario())
+
+    assert flow_cookies == {"state": "account-a"}
+    assert other == ""
+    assert explicit == "state=account-a"
+    assert jar == {}
+
+
+def test_init_sessions_opens_connection_before_first_request(upstream):
+    async def scenario():
+        try:
+            await init_sessions(upstream)
+            await get_session(upstream).get(f"{upstream}/echo")
+        finally:
+            await close_sessions()
+
+    asyncio.run(scenario())
+
+    (warm_method, warm_port), (method, port) = _CookieHandler.requests
+    assert (warm_method, method) == ("HEAD", "GET")
+    # 首个请求复用预先建立的连接
+    assert port == warm_port
+
+
+def test_init_sessions_ignores_unreachable_hosts():
+    async def scenario():
+        try:
+            await init_sessions("http://127.0.0.1:9/")
+        finally:
+            await close_sessions()
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+"""store.sign_index 签到位图与连续天数"""
+
+from datetime import date, datetime
+
+from store.sign_index import (
+    current_streak, empty_index, iter_sign_days, mark_signed, recompute_streaks, signed_on
+)
+
+
+def _at(day: str, hour: int = 8) -> datetime:
+    return datetime.fromisoformat(f"{day}T{hour:02d}:00:00")
+
+
+def test_consecutive_days_extend_streak():
+    index = empty_index()
+    for day in ("2026-01-01", "2026-01-02", "2026-01-03"):
+        mark_signed(index, _at(day))
+
+    assert index["total_signs"] == 3
+    assert index["streak_start"] == "2026-01-01"
+    assert index["longest_streak"] == 3
+    assert current_streak(index, date(2026, 1, 3)) == 3
+    assert [d.isoformat() for d in iter_sign_days(index)] == ["2026-01-01", "2026-01-02", "2026-01-03"]
+
+
+def test_same_day_counts_sign_but_not_streak():
+    index = empty_index()
+    mark_signed(index, _at("2026-01-01", 8))
+    mark_signed(index, _at("2026-01-01", 20))
+
+    assert index["total_signs"] == 2
+    assert index["last_sign_time"] == "2026-01-01T20:00:00"
+    assert current_streak(index, date(2026, 1, 1)) == 1
+
+
+def test_gap_restarts_streak_and_keeps_longest():
+    index = empty_index()
+    for day in ("2026-01-01", "2026-01-02", "2026-01-03", "2026-01-06"):
+        mark_signed(index, _at(day))
+
+    assert index["streak_start"] == "2026-01-06"
+    assert index["longest_streak"] == 3
+    assert current_streak(index, date(2026, 1, 6)) == 1
+    assert not signed_on(index, date(2026, 1, 4))
+    assert signed_on(index, date(2026, 1, 6))
+
+
+def test_current_streak_counts_until_yesterday_then_drops():
+    index = empty_index()
+    mark_signed(index, _at("2026-01-01"))
+    mark_signed(index, _at("2026-01-02"))
+
+    # 今天尚未签到时按截至昨天计算，断签后归零
+    assert current_streak(index, date(2026, 1, 3)) == 2
+    assert current_streak(index, date(2026, 1, 4)) == 0
+    assert current_streak(empty_index(), date(2026, 1, 4)) == 0
+
+
+def test_backfilled_day_joins_two_streaks():
+    index = empty_index()
+    for day in ("2026-01-01", "2026-01-02", "2026-01-04", "2026-01-05"):
+        mark_signed(index, _at(day))
+    assert index["longest_streak"] == 2
+
+    mark_signed(index, _at("2026-01-03"))
+
+    assert index["streak_start"] == "2026-01-01"
+    assert index["longest_streak"] == 5
+    assert index["last_sign_date"] == "2026-01-05"
+    assert current_streak(index, date(2026, 1, 5)) == 5
+
+
+def test_day_before_first_day_shifts_bitmap():
+    index = empty_index()
+    mark_signed(index, _at("2026-01-10"))
+    mark_signed(index, _at("2026-01-09"))
+
+    assert index["first_day"] == "2026-01-09"
+    assert signed_on(index, date(2026, 1, 9))
+    assert signed_on(index, date(2026, 1, 10))
+    assert current_streak(index, date(2026, 1, 10)) == 2
+
+
+def test_recompute_matches_incremental_updates():
+    index = empty_index()
+    for day in ("2026-02-01", "2026-02-02", "2026-02-05", "2026-02-06", "2026-02-07"):
+        mark_signed(index, _at(day))
+    incremental = (index["streak_start"], index["longest_streak"])
+
+    recompute_streaks(index)
+
+    assert (index["streak_start"], index["longest_streak"]) == incremental == ("2026-02-05", 3)
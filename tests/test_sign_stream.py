@@ -0,0 +1,87 @@
+"""bohe_sign.batch.sign_stream 大批量签到的耗时随账号数线性增长"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bohe_sign import batch, sign
+from bohe_sign.limiter import MAX_CONCURRENCY, MAX_RATE, set_host_limits
+from bohe_sign.resilience import reset_breakers
+from bohe_sign.session import close_sessions
+from store.writer import get_writer
+
+ACCOUNTS = 2000
+CHUNK = 500
+
+
+class _SignHandler(BaseHTTPRequestHandler):
+    """签到与用户信息接口均立即返回成功"""
+
+    protocol_version = "HTTP/1.1"
+    # 响应头与正文分两次写出，避免 Nagle 算法与延迟确认叠加出约 40 毫秒的延迟
+    disable_nagle_algorithm = True
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({"success": True, "message": "ok", "data": {}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def upstream(data_dir, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SignHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(sign, "SIGN_API", f"{url}/api/user/sign")
+    monkeypatch.setattr(sign, "USER_INFO_API", f"{url}/api/user/info")
+    monkeypatch.setattr(batch, "SIGN_API", f"{url}/api/user/sign")
+    set_host_limits(url, 16, 0)
+    reset_breakers()
+    yield url
+    set_host_limits(url, MAX_CONCURRENCY, MAX_RATE)
+    server.shutdown()
+    server.server_close()
+
+
+def test_time_per_sign_stays_flat(upstream):
+    accounts = ((f"acc{index}", {"bohe_sign_token": f"token{index}"}) for index in range(ACCOUNTS))
+
+    async def scenario():
+        chunks = []
+        succeeded = 0
+        started = time.perf_counter()
+        try:
+            async for result in batch.sign_stream(accounts, concurrency=16):
+                succeeded += result["success"]
+                if succeeded % CHUNK == 0:
+                    # 计入写线程中尚未完成的日志与统计写入
+                    await get_writer().flush()
+                    now = time.perf_counter()
+                    chunks.append(now - started)
+                    started = now
+        finally:
+            await close_sessions()
+        return succeeded, chunks
+
+    succeeded, chunks = asyncio.run(scenario())
+
+    assert succeeded == ACCOUNTS
+    assert len(chunks) == ACCOUNTS // CHUNK
+    # 每 CHUNK 个账号的耗时不随已签到的账号数增长（统计曾在每次签到时整体重写，耗时随账号数平方增长）
+    assert max(chunks[1:]) < 2 * chunks[0] + 0.5, chunks
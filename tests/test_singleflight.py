@@ -0,0 +1,91 @@
+"""bohe_sign.singleflight 并发调用合并"""
+
+import asyncio
+
+import pytest
+
+from bohe_sign.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight: SingleFlight[int] = SingleFlight()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 42
+
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return calls, results, flight.stats()
+
+    calls, results, stats = asyncio.run(scenario())
+
+    assert calls == 1
+    assert results == [42] * 5
+    assert stats == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight: SingleFlight[str] = SingleFlight()
+
+        async def work(key: str) -> str:
+            await asyncio.sleep(0.01)
+            return key
+
+        return await asyncio.gather(flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+
+def test_key_is_forgotten_after_completion():
+    async def scenario():
+        flight: SingleFlight[int] = SingleFlight()
+        counter = iter(range(10))
+
+        async def work() -> int:
+            return next(counter)
+
+        first = await flight.do("k", work)
+        second = await flight.do("k", work)
+        return first, second, flight.in_flight()
+
+    assert asyncio.run(scenario()) == (0, 1, 0)
+
+
+def test_exception_reaches_every_waiter():
+    async def scenario():
+        flight: SingleFlight[int] = SingleFlight()
+
+        async def work() -> int:
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert len(results) == 3
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_cancelled_waiter_does_not_cancel_others():
+    async def scenario():
+        flight: SingleFlight[str] = SingleFlight()
+
+        async def work() -> str:
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", work))
+        second = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
@@ -0,0 +1,71 @@
+"""store.sqlite_backend 日志读写，以及事件循环中的读写不在事件循环线程上执行"""
+
+import asyncio
+import threading
+
+import pytest
+
+from store.backend import get_backend, run_read, run_write, set_backend
+from store.log import add_sign_log, get_sign_logs, iter_sign_logs
+from store.sqlite_backend import SqliteBackend
+
+
+@pytest.fixture
+def sqlite_backend(data_dir):
+    backend = SqliteBackend(migrate=False)
+    set_backend(backend)
+    return backend
+
+
+def test_logs_roundtrip(sqlite_backend):
+    for index in range(5):
+        add_sign_log("success" if index % 2 == 0 else "failed", f"m{index}", account=f"a{index % 2}")
+
+    page = get_sign_logs(page=1, limit=2)
+    assert page["total"] == 5
+    assert [entry["message"] for entry in page["logs"]] == ["m4", "m3"]
+
+    exported = list(iter_sign_logs(account="a0"))
+    assert [entry["message"] for entry in exported] == ["m0", "m2", "m4"]
+
+
+def test_reads_and_writes_run_off_the_event_loop(sqlite_backend):
+    threads = []
+
+    def record(fn):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return fn(*args, **kwargs)
+        return wrapper
+
+    async def main():
+        loop_thread = threading.get_ident()
+        await run_write(record(add_sign_log), "success", "ok", account="a")
+        await run_read(record(get_sign_logs))
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_concurrent_writes_from_the_event_loop(sqlite_backend):
+    async def main():
+        return await asyncio.gather(*(
+            run_write(add_sign_log, "success", str(index), account=f"acc{index % 10}")
+            for index in range(100)
+        ))
+
+    entries = asyncio.run(main())
+    assert len({entry["id"] for entry in entries}) == 100
+    assert get_sign_logs(limit=1)["total"] == 100
+    assert sum(1 for _ in iter_sign_logs()) == 100
+
+
+def test_json_backend_stays_on_the_event_loop(data_dir):
+    async def main():
+        assert not get_backend().blocking
+        return threading.get_ident(), await run_read(threading.get_ident)
+
+    loop_thread, read_thread = asyncio.run(main())
+    assert read_thread == loop_thread
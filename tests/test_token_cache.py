@@ -0,0 +1,54 @@
+"""bohe_sign.token_cache JWT exp 解析与缓存时长"""
+
+import base64
+import json
+import time
+
+from bohe_sign.token_cache import (
+    EXPIRY_MARGIN, INVALID_TTL, VALID_STALE_TTL, VALID_TTL, _validity_policy, get_token_expiry
+)
+
+
+def _jwt(claims: dict) -> str:
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+    return f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+def test_expiry_from_exp_claim():
+    assert get_token_expiry(_jwt({"sub": "1", "exp": 1767225600})) == 1767225600.0
+
+
+def test_expiry_handles_unpadded_payload_lengths():
+    for sub in ("a", "ab", "abc", "abcd"):
+        assert get_token_expiry(_jwt({"sub": sub, "exp": 100})) == 100.0
+
+
+def test_expiry_missing_or_malformed():
+    assert get_token_expiry(_jwt({"sub": "1"})) is None
+    assert get_token_expiry("opaque-token") is None
+    assert get_token_expiry("a.!!!.c") is None
+    assert get_token_expiry("a.b.c.d") is None
+
+
+def test_invalid_result_uses_short_ttl():
+    assert _validity_policy((False, None)) == (INVALID_TTL, 0)
+
+
+def test_valid_result_without_exp_uses_default_ttl():
+    assert _validity_policy((True, None)) == (VALID_TTL, VALID_STALE_TTL)
+
+
+def test_ttl_never_outlives_jwt_expiry():
+    exp = time.time() + EXPIRY_MARGIN + 120
+    fresh, stale = _validity_policy((True, exp))
+
+    assert 119 <= fresh <= 120
+    assert stale == 0
+
+
+def test_expired_jwt_is_not_cached_as_valid():
+    fresh, stale = _validity_policy((True, time.time() - 10))
+
+    assert fresh <= 0
+    assert stale == 0
@@ -0,0 +1,79 @@
+"""store.writer 写入合并"""
+
+import json
+import threading
+
+from store.writer import GroupCommitWriter
+
+
+def _blocked_writer():
+    """写线程在第一个操作处阻塞，之后提交的写入进入同一批次"""
+    writer = GroupCommitWriter(batch_delay=0)
+    gate = threading.Event()
+    blocked = threading.Event()
+
+    def block() -> None:
+        blocked.set()
+        gate.wait()
+
+    writer.call(block)
+    assert blocked.wait(timeout=5)
+    return writer, gate
+
+
+def test_replaces_of_same_file_commit_once(tmp_path):
+    path = str(tmp_path / "data.json")
+    writer, gate = _blocked_writer()
+
+    futures = [writer.write_json(path, {"n": i}) for i in range(5)]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"n": 4}
+    # 阻塞用的 call 与合并后的一次整体写入
+    assert writer.committed == 2
+    assert writer.submitted == 6
+
+
+def test_adjacent_appends_are_merged_in_order(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    writer, gate = _blocked_writer()
+
+    futures = [writer.append(path, f"{i}\n") for i in range(4)]
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "0\n1\n2\n3\n"
+    assert writer.committed == 2
+
+
+def test_on_commit_runs_after_write(tmp_path):
+    path = str(tmp_path / "data.json")
+    writer = GroupCommitWriter(batch_delay=0)
+    seen = []
+
+    def on_commit() -> None:
+        with open(path, encoding="utf-8") as f:
+            seen.append(json.load(f))
+
+    writer.write_json(path, {"ok": True}, on_commit=on_commit).result(timeout=5)
+
+    assert seen == [{"ok": True}]
+
+
+def test_failed_write_sets_exception_and_writer_continues(tmp_path):
+    writer = GroupCommitWriter(batch_delay=0)
+
+    def fail() -> None:
+        raise OSError("disk full")
+
+    failed = writer.call(fail)
+    ok = writer.write_json(str(tmp_path / "after.json"), [1])
+
+    assert isinstance(failed.exception(timeout=5), OSError)
+    assert ok.result(timeout=5) is None
+    assert (tmp_path / "after.json").exists()
@@ -5,25 +5,62 @@ from contextlib import asynccontextmanager
 from typing import Any, Dict
 
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
+from bohe_sign.events import bus, relay
+from bohe_sign.linux_do import close_clients
+from bohe_sign.metrics import GaugeFunc, render as render_metrics
+from bohe_sign.renewal import renewer
+from bohe_sign.resilience import OPEN, get_upstream_stats
+from bohe_sign.session import init_sessions, close_sessions
+from bohe_sign.sign import SIGN_API
+from store.backend import close_backend
+from store.writer import flush_writes, get_writer
+from web.leader import election
 from web.routes import api_router
-from web.scheduler import setup_scheduler, shutdown_scheduler
+from web.scheduler import setup_scheduler, shutdown_scheduler, sync_schedule
+
+
+def start_background_tasks() -> None:
+    """启动调度器与 Token 主动续期（仅在主进程中运行）"""
+    setup_scheduler()
+    # 在 Token 过期前主动续期
+    renewer.start()
+
+
+async def stop_background_tasks() -> None:
+    """关闭调度器与续期任务"""
+    shutdown_scheduler()
+    await renewer.stop()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
-    # 启动时初始化调度器
     print("正在启动应用...")
-    setup_scheduler()
+    # 预先建立到上游的连接，首个签到请求无需再做 DNS 解析和 TCP / TLS 握手
+    await init_sessions(SIGN_API)
+    # 多个 worker 时在进程间转发事件，SSE 连接到任一 worker 都能收到全部事件
+    relay.start()
+    # 多个 worker 中只有选为主进程的一个运行调度器，主进程退出后由其它进程接管
+    await election.start(
+        on_elected=start_background_tasks,
+        on_resign=stop_background_tasks,
+        on_tick=sync_schedule
+    )
     
     yield
     
-    # 关闭时清理调度器
+    # 关闭时清理调度器、续期任务和上游连接池
     print("正在关闭应用...")
-    shutdown_scheduler()
+    await election.stop()
+    await relay.stop()
+    await close_clients()
+    await close_sessions()
+    # 等待排队中的存储写入落盘
+    await flush_writes()
+    close_backend()
 
 
 # 创建 FastAPI 应用
@@ -46,6 +83,31 @@ async def health_check() -> Dict[str, Any]:
     return {"status": "ok"}
 
 
+# 运行时状态类指标，在抓取时读取
+GaugeFunc(
+    "bohe_store_write_queue_pending",
+    "Store writes queued but not yet committed.",
+    lambda: get_writer().stats()["pending"]
+)
+GaugeFunc(
+    "bohe_upstream_open_circuits",
+    "Upstream hosts whose circuit breaker is currently open.",
+    lambda: sum(1 for stats in get_upstream_stats().values() if stats["state"] == OPEN)
+)
+GaugeFunc(
+    "bohe_event_subscribers",
+    "Connected Server-Sent Events subscribers.",
+    bus.subscriber_count
+)
+
+
+# Prometheus 指标端点
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """以 Prometheus 文本格式输出指标"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # 全局异常处理
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
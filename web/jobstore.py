@@ -0,0 +1,74 @@
+"""持久化的 APScheduler 任务存储
+
+在 MemoryJobStore 的基础上，把任务状态（触发器、下次运行时间等）序列化后保存到
+当前存储后端。重启后按原有的下次运行时间恢复任务，停机期间错过的运行由调度器
+按 misfire_grace_time / coalesce 规则补执行一次。
+"""
+
+import pickle
+from datetime import datetime
+from typing import Any, Optional
+
+from apscheduler.job import Job
+from apscheduler.jobstores.memory import MemoryJobStore
+
+from store.backend import get_backend, submit_write
+
+
+class BackendJobStore(MemoryJobStore):
+    """保存到存储后端的任务存储（读取仍走内存）"""
+
+    def start(self, scheduler: Any, alias: str) -> None:
+        super().start(scheduler, alias)
+        backend = get_backend()
+        for job_id, state in backend.load_jobs().items():
+            try:
+                job = self._reconstitute_job(state)
+            except Exception as e:
+                print(f"恢复定时任务 {job_id} 失败: {e}")
+                backend.delete_job(job_id)
+                continue
+            super().add_job(job)
+
+    def _reconstitute_job(self, state: bytes) -> Job:
+        job = Job.__new__(Job)
+        job.__setstate__(pickle.loads(state))
+        job._scheduler = self._scheduler
+        job._jobstore_alias = self._alias
+        return job
+
+    @staticmethod
+    def _persist(job: Job) -> None:
+        # 调度器在事件循环中同步调用任务存储，多进程时的落盘交给写线程
+        submit_write(get_backend().save_job, job.id, pickle.dumps(job.__getstate__(), pickle.HIGHEST_PROTOCOL))
+
+    def add_job(self, job: Job) -> None:
+        super().add_job(job)
+        self._persist(job)
+
+    def update_job(self, job: Job) -> None:
+        super().update_job(job)
+        self._persist(job)
+
+    def remove_job(self, job_id: str) -> None:
+        super().remove_job(job_id)
+        submit_write(get_backend().delete_job, job_id)
+
+    def remove_all_jobs(self) -> None:
+        super().remove_all_jobs()
+        submit_write(get_backend().delete_job)
+
+    def shutdown(self) -> None:
+        # MemoryJobStore 关闭时会清空任务，这里只清空内存，保留已保存的任务
+        super().remove_all_jobs()
+
+
+def load_next_run_time(job_id: str) -> Optional[datetime]:
+    """读取已保存任务的下次运行时间（供未运行调度器的进程展示状态）"""
+    state = get_backend().load_jobs().get(job_id)
+    if state is None:
+        return None
+    try:
+        return pickle.loads(state).get("next_run_time")
+    except Exception:
+        return None
@@ -0,0 +1,102 @@
+"""多进程运行时的调度器选主
+
+以 uvicorn --workers N 运行时，每个 worker 都会执行应用的 lifespan。为保证定时签到
+只触发一次，各进程竞争锁文件 LOCK_FILE 上的排它锁（fcntl.flock）：持有锁的进程为
+主进程，负责运行调度器与 Token 主动续期；其余进程只处理 HTTP 请求，并每隔
+CHECK_INTERVAL 秒重试。主进程退出（包括崩溃）时锁由操作系统释放，其中一个进程
+随即接管。调度任务保存在共用的存储中，接管后按原有的下次运行时间继续，期间错过的
+运行按补执行规则处理。
+
+主进程每次检查时还会执行 on_tick（同步其它进程修改的定时设置，见 web.scheduler.sync_schedule）。
+"""
+
+import asyncio
+import inspect
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from store.lock import ProcessLock
+
+LOCK_FILE = "./data/leader.lock"
+CHECK_INTERVAL = 5.0  # 非主进程重试获取锁、主进程同步设置的间隔（秒）
+
+
+async def _call(fn: Optional[Callable[[], Any]]) -> None:
+    if fn is None:
+        return
+    result = fn()
+    if inspect.isawaitable(result):
+        await result
+
+
+class LeaderElection:
+    """基于文件锁的选主"""
+
+    def __init__(self, path: str = LOCK_FILE, interval: float = CHECK_INTERVAL) -> None:
+        self.lock = ProcessLock(path)
+        self.interval = interval
+        self.is_leader = False
+        self.elected_at: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._on_elected: Optional[Callable[[], Any]] = None
+        self._on_tick: Optional[Callable[[], Any]] = None
+        self._on_resign: Optional[Callable[[], Any]] = None
+
+    async def start(
+        self,
+        on_elected: Callable[[], Any],
+        on_resign: Callable[[], Any],
+        on_tick: Optional[Callable[[], Any]] = None
+    ) -> None:
+        """参与选主，成为主进程时执行 on_elected，卸任时执行 on_resign（可为协程函数）"""
+        self._on_elected, self._on_resign, self._on_tick = on_elected, on_resign, on_tick
+        await self._try_elect()
+        if not self.is_leader:
+            print(f"其它进程正在运行调度器，当前进程 (pid {os.getpid()}) 等待接管")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """退出选主，主进程先执行 on_resign 再释放锁"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            try:
+                await _call(self._on_resign)
+            finally:
+                self.is_leader = False
+                self.elected_at = None
+                self.lock.release()
+        self.lock.close()
+
+    async def _try_elect(self) -> None:
+        if not self.lock.acquire(blocking=False):
+            return
+        self.is_leader = True
+        self.elected_at = datetime.now().astimezone().isoformat()
+        print(f"当前进程 (pid {os.getpid()}) 成为主进程，负责运行调度器")
+        await _call(self._on_elected)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if self.is_leader:
+                    await _call(self._on_tick)
+                else:
+                    await self._try_elect()
+            except Exception as e:
+                print(f"Leader election check failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """选主状态"""
+        return {"leader": self.is_leader, "pid": os.getpid(), "elected_at": self.elected_at}
+
+
+election = LeaderElection()
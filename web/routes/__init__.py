@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter
 
-from web.routes import token, sign, schedule
+from web.routes import token, sign, schedule, events, dashboard
 
 # 创建主 API 路由
 api_router = APIRouter(prefix="/api")
@@ -10,4 +10,6 @@ api_router = APIRouter(prefix="/api")
 # 注册子路由
 api_router.include_router(token.router, prefix="/token", tags=["Token 管理"])
 api_router.include_router(sign.router, prefix="/sign", tags=["签到"])
-api_router.include_router(schedule.router, prefix="/schedule", tags=["定时任务"])
\ No newline at end of file
+api_router.include_router(schedule.router, prefix="/schedule", tags=["定时任务"])
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["面板"])
+api_router.include_router(events.router, prefix="/events", tags=["事件推送"])
\ No newline at end of file
@@ -0,0 +1,84 @@
+"""面板聚合数据 API"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict
+
+from fastapi import APIRouter, Query, Request, Response
+
+from bohe_sign.sign import get_sign_status
+from store.backend import run_read
+from store.token import DEFAULT_ACCOUNT, load_tokens
+from web.routes.token import build_token_status
+from web.scheduler import get_schedule_status
+
+router = APIRouter()
+
+# 随处理请求的进程而变的字段，不参与 ETag 计算（多 worker 时各进程对同一内容给出相同的 ETag）
+PER_PROCESS_FIELDS = (("schedule", "leader"),)
+
+
+async def _schedule_status() -> Dict[str, Any]:
+    return get_schedule_status()
+
+
+def _encode(payload: Dict[str, Any]) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def compute_etag(body: bytes) -> str:
+    """根据响应内容计算强 ETag"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def dashboard_etag(payload: Dict[str, Any]) -> str:
+    """计算面板数据的 ETag（忽略 PER_PROCESS_FIELDS）"""
+    data = dict(payload["data"])
+    for section, field in PER_PROCESS_FIELDS:
+        if isinstance(data.get(section), dict):
+            data[section] = {key: value for key, value in data[section].items() if key != field}
+    return compute_etag(_encode({**payload, "data": data}))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """判断 If-None-Match 请求头是否与 ETag 匹配"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+@router.get("")
+async def get_dashboard(
+    request: Request,
+    account: str = Query(default=DEFAULT_ACCOUNT, description="账号名")
+) -> Response:
+    """一次返回 Token、签到和定时任务状态
+
+    三部分并发获取并共用同一份 Token 快照；内容未变化时返回 304。
+    """
+    tokens = await run_read(load_tokens, account)
+
+    token_status, sign_status, schedule_status = await asyncio.gather(
+        build_token_status(tokens),
+        get_sign_status(account, tokens=tokens),
+        _schedule_status()
+    )
+
+    payload = {
+        "success": True,
+        "message": "",
+        "data": {
+            "token": token_status,
+            "sign": sign_status,
+            "schedule": schedule_status
+        }
+    }
+    etag = dashboard_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=_encode(payload), media_type="application/json", headers=headers)
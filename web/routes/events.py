@@ -0,0 +1,54 @@
+"""服务器推送事件（SSE）API"""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from bohe_sign.events import bus
+
+router = APIRouter()
+
+HEARTBEAT_INTERVAL = 15  # 心跳间隔（秒），防止代理断开空闲连接
+RETRY_MS = 5000  # 浏览器断线后的重连间隔（毫秒）
+
+
+def format_sse(event: str, data: dict) -> str:
+    """格式化为 SSE 消息"""
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def event_stream(request: Request) -> AsyncIterator[str]:
+    """为单个连接推送事件，直到客户端断开"""
+    queue = bus.subscribe()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        yield format_sse("ready", {})
+
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+            yield format_sse(event, data)
+    finally:
+        bus.unsubscribe(queue)
+
+
+@router.get("")
+async def stream_events(request: Request) -> StreamingResponse:
+    """订阅签到结果、日志、Token 状态和定时任务变化事件"""
+    return StreamingResponse(
+        event_stream(request),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
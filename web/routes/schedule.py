@@ -15,6 +15,7 @@ class ScheduleRequest(BaseModel):
     """设置定时任务请求体"""
     enabled: bool = True
     time: Optional[str] = None
+    precision: bool = False
     
     @field_validator("time")
     @classmethod
@@ -54,9 +55,10 @@ async def set_schedule(request: ScheduleRequest) -> ApiResponse:
             message="启用定时任务时必须指定时间"
         )
     
-    result = update_schedule(
+    result = await update_schedule(
         enabled=request.enabled,
-        time_str=request.time
+        time_str=request.time,
+        precision=request.precision
     )
     
     return ApiResponse(
@@ -69,7 +71,7 @@ async def set_schedule(request: ScheduleRequest) -> ApiResponse:
 @router.delete("", response_model=ApiResponse)
 async def remove_schedule() -> ApiResponse:
     """删除定时任务"""
-    result = delete_schedule()
+    result = await delete_schedule()
     
     return ApiResponse(
         success=result.get("success", False),
@@ -1,15 +1,28 @@
 """签到相关 API"""
 
-from typing import Any, Dict, Optional
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
 
 from fastapi import APIRouter, Query, Header
-from pydantic import BaseModel
-
-from bohe_sign.sign import do_sign, get_sign_status, spin
-from store.log import get_sign_logs
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from bohe_sign.resilience import get_upstream_stats
+from bohe_sign.session import get_pool_stats
+from bohe_sign.batch import MAX_BATCH_ITEMS, MAX_SPINS_PER_TOKEN, sign_accounts, spin_tokens
+from bohe_sign.limiter import MAX_CONCURRENCY, MAX_RATE
+from bohe_sign.sign import do_sign, get_sign_status, get_user_info_age, spin
+from store.backend import run_read
+from store.log import LOG_EXPORT_FIELDS, get_sign_logs, iter_sign_logs
+from store.token import DEFAULT_ACCOUNT
 
 router = APIRouter()
 
+EXPORT_CHUNK_LINES = 200  # 导出时每次写出的行数（第一行立即写出）
+
 
 class ApiResponse(BaseModel):
     """通用 API 响应"""
@@ -18,10 +31,30 @@ class ApiResponse(BaseModel):
     data: Dict[str, Any] = {}
 
 
+class BatchSignRequest(BaseModel):
+    """批量签到请求体（concurrency / rate 只能在上游主机的上限内收窄，rate 为 0 表示不另行限速）"""
+    accounts: Optional[List[str]] = Field(default=None, max_length=MAX_BATCH_ITEMS)
+    concurrency: int = Field(default=MAX_CONCURRENCY, ge=1, le=MAX_CONCURRENCY)
+    rate: float = Field(default=MAX_RATE, ge=0, le=MAX_RATE)
+
+
+class SpinItem(BaseModel):
+    """单个 Token 的抽奖请求"""
+    token: str
+    count: int = Field(default=1, ge=1, le=MAX_SPINS_PER_TOKEN)
+
+
+class BatchSpinRequest(BaseModel):
+    """批量抽奖请求体（concurrency / rate 的含义同 BatchSignRequest）"""
+    items: List[SpinItem] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+    concurrency: int = Field(default=MAX_CONCURRENCY, ge=1, le=MAX_CONCURRENCY)
+    rate: float = Field(default=MAX_RATE, ge=0, le=MAX_RATE)
+
+
 @router.post("/now", response_model=ApiResponse)
-async def sign_now() -> ApiResponse:
+async def sign_now(account: str = Query(default=DEFAULT_ACCOUNT, description="账号名")) -> ApiResponse:
     """立即执行签到"""
-    result = await do_sign(trigger="manual")
+    result = await do_sign(trigger="manual", account=account)
     
     return ApiResponse(
         success=result.get("success", False),
@@ -30,10 +63,29 @@ async def sign_now() -> ApiResponse:
     )
 
 
+@router.post("/batch", response_model=ApiResponse)
+async def sign_batch(request: BatchSignRequest) -> ApiResponse:
+    """为多个账号并发执行签到"""
+    result = await sign_accounts(
+        accounts=request.accounts,
+        trigger="manual",
+        concurrency=request.concurrency,
+        rate=request.rate
+    )
+    summary = result["summary"]
+
+    return ApiResponse(
+        success=summary["failed"] == 0,
+        message=f"批量签到完成：成功 {summary['succeeded']}，失败 {summary['failed']}",
+        data=result
+    )
+
+
 @router.get("/status", response_model=ApiResponse)
-async def get_status() -> ApiResponse:
+async def get_status(account: str = Query(default=DEFAULT_ACCOUNT, description="账号名")) -> ApiResponse:
     """获取签到状态"""
-    status = await get_sign_status()
+    status = await get_sign_status(account)
+    status["user_info_age"] = get_user_info_age(status)
     
     return ApiResponse(
         success=True,
@@ -41,13 +93,26 @@ async def get_status() -> ApiResponse:
     )
 
 
+@router.get("/upstream", response_model=ApiResponse)
+async def get_upstream_status() -> ApiResponse:
+    """获取上游主机的熔断、重试与连接池状态"""
+    return ApiResponse(
+        success=True,
+        data={
+            "breakers": get_upstream_stats(),
+            "pools": get_pool_stats()
+        }
+    )
+
+
 @router.get("/logs", response_model=ApiResponse)
 async def get_logs(
     page: int = Query(default=1, ge=1, description="页码"),
-    limit: int = Query(default=10, ge=1, le=50, description="每页数量")
+    limit: int = Query(default=10, ge=1, le=50, description="每页数量"),
+    before_id: Optional[int] = Query(default=None, ge=1, description="键集分页游标，返回 id 小于该值的日志")
 ) -> ApiResponse:
     """获取签到日志列表"""
-    logs_data = get_sign_logs(page=page, limit=limit)
+    logs_data = await run_read(get_sign_logs, page=page, limit=limit, before_id=before_id)
     
     return ApiResponse(
         success=True,
@@ -55,6 +120,61 @@ async def get_logs(
     )
 
 
+def _export_lines(logs: Iterator[Dict[str, Any]], fmt: str) -> Iterator[str]:
+    """将日志逐条编码为 NDJSON 或 CSV 行"""
+    if fmt != "csv":
+        for entry in logs:
+            yield json.dumps(entry, ensure_ascii=False) + "\n"
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=LOG_EXPORT_FIELDS, extrasaction="ignore")
+
+    def take() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writeheader()
+    yield take()
+    for entry in logs:
+        writer.writerow(entry)
+        yield take()
+
+
+def _chunked(lines: Iterator[str]) -> Iterator[str]:
+    """第一行立即写出，之后每 EXPORT_CHUNK_LINES 行合并写出一次"""
+    chunk: List[str] = []
+    for index, line in enumerate(lines):
+        chunk.append(line)
+        if index == 0 or len(chunk) >= EXPORT_CHUNK_LINES:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+@router.get("/logs/export")
+async def export_logs(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$", description="导出格式 (ndjson/csv)"),
+    since: Optional[datetime] = Query(default=None, description="起始时间（含）"),
+    until: Optional[datetime] = Query(default=None, description="结束时间（不含）"),
+    status: Optional[str] = Query(default=None, description="签到状态 (success/failed)"),
+    trigger: Optional[str] = Query(default=None, description="触发方式"),
+    account: Optional[str] = Query(default=None, description="账号名")
+) -> StreamingResponse:
+    """流式导出签到日志（按时间正序），服务端不缓存全部结果"""
+    logs = iter_sign_logs(since=since, until=until, status=status, trigger=trigger, account=account)
+    # 同步生成器由 Starlette 在线程池中迭代，读取日志分段不阻塞事件循环
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _chunked(_export_lines(logs, format)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=sign-logs.{format}"}
+    )
+
+
 @router.post("/spin", response_model=ApiResponse)
 async def spin_checkin(authorization: Optional[str] = Header(None)) -> ApiResponse:
     """执行转盘抽奖"""
@@ -68,4 +188,21 @@ async def spin_checkin(authorization: Optional[str] = Header(None)) -> ApiRespon
         success=result.get("success", False),
         message=result.get("message", ""),
         data=result.get("data", {}),
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/spin/batch", response_model=ApiResponse)
+async def spin_batch(request: BatchSpinRequest) -> ApiResponse:
+    """为多个 Token 并发执行转盘抽奖"""
+    result = await spin_tokens(
+        items=[(item.token, item.count) for item in request.items],
+        concurrency=request.concurrency,
+        rate=request.rate
+    )
+    summary = result["summary"]
+
+    return ApiResponse(
+        success=summary["failed"] == 0,
+        message=f"批量抽奖完成：成功 {summary['succeeded']}，失败 {summary['failed']}，跳过 {summary['skipped']}",
+        data=result
+    )
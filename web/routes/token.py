@@ -2,11 +2,16 @@
 
 from typing import Any, Dict
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
 
-from store.token import load_tokens, save_tokens
-from bohe_sign.login import get_bohe_token, verify_bohe_token
+from store.backend import run_write
+from store.token import DEFAULT_ACCOUNT, list_accounts, load_tokens, save_tokens
+from bohe_sign.events import publish
+from bohe_sign.login import get_bohe_token, get_refresh_stats, verify_bohe_token
+from bohe_sign.renewal import renewer
+from bohe_sign.token_cache import get_token_cache_stats
+from bohe_sign.tracing import MAX_TRACES, tracer
 
 router = APIRouter()
 
@@ -14,6 +19,7 @@ router = APIRouter()
 class SetTokenRequest(BaseModel):
     """设置 Token 请求体"""
     token: str
+    account: str = DEFAULT_ACCOUNT
 
 
 class ApiResponse(BaseModel):
@@ -40,11 +46,15 @@ def mask_token(token: str, show_chars: int = 6) -> str:
     return token[:show_chars] + "***" + token[-show_chars:]
 
 
-@router.get("/status", response_model=ApiResponse)
-async def get_token_status() -> ApiResponse:
-    """获取所有 Token 的状态"""
-    tokens = load_tokens()
+async def build_token_status(tokens: Dict[str, str]) -> Dict[str, Any]:
+    """根据 Token 快照生成状态数据（含薄荷 Token 有效性）
     
+    Args:
+        tokens: load_tokens() 返回的 Token 字典
+        
+    Returns:
+        各 Token 的存在性、有效性和脱敏值
+    """
     linux_do_token = tokens.get("linux_do_token", "")
     linux_do_connect_token = tokens.get("linux_do_connect_token", "")
     bohe_sign_token = tokens.get("bohe_sign_token", "")
@@ -54,23 +64,31 @@ async def get_token_status() -> ApiResponse:
     if bohe_sign_token:
         bohe_valid = await verify_bohe_token(bohe_sign_token)
     
+    return {
+        "linux_do_token": {
+            "exists": bool(linux_do_token),
+            "masked": mask_token(linux_do_token) if linux_do_token else None
+        },
+        "linux_do_connect_token": {
+            "exists": bool(linux_do_connect_token),
+            "masked": mask_token(linux_do_connect_token) if linux_do_connect_token else None
+        },
+        "bohe_sign_token": {
+            "exists": bool(bohe_sign_token),
+            "valid": bohe_valid,
+            "masked": mask_token(bohe_sign_token) if bohe_sign_token else None
+        }
+    }
+
+
+@router.get("/status", response_model=ApiResponse)
+async def get_token_status(account: str = Query(default=DEFAULT_ACCOUNT, description="账号名")) -> ApiResponse:
+    """获取所有 Token 的状态"""
+    tokens = load_tokens(account)
+    
     return ApiResponse(
         success=True,
-        data={
-            "linux_do_token": {
-                "exists": bool(linux_do_token),
-                "masked": mask_token(linux_do_token) if linux_do_token else None
-            },
-            "linux_do_connect_token": {
-                "exists": bool(linux_do_connect_token),
-                "masked": mask_token(linux_do_connect_token) if linux_do_connect_token else None
-            },
-            "bohe_sign_token": {
-                "exists": bool(bohe_sign_token),
-                "valid": bohe_valid,
-                "masked": mask_token(bohe_sign_token) if bohe_sign_token else None
-            }
-        }
+        data=await build_token_status(tokens)
     )
 
 
@@ -78,26 +96,70 @@ async def get_token_status() -> ApiResponse:
 async def set_linux_do_token(request: SetTokenRequest) -> ApiResponse:
     """设置 Linux.do Token"""
     token = request.token.strip()
-    
+
     if not token:
         return ApiResponse(
             success=False,
             message="Token 不能为空"
         )
-    
+
+    account = request.account.strip() or DEFAULT_ACCOUNT
+
     # 保存 Linux.do Token
-    save_tokens(linux_do_token=token)
-    
+    await run_write(save_tokens, linux_do_token=token, account=account)
+    publish("token", {"account": account})
+
     return ApiResponse(
         success=True,
         message="Linux.do Token 已保存"
     )
 
 
+@router.get("/accounts", response_model=ApiResponse)
+async def get_accounts() -> ApiResponse:
+    """获取全部账号名"""
+    return ApiResponse(
+        success=True,
+        data={"accounts": list_accounts()}
+    )
+
+
+@router.get("/stats", response_model=ApiResponse)
+async def get_token_stats() -> ApiResponse:
+    """获取 Token 刷新合并与验证缓存统计"""
+    return ApiResponse(
+        success=True,
+        data={
+            "refresh": get_refresh_stats(),
+            "verify_cache": get_token_cache_stats()
+        }
+    )
+
+
+@router.get("/renewal", response_model=ApiResponse)
+async def get_token_renewal() -> ApiResponse:
+    """获取 Token 主动续期任务状态（各账号的计划续期时间与最近一次续期结果）"""
+    return ApiResponse(
+        success=True,
+        data=renewer.status()
+    )
+
+
+@router.get("/traces", response_model=ApiResponse)
+async def get_token_traces(
+    limit: int = Query(default=20, ge=1, le=MAX_TRACES, description="返回条数")
+) -> ApiResponse:
+    """获取最近的 Token 获取流程追踪（各步骤耗时与结果，用于排查刷新缓慢）"""
+    return ApiResponse(
+        success=True,
+        data={"traces": tracer.recent(limit)}
+    )
+
+
 @router.post("/refresh", response_model=ApiResponse)
-async def refresh_bohe_token() -> ApiResponse:
+async def refresh_bohe_token(account: str = Query(default=DEFAULT_ACCOUNT, description="账号名")) -> ApiResponse:
     """刷新薄荷 Token（使用已存储的 Linux.do Token）"""
-    tokens = load_tokens()
+    tokens = load_tokens(account)
     linux_do_token = tokens.get("linux_do_token", "")
     
     if not linux_do_token and not tokens.get("linux_do_connect_token"):
@@ -108,7 +170,7 @@ async def refresh_bohe_token() -> ApiResponse:
     
     try:
         # 尝试获取新的薄荷 Token
-        new_bohe_token, new_connect_token, new_ld_token = await get_bohe_token(linux_do_token)
+        new_bohe_token, new_connect_token, new_ld_token = await get_bohe_token(linux_do_token, account=account)
         
         if new_bohe_token:
             return ApiResponse(
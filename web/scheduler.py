@@ -1,13 +1,29 @@
-"""APScheduler 定时任务管理模块"""
+"""APScheduler 定时任务管理模块
 
-import asyncio
-from datetime import datetime
-from typing import Any, Dict, Optional
+调度任务保存在持久化的任务存储中（见 web.jobstore），每次运行的计划时间、
+开始 / 结束时间、耗时和结果记录在运行历史中（见 store.schedule）。
+精确模式下任务提前启动，预热并校时后在上游时钟的目标时刻签到（见 bohe_sign.precision）。
 
+多进程运行时只有主进程运行调度器（见 web.leader）。其它进程修改定时设置时只保存配置，
+由主进程通过 sync_schedule() 同步到调度器。
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from apscheduler.events import EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED, JobEvent
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-from store.config import load_config, save_config
+from bohe_sign.events import publish
+from bohe_sign.metrics import SCHEDULER_LAG_SECONDS
+from bohe_sign.precision import PRECISION_LEAD, prepare_and_wait
+from store.backend import run_write, submit_write
+from store.config import SCHEDULE_TIMEZONE, load_config, update_config
+from store.schedule import add_schedule_run, get_schedule_runs
+from web.jobstore import BackendJobStore, load_next_run_time
+from web.leader import election
 
 # 调度器实例
 scheduler: Optional[AsyncIOScheduler] = None
@@ -15,83 +31,200 @@ scheduler: Optional[AsyncIOScheduler] = None
 # 签到任务 ID
 SIGN_JOB_ID = "daily_sign"
 
+MISFIRE_GRACE_TIME = 12 * 3600  # 错过计划时间后仍补执行的时限（秒）
+RECENT_RUNS = 10  # 状态接口返回的最近运行记录条数
+
+# 任务 ID -> 本次运行的计划时间（任务提交时记录，任务开始时取出）
+_planned_run_times: Dict[str, datetime] = {}
+
+# 调度器当前对应的定时设置（enabled, time, precision）
+_applied_config: Optional[Tuple[bool, Optional[str], bool]] = None
+
+
+def _now() -> datetime:
+    return datetime.now().astimezone()
+
 
-async def scheduled_sign() -> None:
-    """定时签到任务"""
+def _config_key(config: Dict[str, Any]) -> Tuple[bool, Optional[str], bool]:
+    return (
+        bool(config.get("schedule_enabled")),
+        config.get("schedule_time"),
+        bool(config.get("schedule_precision"))
+    )
+
+
+def _on_job_event(event: JobEvent) -> None:
+    """记录任务的计划运行时间，以及超出补执行时限而被跳过的运行"""
+    if event.code == EVENT_JOB_SUBMITTED:
+        # 合并执行时 scheduled_run_times 含多个时间，以最近一次为准
+        _planned_run_times[event.job_id] = event.scheduled_run_times[-1]
+    elif event.code == EVENT_JOB_MISSED:
+        submit_write(
+            add_schedule_run,
+            job_id=event.job_id,
+            outcome="missed",
+            message="超出补执行时限，已跳过",
+            scheduled_at=event.scheduled_run_time.isoformat()
+        )
+
+
+async def scheduled_sign(precision: bool = False) -> None:
+    """定时签到任务（为全部账号执行）
+
+    Args:
+        precision: 是否为精确模式（任务提前 PRECISION_LEAD 秒启动，在目标时刻发出签到）
+    """
     # 延迟导入避免循环依赖
-    from bohe_sign.sign import do_sign
+    from bohe_sign.batch import sign_accounts
     
+    scheduled_at = _planned_run_times.pop(SIGN_JOB_ID, None)
+    started_at = _now()
+    started = time.perf_counter()
+    if scheduled_at is not None:
+        SCHEDULER_LAG_SECONDS.observe(max(0.0, (started_at - scheduled_at).total_seconds()))
+    outcome = "failed"
+    message = ""
+    firing: Dict[str, Any] = {}
+
     print(f"[{datetime.now().isoformat()}] 执行定时签到任务...")
-    result = await do_sign(trigger="scheduled")
-    
-    if result.get("success"):
-        print(f"[{datetime.now().isoformat()}] 定时签到成功: {result.get('message')}")
-    else:
-        print(f"[{datetime.now().isoformat()}] 定时签到失败: {result.get('message')}")
+    try:
+        if precision:
+            # 计划时间为目标签到时刻减去提前量
+            scheduled_at = (scheduled_at or started_at) + timedelta(seconds=PRECISION_LEAD)
+            firing = await prepare_and_wait(scheduled_at)
+            print(f"[{datetime.now().isoformat()}] 精确触发，误差 {firing['firing_error_ms']} ms")
+        batch = await sign_accounts(trigger="scheduled")
+        
+        for result in batch["results"]:
+            if result.get("success"):
+                print(f"[{datetime.now().isoformat()}] 定时签到成功 ({result['account']}): {result.get('message')}")
+            else:
+                print(f"[{datetime.now().isoformat()}] 定时签到失败 ({result['account']}): {result.get('message')}")
+
+        summary = batch["summary"]
+        if summary["failed"] == 0:
+            outcome = "success"
+        elif summary["succeeded"] > 0:
+            outcome = "partial"
+        message = f"成功 {summary['succeeded']} 个，失败 {summary['failed']} 个"
+    except Exception as e:
+        message = f"定时签到异常: {e}"
+        print(f"[{datetime.now().isoformat()}] {message}")
+    finally:
+        await run_write(
+            add_schedule_run,
+            job_id=SIGN_JOB_ID,
+            outcome=outcome,
+            message=message,
+            scheduled_at=scheduled_at.isoformat() if scheduled_at else None,
+            started_at=started_at.isoformat(),
+            finished_at=_now().isoformat(),
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            extra=firing
+        )
+        # 下次运行时间与运行记录已变化
+        publish("schedule", get_schedule_status())
+
+
+def _sign_trigger(time_str: str, precision: bool = False) -> CronTrigger:
+    """根据 HH:MM 创建每日触发器，精确模式下提前 PRECISION_LEAD 秒触发"""
+    hour, minute = map(int, time_str.split(":"))
+    if not precision:
+        return CronTrigger(hour=hour, minute=minute)
+    start = datetime(2000, 1, 2, hour, minute) - timedelta(seconds=PRECISION_LEAD)
+    return CronTrigger(hour=start.hour, minute=start.minute, second=start.second)
 
 
 def get_scheduler() -> AsyncIOScheduler:
     """获取调度器实例"""
     global scheduler
     if scheduler is None:
-        scheduler = AsyncIOScheduler(timezone="Asia/Shanghai")
+        scheduler = AsyncIOScheduler(
+            timezone=SCHEDULE_TIMEZONE,
+            jobstores={"default": BackendJobStore()},
+            # 停机期间错过的运行在启动后补执行，多次错过只执行一次
+            job_defaults={"coalesce": True, "misfire_grace_time": MISFIRE_GRACE_TIME}
+        )
+        scheduler.add_listener(_on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED)
     return scheduler
 
 
 def setup_scheduler() -> None:
-    """初始化调度器，从配置恢复任务"""
-    global scheduler
+    """初始化调度器，从任务存储恢复任务并与配置保持一致"""
+    global scheduler, _applied_config
     scheduler = get_scheduler()
     
+    if not scheduler.running:
+        # 启动时从任务存储加载上次保存的任务
+        scheduler.start()
+        print("调度器已启动")
+    
     config = load_config()
+    _applied_config = _config_key(config)
+    job = scheduler.get_job(SIGN_JOB_ID)
     
     if config.get("schedule_enabled") and config.get("schedule_time"):
         time_str = config["schedule_time"]
+        precision = bool(config.get("schedule_precision"))
         try:
-            hour, minute = map(int, time_str.split(":"))
+            trigger = _sign_trigger(time_str, precision)
+        except ValueError as e:
+            print(f"恢复定时任务失败，时间格式错误: {e}")
+            return
+        
+        if job is not None and str(job.trigger) == str(trigger) and job.kwargs == {"precision": precision}:
+            # 保留已保存的下次运行时间，错过的运行由调度器补执行
+            if job.next_run_time and job.next_run_time < _now():
+                print(f"定时签到任务错过了计划时间 {job.next_run_time.isoformat()}，将尝试补执行")
+        else:
             scheduler.add_job(
                 scheduled_sign,
-                CronTrigger(hour=hour, minute=minute),
+                trigger,
+                kwargs={"precision": precision},
                 id=SIGN_JOB_ID,
                 replace_existing=True
             )
-            print(f"已恢复定时签到任务，每日 {time_str} 执行")
-        except ValueError as e:
-            print(f"恢复定时任务失败，时间格式错误: {e}")
-    
-    if not scheduler.running:
-        scheduler.start()
-        print("调度器已启动")
+        print(f"已恢复定时签到任务，每日 {time_str} 执行{'（精确模式）' if precision else ''}")
+    elif job is not None:
+        scheduler.remove_job(SIGN_JOB_ID)
+
+
+def sync_schedule() -> None:
+    """定时设置被其它进程修改后，同步到本进程的调度器（由主进程定期调用）"""
+    if scheduler is None or not scheduler.running:
+        return
+    if _config_key(load_config()) != _applied_config:
+        print("定时设置已被其它进程修改，正在同步")
+        setup_scheduler()
+        publish("schedule", get_schedule_status())
 
 
 def shutdown_scheduler() -> None:
     """关闭调度器"""
-    global scheduler
+    global scheduler, _applied_config
     if scheduler and scheduler.running:
         scheduler.shutdown()
         print("调度器已关闭")
+    _applied_config = None
 
 
-def update_schedule(enabled: bool, time_str: Optional[str] = None) -> Dict[str, Any]:
+async def update_schedule(enabled: bool, time_str: Optional[str] = None, precision: bool = False) -> Dict[str, Any]:
     """更新定时任务配置
     
     Args:
         enabled: 是否启用定时任务
         time_str: 定时时间，格式为 HH:MM
+        precision: 是否启用精确模式
         
     Returns:
         更新结果字典
     """
-    global scheduler
-    
-    if scheduler is None:
-        scheduler = get_scheduler()
-        if not scheduler.running:
-            scheduler.start()
+    global _applied_config
+    # 本进程未运行调度器（多进程时的非主进程）时只保存配置，由主进程同步
+    local = scheduler is not None and scheduler.running
     
     # 先移除现有任务
-    existing_job = scheduler.get_job(SIGN_JOB_ID)
-    if existing_job:
+    if local and scheduler.get_job(SIGN_JOB_ID):
         scheduler.remove_job(SIGN_JOB_ID)
     
     next_run = None
@@ -107,15 +240,20 @@ def update_schedule(enabled: bool, time_str: Optional[str] = None) -> Dict[str,
                     "message": "时间格式无效，小时必须在 0-23 之间，分钟必须在 0-59 之间"
                 }
             
-            trigger = CronTrigger(hour=hour, minute=minute)
-            job = scheduler.add_job(
-                scheduled_sign,
-                trigger,
-                id=SIGN_JOB_ID,
-                replace_existing=True
-            )
+            trigger = _sign_trigger(time_str, precision)
+            if local:
+                job = scheduler.add_job(
+                    scheduled_sign,
+                    trigger,
+                    kwargs={"precision": precision},
+                    id=SIGN_JOB_ID,
+                    replace_existing=True
+                )
+                next_run_time = job.next_run_time
+            else:
+                next_run_time = trigger.get_next_fire_time(None, _now())
             
-            next_run = job.next_run_time.isoformat() if job.next_run_time else None
+            next_run = next_run_time.isoformat() if next_run_time else None
             print(f"定时签到任务已设置，每日 {time_str} 执行，下次运行: {next_run}")
             
         except ValueError:
@@ -125,10 +263,15 @@ def update_schedule(enabled: bool, time_str: Optional[str] = None) -> Dict[str,
             }
     
     # 保存配置
-    config = load_config()
-    config["schedule_enabled"] = enabled
-    config["schedule_time"] = time_str if enabled else None
-    save_config(config)
+    await run_write(
+        update_config,
+        schedule_enabled=enabled,
+        schedule_time=time_str if enabled else None,
+        schedule_precision=precision if enabled else False
+    )
+    if local:
+        _applied_config = (enabled, time_str if enabled else None, precision if enabled else False)
+    publish("schedule", {"enabled": enabled, "time": time_str, "precision": precision, "next_run": next_run})
     
     return {
         "success": True,
@@ -136,6 +279,7 @@ def update_schedule(enabled: bool, time_str: Optional[str] = None) -> Dict[str,
         "data": {
             "enabled": enabled,
             "time": time_str,
+            "precision": precision,
             "next_run": next_run
         }
     }
@@ -153,26 +297,36 @@ def get_schedule_status() -> Dict[str, Any]:
     enabled = config.get("schedule_enabled", False)
     time_str = config.get("schedule_time")
     next_run = None
-    last_run = None
     
-    if scheduler:
+    if scheduler and scheduler.running:
         job = scheduler.get_job(SIGN_JOB_ID)
         if job:
             if job.next_run_time:
                 next_run = job.next_run_time.isoformat()
+    elif enabled:
+        # 调度器运行在其它进程，读取其保存的下次运行时间
+        next_run_time = load_next_run_time(SIGN_JOB_ID)
+        next_run = next_run_time.isoformat() if next_run_time else None
+    
+    recent_runs = get_schedule_runs(RECENT_RUNS)
+    last = next((run for run in recent_runs if run.get("started_at")), None)
     
     return {
         "enabled": enabled,
         "time": time_str,
+        "precision": config.get("schedule_precision", False),
         "next_run": next_run,
-        "last_run": last_run
+        "last_run": last["started_at"] if last else None,
+        "last_outcome": last["outcome"] if last else None,
+        "recent_runs": recent_runs,
+        "leader": election.status()
     }
 
 
-def delete_schedule() -> Dict[str, Any]:
+async def delete_schedule() -> Dict[str, Any]:
     """删除定时任务
     
     Returns:
         删除结果字典
     """
-    return update_schedule(enabled=False, time_str=None)
\ No newline at end of file
+    return await update_schedule(enabled=False, time_str=None)
\ No newline at end of file
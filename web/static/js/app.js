@@ -7,7 +7,15 @@
 // ================================
 
 const API_BASE = '/api';
-const REFRESH_INTERVAL = 60000; // 自动刷新间隔（毫秒）
+const REFRESH_INTERVAL = 60000; // 自动刷新间隔（毫秒），仅在事件推送断开时使用
+const DEFAULT_ACCOUNT = 'default';
+
+// 事件推送连接与轮询定时器
+let eventSource = null;
+let refreshTimer = null;
+
+// 面板聚合数据的 ETag，用于条件请求
+let dashboardEtag = null;
 
 // 日志分页状态
 let logsState = {
@@ -152,54 +160,60 @@ async function fetchTokenStatus() {
     const result = await apiRequest('/token/status');
     
     if (result.success && result.data) {
-        const data = result.data;
-        
-        // 更新状态概览卡片
-        const tokenStatusItem = document.getElementById('token-status-item');
-        const tokenStatusIcon = document.getElementById('token-status-icon');
-        const tokenStatusText = document.getElementById('token-status-text');
-        
-        const boheToken = data.bohe_sign_token;
-        if (boheToken && boheToken.exists && boheToken.valid) {
-            tokenStatusItem.className = 'status-item status-success';
-            tokenStatusIcon.textContent = '✓';
-            tokenStatusText.textContent = '有效';
-        } else if (boheToken && boheToken.exists) {
-            tokenStatusItem.className = 'status-item status-warning';
-            tokenStatusIcon.textContent = '⚠';
-            tokenStatusText.textContent = '需刷新';
-        } else {
-            tokenStatusItem.className = 'status-item status-error';
-            tokenStatusIcon.textContent = '✕';
-            tokenStatusText.textContent = '未配置';
-        }
-        
-        // 更新 Token 信息区域
-        const tokenInfo = document.getElementById('token-info');
-        const linuxDoTokenMasked = document.getElementById('linux-do-token-masked');
-        const boheTokenMasked = document.getElementById('bohe-token-masked');
-        const boheTokenStatus = document.getElementById('bohe-token-status');
-        
-        if (data.linux_do_token && data.linux_do_token.exists) {
-            linuxDoTokenMasked.textContent = data.linux_do_token.masked || '-';
-        } else {
-            linuxDoTokenMasked.textContent = '未设置';
-        }
-        
-        if (boheToken && boheToken.exists) {
-            boheTokenMasked.textContent = boheToken.masked || '-';
-            boheTokenStatus.textContent = boheToken.valid ? '有效' : '无效';
-            boheTokenStatus.className = `token-info-status ${boheToken.valid ? 'valid' : 'invalid'}`;
-        } else {
-            boheTokenMasked.textContent = '未设置';
-            boheTokenStatus.textContent = '';
-            boheTokenStatus.className = 'token-info-status';
-        }
-        
-        tokenInfo.style.display = 'block';
+        renderTokenStatus(result.data);
     }
 }
 
+/**
+ * 显示 Token 状态
+ * @param {object} data - Token 状态数据
+ */
+function renderTokenStatus(data) {
+    // 更新状态概览卡片
+    const tokenStatusItem = document.getElementById('token-status-item');
+    const tokenStatusIcon = document.getElementById('token-status-icon');
+    const tokenStatusText = document.getElementById('token-status-text');
+    
+    const boheToken = data.bohe_sign_token;
+    if (boheToken && boheToken.exists && boheToken.valid) {
+        tokenStatusItem.className = 'status-item status-success';
+        tokenStatusIcon.textContent = '✓';
+        tokenStatusText.textContent = '有效';
+    } else if (boheToken && boheToken.exists) {
+        tokenStatusItem.className = 'status-item status-warning';
+        tokenStatusIcon.textContent = '⚠';
+        tokenStatusText.textContent = '需刷新';
+    } else {
+        tokenStatusItem.className = 'status-item status-error';
+        tokenStatusIcon.textContent = '✕';
+        tokenStatusText.textContent = '未配置';
+    }
+    
+    // 更新 Token 信息区域
+    const tokenInfo = document.getElementById('token-info');
+    const linuxDoTokenMasked = document.getElementById('linux-do-token-masked');
+    const boheTokenMasked = document.getElementById('bohe-token-masked');
+    const boheTokenStatus = document.getElementById('bohe-token-status');
+    
+    if (data.linux_do_token && data.linux_do_token.exists) {
+        linuxDoTokenMasked.textContent = data.linux_do_token.masked || '-';
+    } else {
+        linuxDoTokenMasked.textContent = '未设置';
+    }
+    
+    if (boheToken && boheToken.exists) {
+        boheTokenMasked.textContent = boheToken.masked || '-';
+        boheTokenStatus.textContent = boheToken.valid ? '有效' : '无效';
+        boheTokenStatus.className = `token-info-status ${boheToken.valid ? 'valid' : 'invalid'}`;
+    } else {
+        boheTokenMasked.textContent = '未设置';
+        boheTokenStatus.textContent = '';
+        boheTokenStatus.className = 'token-info-status';
+    }
+    
+    tokenInfo.style.display = 'block';
+}
+
 /**
  * 保存 Linux.do Token
  */
@@ -280,30 +294,36 @@ async function fetchSignStatus() {
     const result = await apiRequest('/sign/status');
     
     if (result.success && result.data) {
-        const data = result.data;
-        
-        // 更新状态概览卡片
-        const signStatusItem = document.getElementById('sign-status-item');
-        const signStatusIcon = document.getElementById('sign-status-icon');
-        const signStatusText = document.getElementById('sign-status-text');
-        
-        if (data.signed_today) {
-            signStatusItem.className = 'status-item status-success';
-            signStatusIcon.textContent = '✓';
-            signStatusText.textContent = '已签到';
-        } else {
-            signStatusItem.className = 'status-item status-warning';
-            signStatusIcon.textContent = '○';
-            signStatusText.textContent = '未签到';
-        }
-        
-        // 更新签到信息
-        document.getElementById('last-sign-time').textContent = formatDateTime(data.last_sign_time);
-        document.getElementById('continuous-days').textContent = data.continuous_days !== undefined ? `${data.continuous_days} 天` : '-';
-        document.getElementById('total-signs').textContent = data.total_signs !== undefined ? `${data.total_signs} 次` : '-';
+        renderSignStatus(result.data);
     }
 }
 
+/**
+ * 显示签到状态
+ * @param {object} data - 签到状态数据
+ */
+function renderSignStatus(data) {
+    // 更新状态概览卡片
+    const signStatusItem = document.getElementById('sign-status-item');
+    const signStatusIcon = document.getElementById('sign-status-icon');
+    const signStatusText = document.getElementById('sign-status-text');
+    
+    if (data.signed_today) {
+        signStatusItem.className = 'status-item status-success';
+        signStatusIcon.textContent = '✓';
+        signStatusText.textContent = '已签到';
+    } else {
+        signStatusItem.className = 'status-item status-warning';
+        signStatusIcon.textContent = '○';
+        signStatusText.textContent = '未签到';
+    }
+    
+    // 更新签到信息
+    document.getElementById('last-sign-time').textContent = formatDateTime(data.last_sign_time);
+    document.getElementById('continuous-days').textContent = data.continuous_days !== undefined ? `${data.continuous_days} 天` : '-';
+    document.getElementById('total-signs').textContent = data.total_signs !== undefined ? `${data.total_signs} 次` : '-';
+}
+
 /**
  * 立即签到
  */
@@ -408,47 +428,53 @@ async function fetchScheduleStatus() {
     const result = await apiRequest('/schedule');
     
     if (result.success && result.data) {
-        const data = result.data;
-        
-        // 更新状态概览卡片
-        const scheduleStatusItem = document.getElementById('schedule-status-item');
-        const scheduleStatusIcon = document.getElementById('schedule-status-icon');
-        const scheduleStatusText = document.getElementById('schedule-status-text');
-        
-        if (data.enabled) {
-            scheduleStatusItem.className = 'status-item status-success';
-            scheduleStatusIcon.textContent = '⏰';
-            scheduleStatusText.textContent = data.time || '已启用';
-        } else {
-            scheduleStatusItem.className = 'status-item status-info';
-            scheduleStatusIcon.textContent = '○';
-            scheduleStatusText.textContent = '未启用';
-        }
-        
-        // 更新定时任务配置表单
-        const scheduleEnabled = document.getElementById('schedule-enabled');
-        const scheduleTime = document.getElementById('schedule-time');
-        const toggleLabel = document.getElementById('schedule-toggle-label');
-        
-        scheduleEnabled.checked = data.enabled || false;
-        toggleLabel.textContent = data.enabled ? '已启用' : '未启用';
-        
-        if (data.time) {
-            scheduleTime.value = data.time;
-        }
-        
-        // 更新定时任务信息
-        const scheduleInfo = document.getElementById('schedule-info');
-        const nextRunTime = document.getElementById('next-run-time');
-        const lastRunTime = document.getElementById('last-run-time');
-        
-        if (data.enabled) {
-            scheduleInfo.style.display = 'block';
-            nextRunTime.textContent = formatDateTime(data.next_run);
-            lastRunTime.textContent = formatDateTime(data.last_run);
-        } else {
-            scheduleInfo.style.display = 'none';
-        }
+        renderScheduleStatus(result.data);
+    }
+}
+
+/**
+ * 显示定时任务状态
+ * @param {object} data - 定时任务状态数据
+ */
+function renderScheduleStatus(data) {
+    // 更新状态概览卡片
+    const scheduleStatusItem = document.getElementById('schedule-status-item');
+    const scheduleStatusIcon = document.getElementById('schedule-status-icon');
+    const scheduleStatusText = document.getElementById('schedule-status-text');
+    
+    if (data.enabled) {
+        scheduleStatusItem.className = 'status-item status-success';
+        scheduleStatusIcon.textContent = '⏰';
+        scheduleStatusText.textContent = data.time || '已启用';
+    } else {
+        scheduleStatusItem.className = 'status-item status-info';
+        scheduleStatusIcon.textContent = '○';
+        scheduleStatusText.textContent = '未启用';
+    }
+    
+    // 更新定时任务配置表单
+    const scheduleEnabled = document.getElementById('schedule-enabled');
+    const scheduleTime = document.getElementById('schedule-time');
+    const toggleLabel = document.getElementById('schedule-toggle-label');
+    
+    scheduleEnabled.checked = data.enabled || false;
+    toggleLabel.textContent = data.enabled ? '已启用' : '未启用';
+    
+    if (data.time) {
+        scheduleTime.value = data.time;
+    }
+    
+    // 更新定时任务信息
+    const scheduleInfo = document.getElementById('schedule-info');
+    const nextRunTime = document.getElementById('next-run-time');
+    const lastRunTime = document.getElementById('last-run-time');
+    
+    if (data.enabled) {
+        scheduleInfo.style.display = 'block';
+        nextRunTime.textContent = formatDateTime(data.next_run);
+        lastRunTime.textContent = formatDateTime(data.last_run);
+    } else {
+        scheduleInfo.style.display = 'none';
     }
 }
 
@@ -520,14 +546,37 @@ function handleScheduleToggle() {
 // 初始化与事件绑定
 // ================================
 
+/**
+ * 获取并显示面板聚合状态（Token、签到、定时任务）
+ * 数据未变化时服务器返回 304，不重新渲染
+ */
+async function fetchDashboard() {
+    const headers = dashboardEtag ? { 'If-None-Match': dashboardEtag } : {};
+    
+    try {
+        const response = await fetch(`${API_BASE}/dashboard`, { headers });
+        if (response.status === 304) {
+            return;
+        }
+        
+        const result = await response.json();
+        if (result.success && result.data) {
+            dashboardEtag = response.headers.get('ETag');
+            renderTokenStatus(result.data.token);
+            renderSignStatus(result.data.sign);
+            renderScheduleStatus(result.data.schedule);
+        }
+    } catch (error) {
+        console.error('API 请求失败:', error);
+    }
+}
+
 /**
  * 刷新所有状态
  */
 async function refreshAllStatus() {
     await Promise.all([
-        fetchTokenStatus(),
-        fetchSignStatus(),
-        fetchScheduleStatus(),
+        fetchDashboard(),
         fetchSignLogs()
     ]);
 }
@@ -562,14 +611,77 @@ function bindEventListeners() {
 }
 
 /**
- * 启动自动刷新
+ * 启动自动刷新（轮询）
  */
 function startAutoRefresh() {
-    setInterval(async () => {
-        await fetchTokenStatus();
-        await fetchSignStatus();
-        await fetchScheduleStatus();
-    }, REFRESH_INTERVAL);
+    if (refreshTimer) {
+        return;
+    }
+    refreshTimer = setInterval(fetchDashboard, REFRESH_INTERVAL);
+}
+
+/**
+ * 停止自动刷新（轮询）
+ */
+function stopAutoRefresh() {
+    if (refreshTimer) {
+        clearInterval(refreshTimer);
+        refreshTimer = null;
+    }
+}
+
+/**
+ * 事件是否属于当前面板展示的账号
+ * @param {object} data - 事件数据
+ * @returns {boolean}
+ */
+function isCurrentAccount(data) {
+    return !data.account || data.account === DEFAULT_ACCOUNT;
+}
+
+/**
+ * 订阅服务器推送事件，连接正常时不再轮询，断开时回退到轮询
+ */
+function startEventStream() {
+    if (!window.EventSource) {
+        startAutoRefresh();
+        return;
+    }
+
+    eventSource = new EventSource(`${API_BASE}/events`);
+
+    eventSource.addEventListener('ready', async () => {
+        // 连接（或重连）成功：停止轮询，并补齐断开期间的变化
+        stopAutoRefresh();
+        await refreshAllStatus();
+    });
+
+    eventSource.addEventListener('sign', (e) => {
+        if (isCurrentAccount(JSON.parse(e.data))) {
+            fetchSignStatus();
+        }
+    });
+
+    eventSource.addEventListener('log', () => {
+        if (logsState.page === 1) {
+            fetchSignLogs();
+        }
+    });
+
+    eventSource.addEventListener('token', (e) => {
+        if (isCurrentAccount(JSON.parse(e.data))) {
+            fetchTokenStatus();
+        }
+    });
+
+    eventSource.addEventListener('schedule', () => {
+        fetchScheduleStatus();
+    });
+
+    eventSource.onerror = () => {
+        // 浏览器会自动重连，期间使用轮询
+        startAutoRefresh();
+    };
 }
 
 /**
@@ -584,8 +696,8 @@ async function init() {
     // 加载初始数据
     await refreshAllStatus();
     
-    // 启动自动刷新
-    startAutoRefresh();
+    // 订阅事件推送（断开时自动回退到轮询）
+    startEventStream();
     
     console.log('初始化完成');
 }